@@ -9,10 +9,11 @@ v3 改进：
 状态流转：
   idle → confirming_materials → generating_outlines → waiting_selection
        → editing_outline (可选) → confirming_start → writing
-       → reviewing → waiting_optimization → optimizing (可选) → completed
+       → reviewing → waiting_optimization → optimizing (可选，完成后增量复审) → completed
 """
 
 import asyncio
+import functools
 import logging
 import re
 import sys
@@ -30,13 +31,35 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from openagents.agents.worker_agent import WorkerAgent, on_event
 from openagents.models.event import Event
-from tools.session_manager import SessionState
+from tools.session_manager import SessionState, SESSION_SWEEP_INTERVAL_SECONDS
+from tools.keyed_lock import KeyedLock
+from tools.shard_router import get_shard_router, SHARD_HEARTBEAT_SECONDS
+from tools.review_orchestrator import RoundMode
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _serialized_by_session(handler):
+    """
+    事件处理器装饰器：按事件中的 session_id 加锁
+
+    同一会话的用户消息和事件依次处理（避免读-改-写竞争），不同会话之间并行；
+    分片运行时忽略不属于本分片的会话事件
+    """
+    @functools.wraps(handler)
+    async def wrapper(self, context):
+        session_id = (context.incoming_event.payload or {}).get('session_id')
+        if not session_id:
+            return await handler(self, context)
+        if not await self.shard_router.owns_session(session_id, self.session_manager):
+            return
+        async with self._session_locks(session_id):
+            return await handler(self, context)
+    return wrapper
+
+
 class CreationCoordinator(WorkerAgent):
     """创作协调器 v3 - 使用 LLM 意图识别"""
 
@@ -55,8 +78,15 @@ class CreationCoordinator(WorkerAgent):
         self.session_manager = None
         self.llm = None
         self.intent_detector = None
-        # 评审追踪：session_id -> {technical: {score, suggestions}, ...}
-        self.pending_reviews = {}
+        # 评审编排（聚合状态持久化在 review_rounds 表）
+        self.review_orchestrator = None
+        self.session_recovery = None
+        # 评审截止时间监视任务：round_id -> Task
+        self._review_watchers: Dict[str, asyncio.Task] = {}
+        # 会话锁：同一会话的消息和事件串行处理
+        self._session_locks = KeyedLock("session")
+        # 分片路由：多实例时按 user_id 一致性哈希划分用户
+        self.shard_router = get_shard_router()
 
     async def on_startup(self):
         """Agent 启动时执行"""
@@ -67,18 +97,36 @@ class CreationCoordinator(WorkerAgent):
         from tools.session_manager import SessionManager
         from tools.llm_client import get_llm_client
         from tools.intent_detector import IntentDetector
+        from tools.review_orchestrator import ReviewOrchestrator
+        from tools.session_recovery import SessionRecovery
 
         self.db = get_database()
-        self.session_manager = SessionManager(self.db)
+        self.session_manager = SessionManager(self.db, owner_shard=self.shard_router.shard_id)
         self.llm = get_llm_client()
         self.intent_detector = IntentDetector(self.llm)
+        self.review_orchestrator = ReviewOrchestrator(self.db)
+        self.session_recovery = SessionRecovery(self.db, self.session_manager, self.review_orchestrator)
+
+        # 登记分片并认领属于本分片的活跃会话
+        self.shard_router.register(self.db, self.agent_id)
+        await self.session_manager.claim_sessions(self.shard_router.shard_id, self.shard_router.owns_user)
 
         # 启动定期清理任务
         asyncio.create_task(self._cleanup_loop())
+        if self.shard_router.enabled:
+            asyncio.create_task(self._shard_heartbeat_loop())
+
+        # 恢复重启前中断的会话（只恢复本分片负责的会话）
+        await self._recover_sessions()
 
-        logger.info("✅ Creation Coordinator v3 初始化完成")
+        logger.info(
+            f"✅ Creation Coordinator v3 初始化完成"
+            f" (分片 {self.shard_router.shard_id}/{self.shard_router.shard_count})"
+        )
 
-        # 发送上线通知
+        # 发送上线通知（分片运行时只由 0 号分片发送）
+        if self.shard_router.shard_id != 0:
+            return
         await self._send_message(
             "🎨 **创作协调器 v3 已上线！**\n\n"
             "💡 在「创作工坊」频道发送创作请求开始吧~\n\n"
@@ -101,17 +149,144 @@ class CreationCoordinator(WorkerAgent):
             logger.error(f"发送消息失败: {e}")
 
     async def _cleanup_loop(self):
-        """定期清理过期会话"""
+        """定期清理过期会话（启动时先清理一次）"""
         while True:
             try:
-                await asyncio.sleep(3600)
                 await self.session_manager.cleanup_expired_sessions()
             except Exception as e:
                 logger.error(f"清理会话失败: {e}")
+            await asyncio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+
+    async def _shard_heartbeat_loop(self):
+        """定期更新分片心跳；在线分片变化时认领接管的会话并恢复其中中断的工作"""
+        while True:
+            try:
+                await asyncio.sleep(SHARD_HEARTBEAT_SECONDS)
+                if not self.shard_router.heartbeat(self.db):
+                    continue
+                claimed = await self.session_manager.claim_sessions(
+                    self.shard_router.shard_id, self.shard_router.owns_user
+                )
+                if claimed:
+                    await self._recover_sessions()
+            except Exception as e:
+                logger.error(f"更新分片心跳失败: {e}")
+
+    # ==================== 崩溃恢复 ====================
+
+    async def _recover_sessions(self):
+        """
+        恢复重启前处于处理中状态的会话
+
+        评审相关的恢复立即执行；其他会话在无进展超过 RECOVERY_STALE_SECONDS 后才补发工作，
+        避免与仍在运行的 Agent 重复处理
+        """
+        try:
+            plans = await self.session_recovery.plan_all(
+                lambda session_id: self.shard_router.owns_session(session_id, self.session_manager)
+            )
+        except Exception as e:
+            logger.error(f"❌ 规划会话恢复失败: {e}", exc_info=True)
+            return
+
+        now = datetime.now().timestamp()
+        for plan in plans:
+            if plan.not_before > now:
+                asyncio.create_task(self._recover_later(plan, plan.not_before - now))
+            else:
+                await self._run_recovery(plan)
+
+    async def _recover_later(self, plan, delay: float):
+        """等待一段时间，会话仍无进展时再恢复"""
+        session = await self.session_manager.get_session(plan.session_id)
+        if not session:
+            return
+        version = session.version
+        logger.info(f"🩹 会话 {plan.session_id} 将在 {delay:.0f}s 后检查是否需要恢复")
+
+        await asyncio.sleep(delay)
+
+        session = await self.session_manager.get_session(plan.session_id)
+        if not session or session.version != version:
+            logger.info(f"🩹 会话 {plan.session_id} 已有新进展，无需恢复")
+            return
+
+        # 等待期间其他 Agent 可能已保存结果，重新规划
+        plan = self.session_recovery.plan(session)
+        if plan:
+            await self._run_recovery(plan)
+
+    async def _run_recovery(self, plan):
+        """执行单个会话的恢复计划"""
+        from tools.session_recovery import RecoveryAction
+
+        try:
+            async with self._session_locks(plan.session_id):
+                session = await self.session_manager.get_session(plan.session_id)
+                if not session or session.state != plan.state:
+                    return
+
+                logger.info(f"🩹 恢复会话 {session.id}: {plan.action}（{plan.reason}）")
+                action = plan.action
+
+                if action == RecoveryAction.WATCH_REVIEWS:
+                    self._watch_review_round(plan.round_id)
+                    return
+
+                if action == RecoveryAction.REQUEST_OUTLINES:
+                    await self._request_outlines(session)
+
+                elif action == RecoveryAction.RESUME_WRITING:
+                    await self._request_writing(session, completed_sections=plan.completed_sections)
+
+                elif action in (RecoveryAction.REVIEW_DRAFT, RecoveryAction.REVIEW_OPTIMIZED):
+                    draft = self.db.get_draft(plan.draft_id)
+                    if not draft:
+                        return
+                    session.state = SessionState.REVIEWING
+                    session.draft_id = plan.draft_id
+                    await self.session_manager.update_session(session)
+                    await self._start_review_round(
+                        session.id,
+                        plan.draft_id,
+                        draft,
+                        incremental=action == RecoveryAction.REVIEW_OPTIMIZED or session.optimization_count > 0
+                    )
+
+                elif action == RecoveryAction.REDISPATCH_REVIEWS:
+                    round_data = self.review_orchestrator.reopen_deadlines(plan.round_id, plan.review_types)
+                    review_draft = self.session_recovery.review_draft_for(round_data) if round_data else None
+                    if review_draft:
+                        await self._dispatch_review_request(round_data, review_draft, plan.review_types)
+                    self._watch_review_round(plan.round_id)
+
+                elif action == RecoveryAction.RERUN_COMBINED_REVIEW:
+                    round_data = self.review_orchestrator.reopen_deadlines(plan.round_id, plan.review_types)
+                    review_draft = self.session_recovery.review_draft_for(round_data) if round_data else None
+                    if review_draft:
+                        # 合并审查会获取会话锁，在后台执行
+                        asyncio.create_task(self._run_combined_review(round_data, review_draft))
+                    self._watch_review_round(plan.round_id)
+
+                elif action == RecoveryAction.SEND_REVIEW_SUMMARY:
+                    round_data = self.review_orchestrator.get_round(plan.round_id)
+                    if round_data:
+                        await self._send_review_summary(session.id, self.review_orchestrator.aggregate(round_data))
+                    return
+
+                elif action == RecoveryAction.RESUME_OPTIMIZATION:
+                    await self._send_optimize_request(session)
+
+                await self._send_message(
+                    f"🩹 服务重启后已恢复「{session.topic or '创作'}」的进度：{plan.reason}，继续处理中..."
+                )
+
+        except Exception as e:
+            logger.error(f"❌ 恢复会话失败: {plan.session_id}: {e}", exc_info=True)
 
     def _is_agent_message(self, user_id: str) -> bool:
-        """检查是否是 Agent 消息"""
-        return user_id in self.AGENT_IDS
+        """检查是否是 Agent 消息（包括分片运行时的其他协调器实例）"""
+        return user_id in self.AGENT_IDS or user_id.startswith(f"{self.default_agent_id}-")
 
     def _is_mention_critic(self, text: str) -> bool:
         """检查是否是 @ 评论员的消息"""
@@ -195,35 +370,46 @@ class CreationCoordinator(WorkerAgent):
             if self._is_mention_critic(text):
                 return
 
-            # 获取或创建会话
-            session = await self.session_manager.get_or_create_session(user_id)
-            logger.info(f"📨 收到用户消息: user={user_id}, state={session.state}, text={text[:50]}...")
-
-            # 使用 LLM 识别意图
-            from tools.intent_detector import UserIntent
-
-            intent_context = {
-                "topic": session.topic,
-                "outline_count": len(session.outline_ids) if session.outline_ids else 0
-            }
-
-            intent_result = await self.intent_detector.detect_intent(
-                user_input=text,
-                current_state=session.state,
-                context=intent_context
-            )
-
-            logger.info(f"🧠 意图识别: {intent_result.intent.value} (置信度: {intent_result.confidence:.2f})")
-            logger.info(f"   推理: {intent_result.reasoning}")
-            logger.info(f"   提取数据: {intent_result.extracted_data}")
+            # 分片运行时只处理本分片负责的用户
+            if not self.shard_router.owns_user(user_id):
+                return
 
-            # 根据意图和状态路由处理
-            await self._route_by_intent(session, text, intent_result)
+            # 获取或创建会话，在会话锁内处理（与该会话的异步事件串行）
+            session = await self.session_manager.get_or_create_session(user_id)
+            async with self._session_locks(session.id):
+                await self._process_user_message(session.id, text)
 
         except Exception as e:
             logger.error(f"❌ 处理用户消息失败: {e}", exc_info=True)
             await self._send_message(f"❌ 处理失败: {str(e)}")
 
+    async def _process_user_message(self, session_id: str, text: str):
+        """识别意图并路由（调用方需持有会话锁）"""
+        # 加锁后重新读取会话，拿到之前的事件处理写入的最新状态
+        session = await self.session_manager.get_session(session_id)
+        if not session:
+            return
+        logger.info(f"📨 收到用户消息: user={session.user_id}, state={session.state}, text={text[:50]}...")
+
+        # 识别意图（规则快速通道优先，无法确定时调用 LLM）
+        intent_context = {
+            "topic": session.topic,
+            "outline_count": len(session.outline_ids) if session.outline_ids else 0
+        }
+
+        intent_result = await self.intent_detector.detect_intent(
+            user_input=text,
+            current_state=session.state,
+            context=intent_context
+        )
+
+        logger.info(f"🧠 意图识别: {intent_result.intent.value} (置信度: {intent_result.confidence:.2f})")
+        logger.info(f"   推理: {intent_result.reasoning}")
+        logger.info(f"   提取数据: {intent_result.extracted_data}")
+
+        # 根据意图和状态路由处理
+        await self._route_by_intent(session, text, intent_result)
+
     async def _route_by_intent(self, session, text: str, intent_result):
         """根据意图和状态路由到对应处理器"""
         from tools.intent_detector import UserIntent
@@ -465,6 +651,7 @@ class CreationCoordinator(WorkerAgent):
     async def _start_writing(self, session):
         """开始写作"""
         session.state = SessionState.WRITING
+        session.section_contents = {}
         await self.session_manager.update_session(session)
 
         await self._send_message(
@@ -519,22 +706,28 @@ class CreationCoordinator(WorkerAgent):
         session.optimization_count += 1
         await self.session_manager.update_session(session)
 
+        await self._send_optimize_request(session)
+
+        await self._send_message(
+            f"🔧 正在根据评审建议优化文章...\n\n"
+            f"（第 {session.optimization_count} 次优化）"
+        )
+
+    async def _send_optimize_request(self, session):
+        """发送优化请求事件"""
         event = Event(
             event_name="creation.optimize_draft",
             source_id=self.agent_id,
             payload={
                 "session_id": session.id,
                 "draft_id": session.draft_id,
-                "suggestions": session.review_suggestions
+                "suggestions": session.review_suggestions,
+                # 完整审查报告用于把建议定位到具体章节
+                "full_reviews": getattr(session, 'full_reviews', {}) or {}
             }
         )
         await self.send_event(event)
 
-        await self._send_message(
-            f"🔧 正在根据评审建议优化文章...\n\n"
-            f"（第 {session.optimization_count} 次优化）"
-        )
-
     async def _finish_creation(self, session):
         """完成创作"""
         session.state = SessionState.COMPLETED
@@ -841,17 +1034,26 @@ class CreationCoordinator(WorkerAgent):
         await self.send_event(event)
         logger.info(f"✅ 已发送大纲生成请求: session={session.id}")
 
-    async def _request_writing(self, session):
-        """发送写作请求"""
+    async def _request_writing(self, session, completed_sections: Optional[Dict[str, str]] = None):
+        """
+        发送写作请求
+
+        Args:
+            session: 会话
+            completed_sections: 已完成章节 {章节索引: 正文}（恢复写作时跳过这些章节）
+        """
+        payload = {
+            "session_id": session.id,
+            "outline_id": session.selected_outline_id,
+            "topic": session.topic,
+            "writing_mode": session.writing_mode
+        }
+        if completed_sections:
+            payload["completed_sections"] = completed_sections
         event = Event(
             event_name="creation.start_writing",
             source_id=self.agent_id,
-            payload={
-                "session_id": session.id,
-                "outline_id": session.selected_outline_id,
-                "topic": session.topic,
-                "writing_mode": session.writing_mode
-            }
+            payload=payload
         )
         await self.send_event(event)
         logger.info(f"✅ 已发送写作请求: session={session.id}")
@@ -859,6 +1061,7 @@ class CreationCoordinator(WorkerAgent):
     # ==================== 事件处理器 ====================
 
     @on_event("creation.materials_found")
+    @_serialized_by_session
     async def handle_materials_found(self, context):
         """处理素材搜索完成事件"""
         try:
@@ -915,6 +1118,7 @@ class CreationCoordinator(WorkerAgent):
             logger.error(f"❌ 处理素材搜索结果失败: {e}", exc_info=True)
 
     @on_event("creation.outlines_ready")
+    @_serialized_by_session
     async def handle_outlines_ready(self, context):
         """处理大纲生成完成事件"""
         try:
@@ -983,6 +1187,7 @@ class CreationCoordinator(WorkerAgent):
             logger.error(f"❌ 处理大纲完成事件失败: {e}", exc_info=True)
 
     @on_event("creation.outline_modified")
+    @_serialized_by_session
     async def handle_outline_modified(self, context):
         """处理大纲修改完成事件"""
         try:
@@ -1017,6 +1222,7 @@ class CreationCoordinator(WorkerAgent):
             logger.error(f"❌ 处理大纲修改事件失败: {e}", exc_info=True)
 
     @on_event("creation.writing_progress")
+    @_serialized_by_session
     async def handle_writing_progress(self, context):
         """处理写作进度事件"""
         try:
@@ -1031,9 +1237,12 @@ class CreationCoordinator(WorkerAgent):
             if not session:
                 return
 
-            # 更新进度
+            # 更新进度；已完成章节的正文持久化到附表，重启后可以从未完成的章节继续写作
             session.current_section_index = section_index
             session.total_sections = total_sections
+            if status == 'completed' and event_data.get('section_content'):
+                session.section_contents[str(section_index)] = event_data['section_content']
+                session.mark_dirty('section_contents')
             await self.session_manager.update_session(session)
 
             if status == 'started':
@@ -1049,6 +1258,7 @@ class CreationCoordinator(WorkerAgent):
             logger.error(f"❌ 处理写作进度事件失败: {e}", exc_info=True)
 
     @on_event("creation.draft_ready")
+    @_serialized_by_session
     async def handle_draft_ready(self, context):
         """处理文章完成事件"""
         try:
@@ -1069,16 +1279,12 @@ class CreationCoordinator(WorkerAgent):
             session.draft_id = draft_id
             await self.session_manager.update_session(session)
 
-            # 初始化评审追踪
-            self.pending_reviews[session_id] = {
-                'sensitive': None,
-                'ai_flavor': None,
-                'public_opinion': None,
-                'suggestions': [],
-                'count': 0,
-                'full_reviews': {},
-                'draft_title': draft.get('title', '')
-            }
+            # 共享取稿：事件中没有完整草稿时从数据库读取一次，随评审请求下发给所有评审员
+            if not draft.get('content') and draft_id:
+                draft = self.db.get_draft(draft_id) or draft
+
+            # 开始新一轮评审
+            await self._start_review_round(session_id, draft_id, draft)
 
             # 发送结果给用户
             msg = f"✅ **初稿完成！**\n\n\n\n"
@@ -1096,6 +1302,7 @@ class CreationCoordinator(WorkerAgent):
             logger.error(f"❌ 处理文章完成事件失败: {e}", exc_info=True)
 
     @on_event("creation.review_completed")
+    @_serialized_by_session
     async def handle_review_completed(self, context):
         """收集评审结果并汇总"""
         try:
@@ -1106,43 +1313,229 @@ class CreationCoordinator(WorkerAgent):
             suggestions = event_data.get('suggestions', [])
             verdict = event_data.get('verdict', '')
             full_review = event_data.get('full_review', {})
-            draft_title = event_data.get('draft_title', '')
 
             if not session_id or not review_type:
                 return
 
             logger.info(f"📊 收到评审结果: session={session_id}, type={review_type}, score={score}")
 
-            # 初始化评审追踪
-            if session_id not in self.pending_reviews:
-                self.pending_reviews[session_id] = {
-                    'sensitive': None,
-                    'ai_flavor': None,
-                    'public_opinion': None,
-                    'suggestions': [],
-                    'count': 0,
-                    'full_reviews': {},  # 保存完整评审数据
-                    'draft_title': draft_title
-                }
-
-            # 记录评审结果
-            self.pending_reviews[session_id][review_type] = {
-                'score': score,
-                'verdict': verdict
-            }
-            self.pending_reviews[session_id]['suggestions'].extend(suggestions)
-            self.pending_reviews[session_id]['count'] += 1
-            # 保存完整评审数据用于按需展示
-            self.pending_reviews[session_id]['full_reviews'][review_type] = full_review
+            # 记录评审结果（迟到或不属于当前轮次的结果会被丢弃）
+            round_data = self.review_orchestrator.record_result(
+                session_id=session_id,
+                review_type=review_type,
+                result={
+                    'score': score,
+                    'verdict': verdict,
+                    'suggestions': suggestions,
+                    'full_review': full_review
+                },
+                round_id=event_data.get('round_id')
+            )
+            if not round_data:
+                return
 
             # 检查是否所有评审都完成
-            reviews = self.pending_reviews[session_id]
-            if reviews['count'] >= 3:
-                await self._send_review_summary(session_id, reviews)
+            if self.review_orchestrator.is_settled(round_data):
+                await self._complete_review_round(round_data['id'])
 
         except Exception as e:
             logger.error(f"❌ 处理评审完成事件失败: {e}", exc_info=True)
 
+    async def _start_review_round(
+        self,
+        session_id: str,
+        draft_id: str,
+        draft: dict,
+        incremental: bool = False
+    ) -> Optional[dict]:
+        """
+        开始一轮评审并分发
+
+        增量模式下与上一轮评审时的章节哈希比较，只把修改过的章节发给评审员；
+        没有章节修改时直接沿用上一轮结果汇总。
+
+        Returns:
+            增量复审的修改范围（完整评审时为 None）
+        """
+        content = draft.get('content', '')
+        base, diff = (None, None)
+        if incremental:
+            base, diff = self.review_orchestrator.plan_incremental(session_id, content)
+
+        if not base:
+            review_draft = draft
+            scope = None
+        else:
+            scope = {k: v for k, v in diff.items() if not k.endswith('_text')}
+            review_draft = {
+                'title': draft.get('title', ''),
+                'content': diff['changed_text'],
+                'word_count': len(diff['changed_text'].replace(' ', '').replace('\n', ''))
+            }
+            logger.info(
+                f"🧮 增量复审: 修改 {len(diff['changed'])} 个章节，复用 {len(diff['unchanged'])} 个章节 "
+                f"({diff['changed_ratio']:.0%})"
+            )
+
+        # 短稿先本地预检再合并为一次调用，否则并发分发给三位评审员
+        combine = self.review_orchestrator.should_combine(review_draft)
+        round_data = self.review_orchestrator.start_round(
+            session_id=session_id,
+            draft_id=draft_id,
+            draft_title=draft.get('title', ''),
+            review_types=None if not base or diff['changed'] else [],
+            content=content,
+            base_round_id=base['id'] if base else None,
+            scope=scope,
+            mode=RoundMode.COMBINED if combine else RoundMode.DISPATCH
+        )
+
+        review_types = list(round_data['deadlines'].keys())
+        if not review_types:
+            await self._complete_review_round(round_data['id'])
+            return scope
+
+        if combine:
+            asyncio.create_task(self._run_combined_review(round_data, review_draft))
+        else:
+            await self._dispatch_review_request(round_data, review_draft, review_types)
+        self._watch_review_round(round_data['id'])
+        return scope
+
+    async def _dispatch_review_request(self, round_data: dict, draft: dict, review_types: List[str]):
+        """向评审员发送评审请求（草稿随请求下发，评审员无需再各自取稿）"""
+        await self.send_event(Event(
+            event_name="creation.review_request",
+            source_id=self.agent_id,
+            payload={
+                "session_id": round_data['session_id'],
+                "draft_id": round_data['draft_id'],
+                "round_id": round_data['id'],
+                "review_types": review_types,
+                "deadlines": round_data['deadlines'],
+                "draft": {
+                    "title": draft.get('title', ''),
+                    "content": draft.get('content', ''),
+                    "word_count": draft.get('word_count', 0)
+                }
+            }
+        ))
+
+    async def _run_combined_review(self, round_data: dict, draft: dict):
+        """
+        合并审查：本地预检后，一次 LLM 调用同时生成其余视角的审查报告
+
+        本地预检能确定结果的视角（敏感词扫描无命中、AI味评分明显较低）直接记录本地结果；只剩一个视角时
+        交给对应评审员（评审员自己的片段复核比整篇调用更省）。
+        缺失或格式不完整的部分回退为单独评审请求；合并调用最多占用截止时间的一半，
+        为回退留出时间
+        """
+        from config.prompts import critic_combined
+
+        round_id = round_data['id']
+        review_types = self.review_orchestrator.outstanding(round_data)
+        results = self.review_orchestrator.local_reviews(draft, review_types)
+        remaining = [t for t in review_types if t not in results]
+        missing = remaining
+
+        if len(remaining) > 1:
+            combined = None
+            try:
+                system_prompt, user_prompt = critic_combined.format_prompt(
+                    title=draft.get('title', '未命名'),
+                    word_count=draft.get('word_count', 0),
+                    content=draft.get('content', ''),
+                    review_types=remaining
+                )
+                budget = (min(round_data['deadlines'][t] for t in remaining) - datetime.now().timestamp()) / 2
+                combined = await asyncio.wait_for(
+                    self.llm.generate_json(
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        temperature=0.7,
+                        max_tokens=12000,
+                        prompt_name=critic_combined.get_prompt(remaining).name
+                    ),
+                    timeout=max(budget, 1)
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"⏱️  合并审查超时，回退为单独评审: round={round_id}")
+            except Exception as e:
+                logger.error(f"❌ 合并审查失败，回退为单独评审: {e}")
+
+            combined_results, missing = self.review_orchestrator.split_combined_review(combined, remaining)
+            results.update(combined_results)
+
+        # LLM 调用不持锁，记录结果和结束轮次时与该会话的事件处理串行
+        async with self._session_locks(round_data['session_id']):
+            latest = None
+            for review_type, result in results.items():
+                latest = self.review_orchestrator.record_result(
+                    session_id=round_data['session_id'],
+                    review_type=review_type,
+                    result=result,
+                    round_id=round_id
+                ) or latest
+
+            logger.info(f"🧩 合并审查完成: round={round_id}, ok={list(results)}, fallback={missing}")
+
+            if missing:
+                # 之后由评审员返回结果，重启恢复时按单独评审处理
+                self.review_orchestrator.set_mode(round_id, RoundMode.DISPATCH)
+                await self._dispatch_review_request(round_data, draft, missing)
+            elif latest and self.review_orchestrator.is_settled(latest):
+                await self._complete_review_round(round_id)
+
+    def _watch_review_round(self, round_id: str):
+        """为评审轮次启动截止时间监视任务"""
+        if round_id in self._review_watchers:
+            return
+        task = asyncio.create_task(self._review_deadline_loop(round_id))
+        self._review_watchers[round_id] = task
+        task.add_done_callback(lambda _: self._review_watchers.pop(round_id, None))
+
+    async def _review_deadline_loop(self, round_id: str):
+        """
+        等待评审轮次的截止时间
+
+        每个评审员有独立的截止时间；到达最早的未返回截止时间后重新检查，
+        所有未返回的评审员都超时后以部分结果汇总。
+        """
+        try:
+            while True:
+                round_data = self.review_orchestrator.get_round(round_id)
+                if not round_data or round_data['status'] != 'pending':
+                    return
+
+                now = datetime.now().timestamp()
+                if self.review_orchestrator.is_settled(round_data, now):
+                    async with self._session_locks(round_data['session_id']):
+                        await self._complete_review_round(round_id)
+                    return
+
+                next_deadline = self.review_orchestrator.next_deadline(round_data)
+                await asyncio.sleep(max(0.5, next_deadline - now))
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"❌ 评审截止时间监视失败: {e}", exc_info=True)
+
+    async def _complete_review_round(self, round_id: str):
+        """结束评审轮次并发送汇总（多次调用只会汇总一次；调用方需持有会话锁）"""
+        round_data = self.review_orchestrator.finalize_round(round_id)
+        if not round_data:
+            return
+
+        watcher = self._review_watchers.pop(round_id, None)
+        if watcher and watcher is not asyncio.current_task():
+            watcher.cancel()
+
+        reviews = self.review_orchestrator.aggregate(round_data)
+        if reviews['missing']:
+            logger.warning(f"⏱️  评审超时，使用部分结果汇总: round={round_id}, missing={reviews['missing']}")
+
+        await self._send_review_summary(round_data['session_id'], reviews)
+
     async def _send_review_summary(self, session_id: str, reviews: dict):
         """发送审查汇总并询问是否优化"""
         try:
@@ -1150,9 +1543,10 @@ class CreationCoordinator(WorkerAgent):
             if not session:
                 return
 
-            sensitive = reviews.get('sensitive', {}).get('score', 0) or 0
-            ai_flavor = reviews.get('ai_flavor', {}).get('score', 0) or 0
-            public_opinion = reviews.get('public_opinion', {}).get('score', 0) or 0
+            sensitive = (reviews.get('sensitive') or {}).get('score', 0) or 0
+            ai_flavor = (reviews.get('ai_flavor') or {}).get('score', 0) or 0
+            public_opinion = (reviews.get('public_opinion') or {}).get('score', 0) or 0
+            missing = reviews.get('missing', [])
 
             scores = [s for s in [sensitive, ai_flavor, public_opinion] if s > 0]
             avg_score = sum(scores) / len(scores) if scores else 0
@@ -1174,11 +1568,21 @@ class CreationCoordinator(WorkerAgent):
             msg = "\n\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
             msg += "🔍 **三维度审查汇总**\n\n"
             msg += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n\n\n"
-            msg += f"🚫 敏感词审查: **{sensitive}/10**\n\n"
-            msg += f"🤖 AI味审查: **{ai_flavor}/10**\n\n"
-            msg += f"🔥 舆情审查: **{public_opinion}/10**\n\n\n\n"
+            msg += f"🚫 敏感词审查: **{'超时' if 'sensitive' in missing else f'{sensitive}/10'}**\n\n"
+            msg += f"🤖 AI味审查: **{'超时' if 'ai_flavor' in missing else f'{ai_flavor}/10'}**\n\n"
+            msg += f"🔥 舆情审查: **{'超时' if 'public_opinion' in missing else f'{public_opinion}/10'}**\n\n\n\n"
             msg += f"📊 **综合评分: {avg_score:.1f}/10**\n\n\n\n"
 
+            scope = reviews.get('scope')
+            if scope:
+                msg += (
+                    f"🧮 增量复审：重新评审 {len(scope.get('changed', []))} 个修改章节，"
+                    f"沿用 {len(scope.get('unchanged', []))} 个未修改章节的评审结果\n\n\n\n"
+                )
+
+            if missing:
+                msg += f"⏱️ 部分评审员未在截止时间内返回，以上为部分结果\n\n\n\n"
+
             # 显示主要建议
             suggestions = session.review_suggestions
             if suggestions:
@@ -1208,11 +1612,13 @@ class CreationCoordinator(WorkerAgent):
             logger.error(f"❌ 发送评审汇总失败: {e}", exc_info=True)
 
     @on_event("creation.optimization_done")
+    @_serialized_by_session
     async def handle_optimization_done(self, context):
-        """处理优化完成事件"""
+        """处理优化完成事件：展示改进内容并对修改过的章节做增量复审"""
         try:
             event_data = context.incoming_event.payload
             session_id = event_data.get('session_id')
+            draft_id = event_data.get('draft_id')
             new_draft = event_data.get('draft', {})
             improvements = event_data.get('improvements', [])
 
@@ -1220,8 +1626,8 @@ class CreationCoordinator(WorkerAgent):
             if not session:
                 return
 
-            # 更新状态
-            session.state = SessionState.COMPLETED
+            # 更新状态为评审中
+            session.state = SessionState.REVIEWING
             await self.session_manager.update_session(session)
 
             msg = f"🎉 **优化完成！**\n\n\n\n"
@@ -1234,11 +1640,20 @@ class CreationCoordinator(WorkerAgent):
                     msg += f"   • {imp}\n\n"
                 msg += "\n\n"
 
-            msg += f"📚 已保存到知识库\n\n"
-            msg += f"💡 输入新主题开始下一篇创作"
+            msg += f"🔍 正在对修改过的章节进行复审..."
 
             await self._send_message(msg)
 
+            if not new_draft.get('content') and draft_id:
+                new_draft = self.db.get_draft(draft_id) or new_draft
+
+            await self._start_review_round(
+                session_id,
+                draft_id or session.draft_id,
+                new_draft,
+                incremental=True
+            )
+
         except Exception as e:
             logger.error(f"❌ 处理优化完成事件失败: {e}", exc_info=True)
 
@@ -1270,7 +1685,10 @@ async def main():
     sys.stdout.reconfigure(line_buffering=True)
     sys.stderr.reconfigure(line_buffering=True)
 
-    agent = CreationCoordinator()
+    # 分片运行时每个实例使用独立的 Agent ID（如 创作协调器-1）
+    agent = CreationCoordinator(
+        agent_id=get_shard_router().agent_id(CreationCoordinator.default_agent_id)
+    )
 
     try:
         await agent.async_start(
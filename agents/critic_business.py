@@ -7,12 +7,15 @@ AI味审查员 Agent - 检测AI生成痕迹，提升内容人味
 - 支持 @ 触发：在「创作工坊」频道 @AI味审查 审查最近文章
 - 检测AI生成痕迹、语言自然度、情感真实性等
 - 给出人性化改写建议
+- 本地统计评分预筛：AI 味明显较低的草稿不调用 LLM，其余只发送典型句子
 """
 
 import asyncio
 import re
 import sys
+import time
 from pathlib import Path
+from datetime import datetime
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -26,6 +29,8 @@ from openagents.agents.worker_agent import WorkerAgent, on_event
 from openagents.models.event import Event
 from tools.llm_client import get_llm_client
 from tools.database import get_database
+from tools.metrics_store import get_metrics_store, PipelineMetric
+from tools.ai_flavor_scorer import get_ai_flavor_scorer
 from config.prompts import critic_business
 import logging
 
@@ -36,11 +41,16 @@ class AIFlavorReviewerAgent(WorkerAgent):
     """AI味审查员 Agent - 检测AI痕迹提升人味"""
 
     default_agent_id = "AI味审查"
+
+    # 创作工坊评审类型（与 creation.review_request 中的 review_types 对应）
+    REVIEW_TYPE = "ai_flavor"
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.llm = get_llm_client()
         self.db = get_database()
+        self.metrics = get_metrics_store()
+        self.scorer = get_ai_flavor_scorer()
     
     async def on_startup(self):
         """Agent 启动时执行"""
@@ -154,34 +164,48 @@ class AIFlavorReviewerAgent(WorkerAgent):
             return None
 
     async def _generate_draft_review(self, draft: dict) -> dict:
-        """为文章草稿生成AI味审查"""
+        """
+        为文章草稿生成AI味审查
+
+        先用本地统计模型评分：AI 味明显较低时直接返回本地结果；
+        否则只把 AI 味最重的句子交给 LLM 复核，LLM 失败时回退到本地结果
+        """
         try:
             title = draft.get('title', '未命名')
             content = draft.get('content', '')
             word_count = draft.get('word_count', 0)
 
-            # 构建审查提示词
-            system_prompt = critic_business.SYSTEM_PROMPT
-            user_prompt = f"""请对以下自媒体文章进行AI味审查：
-
-**标题**: {title}
-**字数**: {word_count}
+            report = self.scorer.score(content)
+            local_review = self.scorer.build_local_review(report)
+            logger.info(f"📐 本地 AI 味评分: {report.score} ({title})")
 
-**文章内容**:
-{content[:3000]}
+            if report.clearly_low:
+                return local_review
 
-{'...(内容已截取)' if len(content) > 3000 else ''}
-
-请检测文章的AI生成痕迹，并给出人性化改写建议。"""
+            # 构建审查提示词
+            system_prompt, user_prompt = critic_business.format_sentences_prompt(
+                title=title,
+                word_count=word_count,
+                local_score=report.score,
+                features=report.features,
+                sentences=report.top_sentences
+            )
 
             # 调用 LLM
             result = await self.llm.generate_json(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=8000
+                max_tokens=8000,
+                prompt_name=critic_business.SENTENCES_PROMPT.name
             )
 
+            if not result or 'overall_score' not in result:
+                logger.warning(f"LLM 复核失败，使用本地 AI 味评分结果: {title}")
+                return local_review
+
+            result['local_score'] = report.score
+            result['review_mode'] = 'sentences'
             return result
 
         except Exception as e:
@@ -253,27 +277,42 @@ class AIFlavorReviewerAgent(WorkerAgent):
 
     # ========== 创作工坊文章自动审查 ==========
 
-    @on_event("creation.draft_ready")
-    async def handle_draft_ready(self, context):
+    @on_event("creation.review_request")
+    async def handle_review_request(self, context):
         """
         自动审查创作工坊完成的文章
-        当 Writer 完成文章后自动触发
+        由 CreationCoordinator 在初稿完成后发出评审请求，草稿随请求下发
         """
         try:
             event_data = context.incoming_event.payload
             draft = event_data.get('draft', {})
             session_id = event_data.get('session_id')
             draft_id = event_data.get('draft_id')
+            round_id = event_data.get('round_id')
+
+            # 只处理分配给本评审员的评审类型
+            review_types = event_data.get('review_types') or [self.REVIEW_TYPE]
+            if self.REVIEW_TYPE not in review_types:
+                return
 
             if not draft:
-                logger.warning("收到 creation.draft_ready 但没有 draft 数据")
+                logger.warning("收到 creation.review_request 但没有 draft 数据")
                 return
 
             title = draft.get('title', '未命名')
             logger.info(f"🤖 自动审查创作文章: {title}")
 
-            # 生成审查
-            review_data = await self._generate_draft_review(draft)
+            # 生成审查（超过截止时间则放弃，协调器会以部分结果汇总）
+            deadline = (event_data.get('deadlines') or {}).get(self.REVIEW_TYPE)
+            timeout = deadline - datetime.now().timestamp() if deadline else None
+            started = time.monotonic()
+            try:
+                review_data = await asyncio.wait_for(self._generate_draft_review(draft), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.metrics.record(PipelineMetric.REVIEW, (time.monotonic() - started) * 1000, error=True)
+                logger.warning(f"⏱️  审查超过截止时间，已放弃: {title}")
+                return
+            self.metrics.record(PipelineMetric.REVIEW, (time.monotonic() - started) * 1000, error=not review_data)
 
             if review_data:
                 # 不直接发送详细报告，而是通过事件传递完整数据
@@ -286,7 +325,8 @@ class AIFlavorReviewerAgent(WorkerAgent):
                     payload={
                         "session_id": session_id,
                         "draft_id": draft_id,
-                        "review_type": "ai_flavor",
+                        "round_id": round_id,
+                        "review_type": self.REVIEW_TYPE,
                         "overall_score": review_data.get('overall_score', 0),
                         "verdict": review_data.get('verdict', ''),
                         "suggestions": review_data.get('humanization_tips', []),
@@ -301,7 +341,7 @@ class AIFlavorReviewerAgent(WorkerAgent):
                 logger.error(f"❌ AI味自动审查失败: {title}")
 
         except Exception as e:
-            logger.error(f"❌ 处理 creation.draft_ready 失败: {e}", exc_info=True)
+            logger.error(f"❌ 处理 creation.review_request 失败: {e}", exc_info=True)
 
     # ========== RSS 内容自动评审功能 ==========
 
@@ -369,7 +409,8 @@ class AIFlavorReviewerAgent(WorkerAgent):
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=8000
+                max_tokens=8000,
+                prompt_name=critic_business.PROMPT.name
             )
             
             if not result:
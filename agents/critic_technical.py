@@ -6,13 +6,16 @@
 - 监听 content.tagged 事件自动审查
 - 支持 @ 触发：在「创作工坊」频道 @敏感词审查 审查最近文章
 - 检测政治敏感、广告违禁词、低俗内容等
+- 草稿先经本地词库（Aho-Corasick）扫描，无命中跳过 LLM，有命中只发送命中片段复核
 - 给出合规评分和修改建议
 """
 
 import asyncio
 import re
 import sys
+import time
 from pathlib import Path
+from datetime import datetime
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -26,6 +29,8 @@ from openagents.agents.worker_agent import WorkerAgent, on_event
 from openagents.models.event import Event
 from tools.llm_client import get_llm_client
 from tools.database import get_database
+from tools.metrics_store import get_metrics_store, PipelineMetric
+from tools.sensitive_scanner import get_sensitive_scanner
 from config.prompts import critic_technical
 import logging
 
@@ -36,11 +41,16 @@ class SensitiveWordReviewerAgent(WorkerAgent):
     """敏感违禁词审查员 Agent - 内容合规审查"""
 
     default_agent_id = "敏感词审查"
+
+    # 创作工坊评审类型（与 creation.review_request 中的 review_types 对应）
+    REVIEW_TYPE = "sensitive"
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.llm = get_llm_client()
         self.db = get_database()
+        self.metrics = get_metrics_store()
+        self.scanner = get_sensitive_scanner()
     
     async def on_startup(self):
         """Agent 启动时执行"""
@@ -154,34 +164,47 @@ class SensitiveWordReviewerAgent(WorkerAgent):
             return None
 
     async def _generate_draft_review(self, draft: dict) -> dict:
-        """为文章草稿生成敏感词审查"""
+        """
+        为文章草稿生成敏感词审查
+
+        先用本地词库扫描全文：无命中直接返回本地结果，
+        有命中时只把命中片段及上下文交给 LLM 复核
+        """
         try:
             title = draft.get('title', '未命名')
             content = draft.get('content', '')
             word_count = draft.get('word_count', 0)
 
-            # 构建审查提示词
-            system_prompt = critic_technical.SYSTEM_PROMPT
-            user_prompt = f"""请对以下自媒体文章进行敏感违禁词审查：
+            scan = self.scanner.scan(content)
+            if scan.is_clean:
+                logger.info(f"✅ 本地词库未命中，跳过 LLM 审查: {title}")
+                return self.scanner.build_local_review(scan)
 
-**标题**: {title}
-**字数**: {word_count}
+            hit_summary = "，".join(f"{name} {count} 处" for name, count in scan.categories().items())
+            logger.info(f"🔎 本地词库命中 {len(scan.hits)} 处（{hit_summary}），提交片段复核: {title}")
 
-**文章内容**:
-{content[:3000]}
-
-{'...(内容已截取)' if len(content) > 3000 else ''}
-
-请仔细检查是否存在敏感词、违禁词、违规表述等问题。"""
+            # 构建审查提示词（只包含命中片段）
+            system_prompt, user_prompt = critic_technical.format_spans_prompt(
+                title=title,
+                word_count=word_count,
+                spans=self.scanner.extract_spans(content, scan),
+                hit_summary=hit_summary
+            )
 
             # 调用 LLM
             result = await self.llm.generate_json(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=8000
+                max_tokens=8000,
+                prompt_name=critic_technical.SPANS_PROMPT.name
             )
 
+            if not result:
+                logger.warning(f"⚠️  LLM 复核失败，使用本地扫描结果: {title}")
+                return self.scanner.build_local_review(scan)
+
+            result['review_mode'] = 'spans'
             return result
 
         except Exception as e:
@@ -250,27 +273,42 @@ class SensitiveWordReviewerAgent(WorkerAgent):
 
     # ========== 创作工坊文章自动审查 ==========
 
-    @on_event("creation.draft_ready")
-    async def handle_draft_ready(self, context):
+    @on_event("creation.review_request")
+    async def handle_review_request(self, context):
         """
         自动审查创作工坊完成的文章
-        当 Writer 完成文章后自动触发
+        由 CreationCoordinator 在初稿完成后发出评审请求，草稿随请求下发
         """
         try:
             event_data = context.incoming_event.payload
             draft = event_data.get('draft', {})
             session_id = event_data.get('session_id')
             draft_id = event_data.get('draft_id')
+            round_id = event_data.get('round_id')
+
+            # 只处理分配给本评审员的评审类型
+            review_types = event_data.get('review_types') or [self.REVIEW_TYPE]
+            if self.REVIEW_TYPE not in review_types:
+                return
 
             if not draft:
-                logger.warning("收到 creation.draft_ready 但没有 draft 数据")
+                logger.warning("收到 creation.review_request 但没有 draft 数据")
                 return
 
             title = draft.get('title', '未命名')
             logger.info(f"🚫 自动审查创作文章: {title}")
 
-            # 生成审查
-            review_data = await self._generate_draft_review(draft)
+            # 生成审查（超过截止时间则放弃，协调器会以部分结果汇总）
+            deadline = (event_data.get('deadlines') or {}).get(self.REVIEW_TYPE)
+            timeout = deadline - datetime.now().timestamp() if deadline else None
+            started = time.monotonic()
+            try:
+                review_data = await asyncio.wait_for(self._generate_draft_review(draft), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.metrics.record(PipelineMetric.REVIEW, (time.monotonic() - started) * 1000, error=True)
+                logger.warning(f"⏱️  审查超过截止时间，已放弃: {title}")
+                return
+            self.metrics.record(PipelineMetric.REVIEW, (time.monotonic() - started) * 1000, error=not review_data)
 
             if review_data:
                 # 不直接发送详细报告，而是通过事件传递完整数据
@@ -283,7 +321,8 @@ class SensitiveWordReviewerAgent(WorkerAgent):
                     payload={
                         "session_id": session_id,
                         "draft_id": draft_id,
-                        "review_type": "sensitive",
+                        "round_id": round_id,
+                        "review_type": self.REVIEW_TYPE,
                         "overall_score": review_data.get('overall_score', 0),
                         "verdict": review_data.get('verdict', ''),
                         "suggestions": review_data.get('recommendations', []),
@@ -298,7 +337,7 @@ class SensitiveWordReviewerAgent(WorkerAgent):
                 logger.error(f"❌ 敏感词自动审查失败: {title}")
 
         except Exception as e:
-            logger.error(f"❌ 处理 creation.draft_ready 失败: {e}", exc_info=True)
+            logger.error(f"❌ 处理 creation.review_request 失败: {e}", exc_info=True)
 
     # ========== RSS 内容自动评审功能 ==========
 
@@ -371,7 +410,8 @@ class SensitiveWordReviewerAgent(WorkerAgent):
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=8000
+                max_tokens=8000,
+                prompt_name=critic_technical.PROMPT.name
             )
             
             if not result:
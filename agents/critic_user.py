@@ -12,7 +12,9 @@
 import asyncio
 import re
 import sys
+import time
 from pathlib import Path
+from datetime import datetime
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -26,6 +28,7 @@ from openagents.agents.worker_agent import WorkerAgent, on_event
 from openagents.models.event import Event
 from tools.llm_client import get_llm_client
 from tools.database import get_database
+from tools.metrics_store import get_metrics_store, PipelineMetric
 from config.prompts import critic_user
 import logging
 
@@ -36,11 +39,15 @@ class PublicOpinionReviewerAgent(WorkerAgent):
     """舆情风险审查员 Agent - 舆论风险评估"""
 
     default_agent_id = "舆情审查"
+
+    # 创作工坊评审类型（与 creation.review_request 中的 review_types 对应）
+    REVIEW_TYPE = "public_opinion"
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.llm = get_llm_client()
         self.db = get_database()
+        self.metrics = get_metrics_store()
     
     async def on_startup(self):
         """Agent 启动时执行"""
@@ -161,25 +168,19 @@ class PublicOpinionReviewerAgent(WorkerAgent):
             word_count = draft.get('word_count', 0)
 
             # 构建审查提示词
-            system_prompt = critic_user.SYSTEM_PROMPT
-            user_prompt = f"""请对以下自媒体文章进行舆情风险评估：
-
-**标题**: {title}
-**字数**: {word_count}
-
-**文章内容**:
-{content[:3000]}
-
-{'...(内容已截取)' if len(content) > 3000 else ''}
-
-请评估文章发布后可能引发的舆论风险，并给出风险规避建议。"""
+            system_prompt, user_prompt = critic_user.format_draft_prompt(
+                title=title,
+                word_count=word_count,
+                content=content
+            )
 
             # 调用 LLM
             result = await self.llm.generate_json(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=8000
+                max_tokens=8000,
+                prompt_name=critic_user.DRAFT_PROMPT.name
             )
 
             return result
@@ -258,27 +259,42 @@ class PublicOpinionReviewerAgent(WorkerAgent):
 
     # ========== 创作工坊文章自动审查 ==========
 
-    @on_event("creation.draft_ready")
-    async def handle_draft_ready(self, context):
+    @on_event("creation.review_request")
+    async def handle_review_request(self, context):
         """
         自动审查创作工坊完成的文章
-        当 Writer 完成文章后自动触发
+        由 CreationCoordinator 在初稿完成后发出评审请求，草稿随请求下发
         """
         try:
             event_data = context.incoming_event.payload
             draft = event_data.get('draft', {})
             session_id = event_data.get('session_id')
             draft_id = event_data.get('draft_id')
+            round_id = event_data.get('round_id')
+
+            # 只处理分配给本评审员的评审类型
+            review_types = event_data.get('review_types') or [self.REVIEW_TYPE]
+            if self.REVIEW_TYPE not in review_types:
+                return
 
             if not draft:
-                logger.warning("收到 creation.draft_ready 但没有 draft 数据")
+                logger.warning("收到 creation.review_request 但没有 draft 数据")
                 return
 
             title = draft.get('title', '未命名')
             logger.info(f"🔥 自动审查创作文章: {title}")
 
-            # 生成审查
-            review_data = await self._generate_draft_review(draft)
+            # 生成审查（超过截止时间则放弃，协调器会以部分结果汇总）
+            deadline = (event_data.get('deadlines') or {}).get(self.REVIEW_TYPE)
+            timeout = deadline - datetime.now().timestamp() if deadline else None
+            started = time.monotonic()
+            try:
+                review_data = await asyncio.wait_for(self._generate_draft_review(draft), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.metrics.record(PipelineMetric.REVIEW, (time.monotonic() - started) * 1000, error=True)
+                logger.warning(f"⏱️  审查超过截止时间，已放弃: {title}")
+                return
+            self.metrics.record(PipelineMetric.REVIEW, (time.monotonic() - started) * 1000, error=not review_data)
 
             if review_data:
                 # 不直接发送详细报告，而是通过事件传递完整数据
@@ -291,7 +307,8 @@ class PublicOpinionReviewerAgent(WorkerAgent):
                     payload={
                         "session_id": session_id,
                         "draft_id": draft_id,
-                        "review_type": "public_opinion",
+                        "round_id": round_id,
+                        "review_type": self.REVIEW_TYPE,
                         "overall_score": review_data.get('overall_score', 0),
                         "verdict": review_data.get('verdict', ''),
                         "suggestions": review_data.get('mitigation_suggestions', []),
@@ -306,7 +323,7 @@ class PublicOpinionReviewerAgent(WorkerAgent):
                 logger.error(f"❌ 舆情自动审查失败: {title}")
 
         except Exception as e:
-            logger.error(f"❌ 处理 creation.draft_ready 失败: {e}", exc_info=True)
+            logger.error(f"❌ 处理 creation.review_request 失败: {e}", exc_info=True)
 
     # ========== RSS 内容自动评审功能 ==========
 
@@ -374,7 +391,8 @@ class PublicOpinionReviewerAgent(WorkerAgent):
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=8000
+                max_tokens=8000,
+                prompt_name=critic_user.PROMPT.name
             )
             
             if not result:
@@ -106,7 +106,7 @@ class OutlineGeneratorAgent(WorkerAgent):
                 materials.append({
                     'id': content.get('id', ''),
                     'title': content.get('title', 'N/A'),
-                    'summary': content.get('summary_paragraph', content.get('raw_content', '')[:200]),
+                    'summary': content.get('summary_paragraph') or (content.get('raw_preview') or '')[:200],
                     'source': content.get('source', '未知'),
                     'tags': content.get('tags', [])
                 })
@@ -234,7 +234,8 @@ class OutlineGeneratorAgent(WorkerAgent):
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=4000
+                max_tokens=4000,
+                prompt_name="outline.modify"
             )
 
             if result:
@@ -278,7 +279,8 @@ class OutlineGeneratorAgent(WorkerAgent):
             outlines = await self._generate_outlines(
                 topic=topic,
                 related_contents=related_contents,
-                style=style
+                style=style,
+                session_id=session_id
             )
             
             # 保存大纲到数据库
@@ -374,10 +376,14 @@ class OutlineGeneratorAgent(WorkerAgent):
         self,
         topic: str,
         related_contents: List[Dict[str, Any]],
-        style: str
+        style: str,
+        session_id: str = ""
     ) -> List[Dict[str, Any]]:
         """
         生成多个大纲方案
+
+        Args:
+            session_id: 会话ID（素材摘要按会话缓存，与写作共用）
         
         返回: 大纲列表
         """
@@ -392,21 +398,17 @@ class OutlineGeneratorAgent(WorkerAgent):
                 }
                 content_summaries.append(summary)
             
-            # 准备素材数据
-            materials = []
-            for content in related_contents[:5]:
-                materials.append({
-                    'id': content.get('id', 'unknown'),
-                    'title': content.get('title', 'N/A'),
-                    'summary': content.get('summary_paragraph', content.get('raw_content', 'N/A')[:300]),
-                    'source': content.get('source', '未知')
-                })
+            # 会话级素材摘要（与写作共用同一份摘要和素材格式，写作时按相同素材命中缓存），按 token 预算渲染
+            from tools.materials_digest import get_session_digest
+            digest = get_session_digest(session_id, related_contents[:5])
+            materials_text = digest.render_all(budget_tokens=1500)
             
             # 构建提示词
             system_prompt, user_prompt = self.outline_prompt_module.format_prompt(
                 topic=topic,
-                materials=materials,
-                word_count=2000
+                materials=digest.entries,
+                word_count=2000,
+                materials_text=materials_text
             )
             
             logger.info("🤖 调用 LLM 生成大纲...")
@@ -417,7 +419,8 @@ class OutlineGeneratorAgent(WorkerAgent):
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.8,  # 提高创造性
-                max_tokens=10000
+                max_tokens=10000,
+                prompt_name=self.outline_prompt_module.PROMPT.name
             )
             
             # 解析响应 - 处理 None 的情况
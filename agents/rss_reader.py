@@ -22,6 +22,7 @@ from openagents.agents.worker_agent import WorkerAgent
 from openagents.models.event import Event
 from tools.content_tools import get_rss_reader
 from tools.database import get_database
+from tools.metrics_store import get_metrics_store, PipelineMetric
 import logging
 
 logger = logging.getLogger(__name__)
@@ -43,6 +44,7 @@ class RSSReaderAgent(WorkerAgent):
         self.fetch_interval = fetch_interval
         self.rss_reader = get_rss_reader()
         self.db = get_database()
+        self.metrics = get_metrics_store()
         self._fetch_task = None
     
     async def on_startup(self):
@@ -90,6 +92,12 @@ class RSSReaderAgent(WorkerAgent):
         # 采集所有RSS源
         items = self.rss_reader.fetch_all_feeds()
         
+        # 记录各源抓取健康度（最近成功/失败、条目数、耗时）
+        try:
+            self.db.record_feed_fetches(self.rss_reader.last_fetch_results)
+        except Exception as e:
+            logger.error(f"Error recording feed fetch stats: {str(e)}")
+        
         if not items:
             logger.info("No new items fetched")
             return
@@ -133,6 +141,7 @@ class RSSReaderAgent(WorkerAgent):
         logger.info(f"RSS collection completed: {new_count} new items added")
         
         if new_count > 0:
+            self.metrics.record(PipelineMetric.INGEST, count=new_count)
             await self._send_channel_message(
                 "通用频道",
                 f"📥 RSS 采集完成：新增 {new_count} 篇内容"
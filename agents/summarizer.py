@@ -12,6 +12,7 @@ Summarizer Agent - 为新内容生成摘要
 
 import asyncio
 import sys
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -26,6 +27,7 @@ from openagents.agents.worker_agent import WorkerAgent, on_event
 from openagents.models.event import Event
 from tools.llm_client import get_llm_client
 from tools.database import get_database
+from tools.metrics_store import get_metrics_store, PipelineMetric
 from config.prompts import summarize
 import logging
 
@@ -41,6 +43,7 @@ class SummarizerAgent(WorkerAgent):
         super().__init__(**kwargs)
         self.llm = get_llm_client()
         self.db = get_database()
+        self.metrics = get_metrics_store()
     
     async def on_startup(self):
         """Agent 启动时执行"""
@@ -76,7 +79,9 @@ class SummarizerAgent(WorkerAgent):
                 return
             
             # 生成摘要
+            started = time.monotonic()
             summary_data = await self._generate_summary(content_data)
+            self.metrics.record(PipelineMetric.SUMMARIZE, (time.monotonic() - started) * 1000, error=not summary_data)
             
             if summary_data:
                 # 更新数据库
@@ -123,7 +128,8 @@ class SummarizerAgent(WorkerAgent):
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=10000
+                max_tokens=10000,
+                prompt_name=summarize.PROMPT.name
             )
             
             if not result:
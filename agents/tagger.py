@@ -12,6 +12,7 @@ Tagger Agent - 为内容生成标签和分类
 
 import asyncio
 import sys
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -26,6 +27,8 @@ from openagents.agents.worker_agent import WorkerAgent, on_event
 from openagents.models.event import Event
 from tools.llm_client import get_llm_client
 from tools.database import get_database
+from tools.metrics_store import get_metrics_store, PipelineMetric
+from tools.wiki_publisher import WikiPublisher
 from tools.content_tools import ContentProcessor
 from config.prompts import tag
 import logging
@@ -42,10 +45,13 @@ class TaggerAgent(WorkerAgent):
         super().__init__(**kwargs)
         self.llm = get_llm_client()
         self.db = get_database()
+        self.metrics = get_metrics_store()
+        self.wiki_publisher = None
     
     async def on_startup(self):
         """Agent 启动时执行"""
         logger.info("Tagger Agent started")
+        self.wiki_publisher = WikiPublisher(self.db, self.send_event, source_id=self.agent_id)
         
         await self._send_channel_message(
             "通用频道",
@@ -54,6 +60,8 @@ class TaggerAgent(WorkerAgent):
     
     async def on_shutdown(self):
         """Agent 关闭时执行"""
+        if self.wiki_publisher:
+            await self.wiki_publisher.close()
         logger.info("Tagger Agent stopped")
     
     @on_event("content.summarized")
@@ -77,7 +85,9 @@ class TaggerAgent(WorkerAgent):
                 return
             
             # 生成标签
+            started = time.monotonic()
             tag_data = await self._generate_tags(content_data)
+            self.metrics.record(PipelineMetric.TAG, (time.monotonic() - started) * 1000, error=not tag_data)
             
             if tag_data:
                 # 更新数据库
@@ -86,8 +96,8 @@ class TaggerAgent(WorkerAgent):
                 # 发送事件
                 await self._emit_content_tagged(content_id, tag_data)
                 
-                # 保存到 Wiki 知识库
-                await self._save_to_wiki(content_id, content_data, tag_data)
+                # 保存到 Wiki 知识库（防抖队列，与批量同步共用发布状态，不重复发送）
+                self.wiki_publisher.publish(content_id)
                 
                 # 发送内容卡片到 knowledge-base 频道
                 await self._send_content_card(content_data, tag_data)
@@ -128,7 +138,8 @@ class TaggerAgent(WorkerAgent):
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=10000
+                max_tokens=10000,
+                prompt_name=tag.PROMPT.name
             )
             
             if not result:
@@ -168,80 +179,6 @@ class TaggerAgent(WorkerAgent):
         except Exception as e:
             logger.error(f"Failed to emit content.tagged event: {str(e)}")
     
-    async def _save_to_wiki(self, content_id: str, content_data: dict, tag_data: dict):
-        """保存内容到 Wiki 知识库 - 使用事件方式"""
-        try:
-            title = content_data['title']
-            url = content_data.get('url', '')
-            source = content_data.get('source', 'Unknown')
-            summary = content_data.get('summary_paragraph', '')
-            detailed = content_data.get('summary_detailed', '')
-            key_points = content_data.get('key_points', [])
-            key_quotes = content_data.get('key_quotes', [])
-            category = tag_data.get('category', 'tech-news')
-            tags = tag_data.get('tags', {})
-            
-            # 构建 Wiki 页面内容
-            wiki_content = f"# {title}\n\n"
-            wiki_content += f"**来源**: {source}\n"
-            if url:
-                wiki_content += f"**链接**: {url}\n"
-            wiki_content += f"**分类**: {category}\n\n"
-            
-            # 标签
-            tag_list = []
-            for tag_type, tag_values in tags.items():
-                if isinstance(tag_values, list):
-                    tag_list.extend(tag_values)
-            if tag_list:
-                wiki_content += f"**标签**: {', '.join(tag_list)}\n\n"
-            
-            wiki_content += "---\n\n"
-            
-            # 摘要
-            if summary:
-                wiki_content += f"## 摘要\n\n{summary}\n\n"
-            
-            # 关键要点
-            if key_points:
-                wiki_content += "## 关键要点\n\n"
-                for point in key_points:
-                    wiki_content += f"- {point}\n"
-                wiki_content += "\n"
-            
-            # 关键引用
-            if key_quotes:
-                wiki_content += "## 关键引用\n\n"
-                for quote in key_quotes:
-                    wiki_content += f"> {quote}\n\n"
-            
-            # 详细摘要
-            if detailed:
-                wiki_content += f"## 详细内容\n\n{detailed}\n"
-            
-            # 使用安全的 page_path（移除特殊字符）
-            import re
-            page_path = re.sub(r'[^\w\u4e00-\u9fff\-]', '_', title)[:100]
-            
-            # 通过事件发送到 Wiki mod
-            wiki_event = Event(
-                event_name="wiki.page.create",
-                source_id=self.agent_id,
-                target_agent_id="mod:openagents.mods.workspace.wiki",
-                payload={
-                    "page_path": f"{category}/{page_path}",
-                    "title": title,
-                    "wiki_content": wiki_content
-                },
-                visibility="network"
-            )
-            
-            await self.send_event(wiki_event)
-            logger.info(f"📚 已发送 Wiki 保存事件: {title}")
-            
-        except Exception as e:
-            logger.error(f"❌ Wiki 保存失败: {str(e)}")
-    
     async def _send_content_card(self, content_data: dict, tag_data: dict):
         """发送内容卡片到 knowledge-base 频道"""
         try:
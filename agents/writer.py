@@ -7,6 +7,7 @@ import asyncio
 import logging
 import re
 import sys
+import time
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -36,6 +37,7 @@ class WriterAgent(WorkerAgent):
         super().__init__(**kwargs)
         self.db = None
         self.llm = None
+        self.metrics = None
         self.write_prompt = None
         
     async def on_startup(self):
@@ -45,9 +47,11 @@ class WriterAgent(WorkerAgent):
         # 导入依赖
         from tools.database import get_database
         from tools.llm_client import get_llm_client
+        from tools.metrics_store import get_metrics_store
         
         self.db = get_database()
         self.llm = get_llm_client()
+        self.metrics = get_metrics_store()
         
         # 加载提示词
         try:
@@ -95,6 +99,8 @@ class WriterAgent(WorkerAgent):
             session_id = event_data.get('session_id')
             outline_id = event_data.get('outline_id')
             topic = event_data.get('topic')
+            # 协调器重启恢复时下发的已完成章节 {章节索引: 正文}
+            completed_sections = event_data.get('completed_sections') or {}
 
             logger.info(f"📝 开始写作: session={session_id}, outline={outline_id}")
 
@@ -132,14 +138,23 @@ class WriterAgent(WorkerAgent):
             logger.info(f"📚 加载了 {len(related_contents)} 篇相关内容")
 
             # 生成文章
+            from tools.metrics_store import PipelineMetric
+
             style = outline_data.get('style', '专业分析')
-            draft = await self._write_article(
-                topic=topic,
-                outline=outline_content,
-                related_contents=related_contents,
-                style=style,
-                session_id=session_id
-            )
+            started = time.monotonic()
+            try:
+                draft = await self._write_article(
+                    topic=topic,
+                    outline=outline_content,
+                    related_contents=related_contents,
+                    style=style,
+                    session_id=session_id,
+                    completed_sections=completed_sections
+                )
+            except Exception:
+                self.metrics.record(PipelineMetric.WRITE, (time.monotonic() - started) * 1000, error=True)
+                raise
+            self.metrics.record(PipelineMetric.WRITE, (time.monotonic() - started) * 1000)
 
             # 保存草稿到数据库
             draft_id = self.db.save_draft({
@@ -188,6 +203,7 @@ class WriterAgent(WorkerAgent):
             session_id = event_data.get('session_id')
             draft_id = event_data.get('draft_id')
             suggestions = event_data.get('suggestions', [])
+            full_reviews = event_data.get('full_reviews') or {}
 
             logger.info(f"📝 优化文章: session={session_id}, draft={draft_id}")
             logger.info(f"   建议数量: {len(suggestions)}")
@@ -201,11 +217,12 @@ class WriterAgent(WorkerAgent):
             title = draft_data.get('title', '')
             content = draft_data.get('content', '')
 
-            # 调用 LLM 优化文章
+            # 只重写建议涉及的章节
             optimized_content, improvements = await self._optimize_with_llm(
                 title=title,
                 content=content,
-                suggestions=suggestions
+                suggestions=suggestions,
+                full_reviews=full_reviews
             )
 
             # 更新草稿
@@ -238,53 +255,86 @@ class WriterAgent(WorkerAgent):
         except Exception as e:
             logger.error(f"❌ 文章优化失败: {e}", exc_info=True)
 
-    async def _optimize_with_llm(self, title: str, content: str, suggestions: list) -> tuple:
-        """使用 LLM 优化文章"""
-        try:
-            system_prompt = """你是一个专业的文章优化编辑。
-根据评审建议优化文章，保持原有结构和风格，但改进内容质量。
-
-优化原则：
-1. 保持文章的核心观点和结构
-2. 根据建议改进具体内容
-3. 提升文章的可读性和专业性
-4. 不要大幅改变文章长度
-
-返回优化后的完整文章内容（Markdown格式）。"""
-
-            suggestions_text = "\n".join([f"- {s}" for s in suggestions[:5]])
-            user_prompt = f"""请根据以下评审建议优化文章：
-
-**评审建议**：
-{suggestions_text}
-
-**原文章**：
-# {title}
+    async def _optimize_with_llm(
+        self,
+        title: str,
+        content: str,
+        suggestions: list,
+        full_reviews: Optional[Dict[str, Any]] = None
+    ) -> tuple:
+        """
+        使用 LLM 按章节优化文章
 
-{content}
+        把评审建议映射到涉及的章节，只并发重写这些章节后按原顺序拼接，
+        优化耗时取决于最长的待优化章节而不是全文长度。
 
-请返回优化后的完整文章内容。"""
+        Returns:
+            (优化后的正文, 改进说明列表)
+        """
+        from tools.draft_sections import stitch_sections
+        from tools.section_optimizer import plan_section_edits, rebuild_section, section_body, describe_key
 
-            optimized_content = await self.llm.generate(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                temperature=0.7,
-                max_tokens=20000
+        try:
+            sections, edits = plan_section_edits(content, suggestions, full_reviews)
+            if not edits:
+                logger.info("没有需要优化的章节")
+                return content, []
+
+            outline = [describe_key(s['key']) for s in sections]
+            started = datetime.now()
+            results = await asyncio.gather(
+                *[self._optimize_section(title, edit, outline) for edit in edits],
+                return_exceptions=True
             )
 
-            # 提取改进点
-            improvements = [
-                "根据评审建议优化了内容表达",
-                "改进了技术描述的准确性",
-                "增强了文章的可读性"
-            ]
-
-            return optimized_content, improvements
+            replacements = {}
+            improvements = []
+            for edit, result in zip(edits, results):
+                if isinstance(result, Exception) or not result or not result.strip():
+                    logger.warning(f"章节优化失败，保留原文: {edit.key} ({result if isinstance(result, Exception) else '空结果'})")
+                    continue
+
+                new_text = rebuild_section(edit, result)
+                replacements[edit.key] = new_text
+                old_len = len(section_body(edit.text))
+                new_len = len(section_body(new_text))
+                applied = "；".join(s[:30] for s in edit.suggestions[:2])
+                improvements.append(f"「{describe_key(edit.key)}」{old_len}→{new_len} 字：{applied}")
+
+            unchanged = len(sections) - len(replacements)
+            if unchanged:
+                improvements.append(f"其余 {unchanged} 个章节保持不变")
+
+            logger.info(
+                f"✅ 章节优化完成: 重写 {len(replacements)}/{len(sections)} 个章节，"
+                f"耗时 {(datetime.now() - started).total_seconds():.1f}s"
+            )
+            return stitch_sections(sections, replacements), improvements
 
         except Exception as e:
             logger.error(f"LLM 优化文章失败: {e}")
             return content, []
-    
+
+    async def _optimize_section(self, title: str, edit, outline: List[str]) -> str:
+        """重写单个章节，返回优化后的章节正文"""
+        from tools.section_optimizer import section_body, describe_key
+
+        system_prompt, user_prompt = self.write_prompt_module.format_optimize_section_prompt(
+            article_title=title,
+            section_title=describe_key(edit.key),
+            section_content=section_body(edit.text),
+            suggestions=edit.suggestions,
+            outline=outline
+        )
+
+        return await self.llm.generate(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=0.7,
+            max_tokens=8000,
+            prompt_name=self.write_prompt_module.OPTIMIZE_SECTION_PROMPT.name
+        )
+
     async def _emit_error(self, session_id: str, error_message: str):
         """发送错误事件"""
         try:
@@ -306,7 +356,8 @@ class WriterAgent(WorkerAgent):
         section_index: int,
         total_sections: int,
         section_title: str,
-        status: str
+        status: str,
+        section_content: str = ""
     ):
         """
         发送写作进度事件
@@ -317,18 +368,22 @@ class WriterAgent(WorkerAgent):
             total_sections: 总章节数
             section_title: 章节标题
             status: 状态 (started, completed)
+            section_content: 章节正文（completed 时携带，协调器持久化后用于重启恢复）
         """
         try:
+            payload = {
+                "session_id": session_id,
+                "section_index": section_index,
+                "total_sections": total_sections,
+                "section_title": section_title,
+                "status": status
+            }
+            if section_content:
+                payload["section_content"] = section_content
             progress_event = Event(
                 event_name="creation.writing_progress",
                 source_id=self.agent_id,
-                payload={
-                    "session_id": session_id,
-                    "section_index": section_index,
-                    "total_sections": total_sections,
-                    "section_title": section_title,
-                    "status": status
-                }
+                payload=payload
             )
             await self.send_event(progress_event)
             logger.info(f"📊 进度事件: {status} - {section_title} ({section_index + 1}/{total_sections})")
@@ -378,24 +433,22 @@ class WriterAgent(WorkerAgent):
         outline: Dict[str, Any],
         related_contents: List[Dict[str, Any]],
         style: str,
-        session_id: str = ""
+        session_id: str = "",
+        completed_sections: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
         生成完整文章
 
+        Args:
+            completed_sections: 已完成章节 {章节索引: 正文}，这些章节直接复用不再生成
+
         返回: 文章数据
         """
         try:
-            # 准备素材数据
-            materials = []
-            for content in related_contents:
-                materials.append({
-                    'id': content.get('id', 'unknown'),
-                    'title': content.get('title', 'N/A'),
-                    'summary': content.get('summary_paragraph', content.get('raw_content', '')[:300]),
-                    'source': content.get('source', '未知'),
-                    'key_points': content.get('key_points', [])
-                })
+            # 准备素材数据（会话级素材摘要，只构建一次，与大纲提示词共用）
+            from tools.materials_digest import get_session_digest
+            digest = get_session_digest(session_id, related_contents)
+            digest.reset_stats()
 
             # 获取大纲结构
             sections = outline.get('structure', outline.get('sections', []))
@@ -429,6 +482,14 @@ class WriterAgent(WorkerAgent):
                     core_argument = section.get('core_argument', '')
                     estimated_words = section.get('estimated_words', 400)
 
+                # 恢复写作：已完成的章节直接复用
+                done = (completed_sections or {}).get(str(i))
+                if done:
+                    full_content += f"## {section_title}\n\n{done}\n\n"
+                    previous_context = done
+                    logger.info(f"  ↩ 复用已完成的第 {i+1}/{len(sections)} 部分: {section_title}")
+                    continue
+
                 # 发送章节开始进度事件
                 if session_id:
                     await self._emit_writing_progress(
@@ -439,17 +500,26 @@ class WriterAgent(WorkerAgent):
                         status='started'
                     )
 
+                # 按章节要点挑选最相关的素材
+                section_points = section_points if section_points else [f'{section_title}相关内容']
+                materials_text = digest.select_for_section(
+                    section_title=section_title,
+                    section_points=section_points,
+                    core_argument=core_argument
+                )
+
                 # 使用写作提示词模块 - 传递新参数
                 system_prompt, user_prompt = self.write_prompt_module.format_section_prompt(
                     article_title=title,
                     section_title=section_title,
-                    section_points=section_points if section_points else [f'{section_title}相关内容'],
-                    materials=materials,
+                    section_points=section_points,
+                    materials=[],
                     previous_context=previous_context,
                     target_words=estimated_words,
                     section_type=section_type,
                     writing_tips=writing_tips,
-                    core_argument=core_argument
+                    core_argument=core_argument,
+                    materials_text=materials_text
                 )
 
                 # 非流式生成该段内容
@@ -457,7 +527,8 @@ class WriterAgent(WorkerAgent):
                     system_prompt=system_prompt,
                     user_prompt=user_prompt,
                     temperature=0.7,
-                    max_tokens=20000
+                    max_tokens=20000,
+                    prompt_name=self.write_prompt_module.SECTION_PROMPT.name
                 )
 
                 # 添加到文章
@@ -473,7 +544,8 @@ class WriterAgent(WorkerAgent):
                         section_index=i,
                         total_sections=total_sections,
                         section_title=section_title,
-                        status='completed'
+                        status='completed',
+                        section_content=section_content
                     )
 
                 logger.info(f"  ✓ 完成第 {i+1}/{len(sections)} 部分: {section_title}")
@@ -490,13 +562,22 @@ class WriterAgent(WorkerAgent):
             # 计算字数
             word_count = len(full_content.replace(' ', '').replace('\n', ''))
 
+            # 素材部分的 prompt token 节省统计
+            prompt_stats = digest.savings_report()
+
             draft = {
                 'title': title,
                 'content': full_content,
-                'word_count': word_count
+                'word_count': word_count,
+                'prompt_stats': prompt_stats
             }
 
             logger.info(f"✅ 文章生成完成，共 {word_count} 字")
+            logger.info(
+                f"📉 素材 token: 发送 {prompt_stats['sent_tokens']} / 基线 {prompt_stats['baseline_tokens']}，"
+                f"节省 {prompt_stats['saved_tokens']} ({prompt_stats['saved_ratio']:.0%})，"
+                f"素材 {prompt_stats['materials_kept']}/{prompt_stats['materials_in']}"
+            )
             return draft
 
         except Exception as e:
@@ -3,6 +3,8 @@ AI味审查员 Agent 的提示词配置
 专注于检测AI生成痕迹，提升内容原创性和人味
 """
 
+from config.prompts.registry import register_prompt
+
 SYSTEM_PROMPT = """你是一位资深的自媒体内容原创性审查专家，专注于检测文章中的AI生成痕迹和提升内容的"人味"。
 
 你的审查视角：
@@ -60,7 +62,16 @@ AI味典型特征：
 }
 """
 
-USER_PROMPT_TEMPLATE = """请对以下自媒体文章进行AI味审查：
+# 用户提示词静态前缀（所有请求一致，便于前缀缓存）
+STATIC_PREFIX = """请对以下自媒体文章进行AI味审查。
+请检测文章的AI生成痕迹，并给出人性化改写建议。
+
+---
+
+"""
+
+# 内容审查动态后缀（基于摘要和要点）
+DYNAMIC_TEMPLATE = """## 待审查内容
 
 **标题**: {title}
 **来源**: {source}
@@ -71,10 +82,47 @@ USER_PROMPT_TEMPLATE = """请对以下自媒体文章进行AI味审查：
 
 **关键要点**:
 {key_points}
+"""
 
-请检测文章的AI生成痕迹，并给出人性化改写建议。
+# 草稿审查动态后缀（基于文章正文）
+DRAFT_DYNAMIC_TEMPLATE = """## 待审查文章
+
+**标题**: {title}
+**字数**: {word_count}
+
+**文章内容**:
+{content}
 """
 
+# 典型句子复核：静态前缀
+SENTENCES_STATIC_PREFIX = """本地统计模型已对全文计算了 AI 味特征，以下只给出特征统计和 AI 味最重的句子。
+请基于这些信息完成审查：ai_indicators 的 examples 引用给出的句子，
+rewrite_suggestions 针对给出的句子逐条给出改写，评分需结合特征统计对全文作出判断。
+
+---
+
+"""
+
+# 典型句子复核：动态后缀
+SENTENCES_DYNAMIC_TEMPLATE = """## 待复核内容
+
+**标题**: {title}
+**字数**: {word_count}
+**本地 AI 味评分**: {local_score}（0-1，越高越像 AI 生成）
+
+**特征统计**:
+{features}
+
+**AI 味最重的句子**:
+{sentences}
+"""
+
+PROMPT = register_prompt("critic_business", SYSTEM_PROMPT, STATIC_PREFIX, DYNAMIC_TEMPLATE)
+DRAFT_PROMPT = register_prompt("critic_business.draft", SYSTEM_PROMPT, STATIC_PREFIX, DRAFT_DYNAMIC_TEMPLATE)
+SENTENCES_PROMPT = register_prompt(
+    "critic_business.sentences", SYSTEM_PROMPT, SENTENCES_STATIC_PREFIX, SENTENCES_DYNAMIC_TEMPLATE
+)
+
 
 def format_prompt(title: str, source: str, category: str, summary: str, key_points: list) -> tuple:
     """
@@ -92,7 +140,7 @@ def format_prompt(title: str, source: str, category: str, summary: str, key_poin
     """
     key_points_str = "\n".join([f"- {point}" for point in key_points])
 
-    user_prompt = USER_PROMPT_TEMPLATE.format(
+    return PROMPT.render(
         title=title,
         source=source,
         category=category,
@@ -100,4 +148,60 @@ def format_prompt(title: str, source: str, category: str, summary: str, key_poin
         key_points=key_points_str
     )
 
-    return SYSTEM_PROMPT, user_prompt
+
+def format_draft_prompt(title: str, word_count: int, content: str, max_chars: int = 3000) -> tuple:
+    """
+    格式化草稿AI味审查提示词
+
+    Args:
+        title: 文章标题
+        word_count: 字数
+        content: 文章正文
+        max_chars: 正文最大截取长度
+
+    Returns:
+        (system_prompt, user_prompt) 元组
+    """
+    if len(content) > max_chars:
+        content = content[:max_chars] + "\n\n...(内容已截取)"
+
+    return DRAFT_PROMPT.render(
+        title=title,
+        word_count=word_count,
+        content=content
+    )
+
+
+def format_sentences_prompt(
+    title: str,
+    word_count: int,
+    local_score: float,
+    features: dict,
+    sentences: list
+) -> tuple:
+    """
+    格式化典型句子复核提示词（只发送本地评分选出的句子）
+
+    Args:
+        title: 文章标题
+        word_count: 字数
+        local_score: 本地 AI 味评分
+        features: 特征统计
+        sentences: 典型句子列表 [{text, reasons}]
+
+    Returns:
+        (system_prompt, user_prompt) 元组
+    """
+    features_str = "\n".join([f"- {name}: {value}" for name, value in features.items()])
+    sentences_str = "\n".join([
+        f"{i}. {s['text']}（{'；'.join(s.get('reasons', []))}）"
+        for i, s in enumerate(sentences, 1)
+    ])
+
+    return SENTENCES_PROMPT.render(
+        title=title,
+        word_count=word_count,
+        local_score=local_score,
+        features=features_str or "（无）",
+        sentences=sentences_str or "（无）"
+    )
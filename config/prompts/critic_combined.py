@@ -0,0 +1,137 @@
+"""
+三维度合并审查提示词配置
+一次调用同时完成敏感违禁词、AI味、舆情风险审查（或其中本地预检无法确定的几项），用于篇幅较短的草稿
+各视角的审查标准与输出格式直接复用三个评审员的系统提示词，保证结果结构一致
+"""
+
+from itertools import combinations
+from typing import Iterable, Optional, Tuple
+
+from config.prompts.registry import register_prompt
+from config.prompts import critic_technical, critic_business, critic_user
+
+# 各视角：评审类型 → (审查名称, 评审员系统提示词)，顺序即输出字段顺序
+PERSPECTIVES = {
+    'sensitive': ('敏感违禁词审查', critic_technical.SYSTEM_PROMPT),
+    'ai_flavor': ('AI味审查', critic_business.SYSTEM_PROMPT),
+    'public_opinion': ('舆情风险审查', critic_user.SYSTEM_PROMPT),
+}
+
+# 静态前缀中的任务描述
+_TASKS = {
+    'sensitive': '敏感违禁词审查',
+    'ai_flavor': 'AI味审查',
+    'public_opinion': '舆情风险评估',
+}
+
+_ORDINALS = ('一', '二', '三')
+
+_COUNTS = {2: '两', 3: '三'}
+
+_DIVIDER = "========================================"
+
+DYNAMIC_TEMPLATE = """## 待审查文章
+
+**标题**: {title}
+**字数**: {word_count}
+
+**文章内容**:
+{content}
+"""
+
+
+def _build_system_prompt(review_types: Tuple[str, ...]) -> str:
+    """拼接参与视角的系统提示词"""
+    count = _COUNTS[len(review_types)]
+    parts = [
+        f"你是一个由{count}位资深自媒体审查专家组成的联合审查小组，"
+        f"需要对同一篇文章一次性给出{count}份独立的审查报告。\n\n"
+        f"{count}位专家各自独立评分、互不影响，每份报告必须严格遵循对应专家的审查标准和 JSON 输出格式。\n"
+    ]
+    for ordinal, review_type in zip(_ORDINALS, review_types):
+        name, system_prompt = PERSPECTIVES[review_type]
+        parts.append(f"{_DIVIDER}\n## 专家{ordinal}：{name}（结果字段 {review_type}）\n{_DIVIDER}\n\n{system_prompt}\n")
+
+    fields = ",\n".join(
+        f'  "{review_type}": {{ ...专家{ordinal}的报告... }}'
+        for ordinal, review_type in zip(_ORDINALS, review_types)
+    )
+    parts.append(
+        f"{_DIVIDER}\n## 最终输出格式\n{_DIVIDER}\n\n"
+        f"只输出一个 JSON 对象，包含{count}个字段，每个字段的值是对应专家的完整 JSON 报告：\n"
+        f"{{\n{fields}\n}}\n"
+    )
+    return "\n".join(parts)
+
+
+def _build_static_prefix(review_types: Tuple[str, ...]) -> str:
+    """用户提示词静态前缀（同一视角组合的请求一致，便于前缀缓存）"""
+    tasks = [_TASKS[t] for t in review_types]
+    return (
+        f"请对以下自媒体文章同时进行{'、'.join(tasks[:-1])}和{tasks[-1]}。\n"
+        f"{_COUNTS[len(review_types)]}份报告都必须完整，每份报告都要包含 overall_score 和 verdict 字段。\n\n"
+        "---\n\n"
+    )
+
+
+def _register(review_types: Tuple[str, ...]):
+    """注册一种视角组合的提示词（全部视角沿用原名称 critic_combined）"""
+    name = "critic_combined" if len(review_types) == len(PERSPECTIVES) \
+        else "critic_combined." + "+".join(review_types)
+    return register_prompt(name, _build_system_prompt(review_types), _build_static_prefix(review_types), DYNAMIC_TEMPLATE)
+
+
+# 两个及以上视角的所有组合（本地预检已确定结果的视角不再交给 LLM）
+PROMPTS = {
+    review_types: _register(review_types)
+    for size in range(2, len(PERSPECTIVES) + 1)
+    for review_types in combinations(PERSPECTIVES, size)
+}
+
+PROMPT = PROMPTS[tuple(PERSPECTIVES)]
+
+
+def get_prompt(review_types: Optional[Iterable[str]] = None):
+    """
+    获取视角组合对应的提示词
+
+    Args:
+        review_types: 参与的评审类型（至少两个），默认全部
+
+    Returns:
+        编译后的提示词
+    """
+    if review_types is None:
+        return PROMPT
+    selected = set(review_types)
+    return PROMPTS[tuple(t for t in PERSPECTIVES if t in selected)]
+
+
+def format_prompt(
+    title: str,
+    word_count: int,
+    content: str,
+    max_chars: int = 3000,
+    review_types: Optional[Iterable[str]] = None
+) -> tuple:
+    """
+    格式化合并审查提示词
+
+    Args:
+        title: 文章标题
+        word_count: 字数
+        content: 文章正文
+        max_chars: 正文最大截取长度
+        review_types: 参与的评审类型（至少两个），默认全部
+
+    Returns:
+        (system_prompt, user_prompt) 元组
+    """
+    if len(content) > max_chars:
+        content = content[:max_chars] + "\n\n...(内容已截取)"
+
+    return get_prompt(review_types).render(
+        title=title,
+        word_count=word_count,
+        content=content
+    )
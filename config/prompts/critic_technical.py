@@ -3,6 +3,8 @@
 专注于检测政治敏感、违规广告、违禁词、低俗内容等
 """
 
+from config.prompts.registry import register_prompt
+
 SYSTEM_PROMPT = """你是一位资深的自媒体内容合规审查专家，专注于检测文章中的敏感违禁内容。
 
 你的审查视角：
@@ -46,7 +48,16 @@ SYSTEM_PROMPT = """你是一位资深的自媒体内容合规审查专家，专
 }
 """
 
-USER_PROMPT_TEMPLATE = """请对以下自媒体文章进行敏感违禁词审查：
+# 用户提示词静态前缀（所有请求一致，便于前缀缓存）
+STATIC_PREFIX = """请对以下自媒体文章进行敏感违禁词审查。
+请仔细检查是否存在敏感词、违禁词、违规表述等问题。
+
+---
+
+"""
+
+# 内容审查动态后缀（基于摘要和要点）
+DYNAMIC_TEMPLATE = """## 待审查内容
 
 **标题**: {title}
 **来源**: {source}
@@ -57,10 +68,42 @@ USER_PROMPT_TEMPLATE = """请对以下自媒体文章进行敏感违禁词审查
 
 **关键要点**:
 {key_points}
+"""
 
-请仔细检查是否存在敏感词、违禁词、违规表述等问题。
+# 草稿审查动态后缀（基于文章正文）
+DRAFT_DYNAMIC_TEMPLATE = """## 待审查文章
+
+**标题**: {title}
+**字数**: {word_count}
+
+**文章内容**:
+{content}
 """
 
+# 命中片段复核：静态前缀（只发送本地词库命中的片段）
+SPANS_STATIC_PREFIX = """本地词库已对全文做过敏感违禁词扫描，以下只给出命中片段及其上下文（命中词用【】标出）。
+请结合上下文逐一复核：判断命中词在语境中是否真正违规（例如技术术语、引用原文可能属于误报），
+并检查片段中是否还有其他违规表述。sensitive_words 中只保留确认违规的词，并在 location 中沿用片段给出的段落位置。
+
+---
+
+"""
+
+# 命中片段复核：动态后缀
+SPANS_DYNAMIC_TEMPLATE = """## 待复核片段
+
+**标题**: {title}
+**字数**: {word_count}
+**命中统计**: {hit_summary}
+
+**命中片段**:
+{spans}
+"""
+
+PROMPT = register_prompt("critic_technical", SYSTEM_PROMPT, STATIC_PREFIX, DYNAMIC_TEMPLATE)
+DRAFT_PROMPT = register_prompt("critic_technical.draft", SYSTEM_PROMPT, STATIC_PREFIX, DRAFT_DYNAMIC_TEMPLATE)
+SPANS_PROMPT = register_prompt("critic_technical.spans", SYSTEM_PROMPT, SPANS_STATIC_PREFIX, SPANS_DYNAMIC_TEMPLATE)
+
 
 def format_prompt(title: str, source: str, category: str, summary: str, key_points: list) -> tuple:
     """
@@ -78,7 +121,7 @@ def format_prompt(title: str, source: str, category: str, summary: str, key_poin
     """
     key_points_str = "\n".join([f"- {point}" for point in key_points])
 
-    user_prompt = USER_PROMPT_TEMPLATE.format(
+    return PROMPT.render(
         title=title,
         source=source,
         category=category,
@@ -86,4 +129,46 @@ def format_prompt(title: str, source: str, category: str, summary: str, key_poin
         key_points=key_points_str
     )
 
-    return SYSTEM_PROMPT, user_prompt
+
+def format_draft_prompt(title: str, word_count: int, content: str, max_chars: int = 3000) -> tuple:
+    """
+    格式化草稿敏感违禁词审查提示词
+
+    Args:
+        title: 文章标题
+        word_count: 字数
+        content: 文章正文
+        max_chars: 正文最大截取长度
+
+    Returns:
+        (system_prompt, user_prompt) 元组
+    """
+    if len(content) > max_chars:
+        content = content[:max_chars] + "\n\n...(内容已截取)"
+
+    return DRAFT_PROMPT.render(
+        title=title,
+        word_count=word_count,
+        content=content
+    )
+
+
+def format_spans_prompt(title: str, word_count: int, spans: str, hit_summary: str) -> tuple:
+    """
+    格式化命中片段复核提示词
+
+    Args:
+        title: 文章标题
+        word_count: 字数
+        spans: 命中片段文本（见 SensitiveScanner.extract_spans）
+        hit_summary: 各分类命中次数
+
+    Returns:
+        (system_prompt, user_prompt) 元组
+    """
+    return SPANS_PROMPT.render(
+        title=title,
+        word_count=word_count,
+        hit_summary=hit_summary,
+        spans=spans
+    )
@@ -3,6 +3,8 @@
 专注于评估内容可能引发的舆论风险和争议
 """
 
+from config.prompts.registry import register_prompt
+
 SYSTEM_PROMPT = """你是一位资深的自媒体舆情风险评估专家，专注于预判文章发布后可能引发的舆论风险和争议。
 
 你的审查视角：
@@ -64,7 +66,16 @@ SYSTEM_PROMPT = """你是一位资深的自媒体舆情风险评估专家，专
 }
 """
 
-USER_PROMPT_TEMPLATE = """请对以下自媒体文章进行舆情风险评估：
+# 用户提示词静态前缀（所有请求一致，便于前缀缓存）
+STATIC_PREFIX = """请对以下自媒体文章进行舆情风险评估。
+请评估文章发布后可能引发的舆论风险，并给出风险规避建议。
+
+---
+
+"""
+
+# 内容审查动态后缀（基于摘要和要点）
+DYNAMIC_TEMPLATE = """## 待审查内容
 
 **标题**: {title}
 **来源**: {source}
@@ -75,10 +86,21 @@ USER_PROMPT_TEMPLATE = """请对以下自媒体文章进行舆情风险评估：
 
 **关键要点**:
 {key_points}
+"""
 
-请评估文章发布后可能引发的舆论风险，并给出风险规避建议。
+# 草稿审查动态后缀（基于文章正文）
+DRAFT_DYNAMIC_TEMPLATE = """## 待审查文章
+
+**标题**: {title}
+**字数**: {word_count}
+
+**文章内容**:
+{content}
 """
 
+PROMPT = register_prompt("critic_user", SYSTEM_PROMPT, STATIC_PREFIX, DYNAMIC_TEMPLATE)
+DRAFT_PROMPT = register_prompt("critic_user.draft", SYSTEM_PROMPT, STATIC_PREFIX, DRAFT_DYNAMIC_TEMPLATE)
+
 
 def format_prompt(title: str, source: str, category: str, summary: str, key_points: list) -> tuple:
     """
@@ -96,7 +118,7 @@ def format_prompt(title: str, source: str, category: str, summary: str, key_poin
     """
     key_points_str = "\n".join([f"- {point}" for point in key_points])
 
-    user_prompt = USER_PROMPT_TEMPLATE.format(
+    return PROMPT.render(
         title=title,
         source=source,
         category=category,
@@ -104,4 +126,25 @@ def format_prompt(title: str, source: str, category: str, summary: str, key_poin
         key_points=key_points_str
     )
 
-    return SYSTEM_PROMPT, user_prompt
+
+def format_draft_prompt(title: str, word_count: int, content: str, max_chars: int = 3000) -> tuple:
+    """
+    格式化草稿舆情风险评估提示词
+
+    Args:
+        title: 文章标题
+        word_count: 字数
+        content: 文章正文
+        max_chars: 正文最大截取长度
+
+    Returns:
+        (system_prompt, user_prompt) 元组
+    """
+    if len(content) > max_chars:
+        content = content[:max_chars] + "\n\n...(内容已截取)"
+
+    return DRAFT_PROMPT.render(
+        title=title,
+        word_count=word_count,
+        content=content
+    )
@@ -3,6 +3,8 @@
 用于 Outline Generator Agent 生成文章大纲
 """
 
+from config.prompts.registry import register_prompt
+
 SYSTEM_PROMPT = """你是一位资深的内容策划专家和技术写作顾问，拥有丰富的科技媒体从业经验。
 
 ## 核心能力
@@ -38,30 +40,17 @@ SYSTEM_PROMPT = """你是一位资深的内容策划专家和技术写作顾问
 - 素材引用要**恰当精准**，标注清晰
 """
 
-USER_PROMPT_TEMPLATE = """## 创作任务
-
-**主题**：{topic}
-**目标字数**：{word_count}字
-**素材数量**：{material_count}篇
-
----
-
-## 可用素材库
-
-{materials}
-
----
-
-## 输出要求
+# 用户提示词静态前缀：输出格式与质量要求（所有请求一致，便于前缀缓存）
+STATIC_PREFIX = """## 输出要求
 
 请生成 **3个差异化的大纲方案**，每个方案应有明显不同的定位和风格。
 
 ### JSON 输出格式
 
 ```json
-{{
+{
     "outlines": [
-        {{
+        {
             "id": "outline-a",
             "title": "方案标题（要吸引人，体现文章核心价值）",
             "subtitle": "副标题或一句话描述",
@@ -71,7 +60,7 @@ USER_PROMPT_TEMPLATE = """## 创作任务
             "reading_time": "预估阅读时间（分钟）",
             "highlights": ["亮点1", "亮点2", "亮点3"],
             "structure": [
-                {{
+                {
                     "section": "章节标题",
                     "section_type": "intro/body/conclusion/case_study/deep_dive",
                     "core_argument": "本章节的核心论点",
@@ -84,15 +73,15 @@ USER_PROMPT_TEMPLATE = """## 创作任务
                     "writing_tips": "写作建议（如：可以用XX案例引入，注意XX数据支撑）",
                     "estimated_words": 400,
                     "transition_hint": "与下一章节的过渡提示"
-                }}
+                }
             ],
             "estimated_sections": 5,
             "total_estimated_words": 2000,
             "seo_keywords": ["关键词1", "关键词2", "关键词3"],
             "call_to_action": "文章结尾的行动号召建议"
-        }}
+        }
     ]
-}}
+}
 ```
 
 ### 方案差异化建议
@@ -120,22 +109,30 @@ USER_PROMPT_TEMPLATE = """## 创作任务
 - [ ] 字数分配是否合理（引言约10%，正文约80%，结论约10%）？
 - [ ] 是否有足够的案例/数据支撑点？
 - [ ] 过渡提示是否能保证文章连贯性？
+
+---
+
 """
 
+# 用户提示词动态后缀：本次创作任务与素材
+DYNAMIC_TEMPLATE = """## 创作任务
 
-def format_prompt(topic: str, materials: list, word_count: int = 2000) -> tuple[str, str]:
-    """
-    格式化提示词
+**主题**：{topic}
+**目标字数**：{word_count}字
+**素材数量**：{material_count}篇
 
-    Args:
-        topic: 文章主题
-        materials: 相关素材列表 [{"id": "xxx", "title": "...", "summary": "..."}]
-        word_count: 目标字数
+---
 
-    Returns:
-        (system_prompt, user_prompt) 元组
-    """
-    # 格式化素材列表 - 更详细的展示
+## 可用素材库
+
+{materials}
+"""
+
+PROMPT = register_prompt("outline", SYSTEM_PROMPT, STATIC_PREFIX, DYNAMIC_TEMPLATE)
+
+
+def _format_materials(materials: list) -> str:
+    """渲染大纲提示词的素材列表"""
     materials_text = ""
     for i, mat in enumerate(materials, 1):
         mat_id = mat.get('id', f'mat-{i}')
@@ -156,6 +153,32 @@ def format_prompt(topic: str, materials: list, word_count: int = 2000) -> tuple[
 
         materials_text += "\n"
 
+    return materials_text
+
+
+def format_prompt(
+    topic: str,
+    materials: list,
+    word_count: int = 2000,
+    materials_text: str | None = None
+) -> tuple[str, str]:
+    """
+    格式化提示词
+
+    Args:
+        topic: 文章主题
+        materials: 相关素材列表 [{"id": "xxx", "title": "...", "summary": "..."}]
+        word_count: 目标字数
+        materials_text: 预先渲染好的素材文本（来自会话级素材摘要，使用与写作提示词相同的素材格式），
+            提供时 materials 只用于统计素材数量
+
+    Returns:
+        (system_prompt, user_prompt) 元组
+    """
+    # 格式化素材列表 - 更详细的展示（已有素材摘要时直接复用）
+    if materials_text is None:
+        materials_text = _format_materials(materials)
+
     if not materials_text:
         materials_text = """### 暂无直接相关素材
 
@@ -166,11 +189,9 @@ def format_prompt(topic: str, materials: list, word_count: int = 2000) -> tuple[
 - 未来展望和思考
 """
 
-    user_prompt = USER_PROMPT_TEMPLATE.format(
+    return PROMPT.render(
         topic=topic,
         word_count=word_count,
         material_count=len(materials),
         materials=materials_text
-    )
-
-    return SYSTEM_PROMPT, user_prompt
\ No newline at end of file
+    )
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+提示词注册表
+每个提示词模板在模块导入时编译一次，拆分为「静态前缀 + 动态后缀」
+
+- system_prompt + static_prefix 在每次请求中完全一致，放在消息最前面，便于服务端前缀缓存命中
+- dynamic_template 只包含本次请求的数据（标题、素材、正文等），放在最后
+- prefix_hash 用于在遥测中识别前缀是否变化（前缀变化会导致缓存失效）
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """编译后的提示词模板"""
+    name: str
+    system_prompt: str
+    static_prefix: str
+    dynamic_template: str
+    prefix_hash: str
+
+    def render(self, **fields) -> tuple[str, str]:
+        """
+        渲染提示词
+
+        Args:
+            **fields: 动态后缀中的占位字段
+
+        Returns:
+            (system_prompt, user_prompt) 元组
+        """
+        return self.system_prompt, self.static_prefix + self.dynamic_template.format(**fields)
+
+
+class PromptRegistry:
+    """提示词注册表"""
+
+    def __init__(self):
+        self._prompts: Dict[str, CompiledPrompt] = {}
+
+    def register(
+        self,
+        name: str,
+        system_prompt: str,
+        static_prefix: str = "",
+        dynamic_template: str = ""
+    ) -> CompiledPrompt:
+        """
+        注册并编译提示词
+
+        Args:
+            name: 提示词名称（如 "write.section"）
+            system_prompt: 系统提示词（静态）
+            static_prefix: 用户提示词的静态前缀（不做 format，可直接包含 JSON 花括号）
+            dynamic_template: 用户提示词的动态后缀（str.format 模板）
+
+        Returns:
+            编译后的提示词
+        """
+        digest = hashlib.sha256(
+            (system_prompt + "\x00" + static_prefix).encode('utf-8')
+        ).hexdigest()[:12]
+
+        prompt = CompiledPrompt(
+            name=name,
+            system_prompt=system_prompt,
+            static_prefix=static_prefix,
+            dynamic_template=dynamic_template,
+            prefix_hash=digest
+        )
+        self._prompts[name] = prompt
+        return prompt
+
+    def get(self, name: str) -> Optional[CompiledPrompt]:
+        """按名称获取提示词"""
+        return self._prompts.get(name)
+
+    def names(self) -> List[str]:
+        """获取所有已注册的提示词名称"""
+        return sorted(self._prompts)
+
+
+# 全局注册表实例
+_registry = PromptRegistry()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """获取全局提示词注册表"""
+    return _registry
+
+
+def register_prompt(
+    name: str,
+    system_prompt: str,
+    static_prefix: str = "",
+    dynamic_template: str = ""
+) -> CompiledPrompt:
+    """在全局注册表中注册提示词"""
+    return _registry.register(name, system_prompt, static_prefix, dynamic_template)
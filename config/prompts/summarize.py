@@ -3,6 +3,8 @@
 用于 Summarizer Agent 生成不同长度的内容摘要
 """
 
+from config.prompts.registry import register_prompt
+
 SYSTEM_PROMPT = """你是一个专业的内容摘要助手。你的任务是为文章生成不同长度的摘要。
 
 要求：
@@ -17,30 +19,40 @@ SYSTEM_PROMPT = """你是一个专业的内容摘要助手。你的任务是为
 必须返回有效的 JSON 格式，包含以下字段。
 """
 
-USER_PROMPT_TEMPLATE = """请为以下文章生成摘要：
-
-标题：{title}
-来源：{source}
-URL：{url}
-
-内容：
-{content}
+# 用户提示词静态前缀（所有请求一致，便于前缀缓存）
+STATIC_PREFIX = """请为文章生成摘要。
 
 请输出 JSON 格式，包含以下字段：
-{{
+{
     "one_line": "20-30字的一句话摘要，概括核心内容",
     "paragraph": "100-150字的段落摘要，包含主要观点",
     "detailed": "300-500字的详细摘要，包含完整论述",
     "key_points": ["关键要点1", "关键要点2", "关键要点3"],
     "key_quotes": ["重要引用1（如果有）", "重要引用2（如果有）"]
-}}
+}
 
 注意：
 - 摘要要忠实于原文，不要添加原文没有的内容
 - 关键要点应该是独立的观点或发现
 - 引用应该是原文中的精彩或重要语句
+
+---
+
 """
 
+# 用户提示词动态后缀（每篇文章不同）
+DYNAMIC_TEMPLATE = """## 待摘要文章
+
+标题：{title}
+来源：{source}
+URL：{url}
+
+内容：
+{content}
+"""
+
+PROMPT = register_prompt("summarize", SYSTEM_PROMPT, STATIC_PREFIX, DYNAMIC_TEMPLATE)
+
 
 def format_prompt(title: str, source: str, url: str, content: str) -> tuple[str, str]:
     """
@@ -60,11 +72,9 @@ def format_prompt(title: str, source: str, url: str, content: str) -> tuple[str,
     if len(content) > max_content_length:
         content = content[:max_content_length] + "\n\n[内容已截断...]"
     
-    user_prompt = USER_PROMPT_TEMPLATE.format(
+    return PROMPT.render(
         title=title,
         source=source,
         url=url,
         content=content
-    )
-    
-    return SYSTEM_PROMPT, user_prompt
\ No newline at end of file
+    )
\ No newline at end of file
@@ -3,6 +3,8 @@
 用于 Tagger Agent 为内容生成标签和分类
 """
 
+from config.prompts.registry import register_prompt
+
 SYSTEM_PROMPT = """你是一个专业的内容分类和标签生成助手。
 
 分类体系：
@@ -27,31 +29,41 @@ SYSTEM_PROMPT = """你是一个专业的内容分类和标签生成助手。
 - 内容对目标受众的价值和实用性
 """
 
-USER_PROMPT_TEMPLATE = """请为以下内容生成标签和分类：
-
-标题：{title}
-来源：{source}
-摘要：{summary}
+# 用户提示词静态前缀（所有请求一致，便于前缀缓存）
+STATIC_PREFIX = """请为内容生成标签和分类。
 
 请输出 JSON 格式：
-{{
+{
     "category": "从分类体系中选择最合适的一个主分类",
-    "tags": {{
+    "tags": {
         "topics": ["主题标签1", "主题标签2"],
         "technologies": ["技术标签1", "技术标签2"],
         "scenarios": ["场景标签1"]
-    }},
+    },
     "sentiment": "positive/neutral/negative",
     "relevance_score": 0.85
-}}
+}
 
 要求：
 - 每个层级最多3个标签
 - 标签要准确反映内容特征
 - 相关性评分要客观合理
 - 技术标签要使用规范名称
+
+---
+
 """
 
+# 用户提示词动态后缀（每篇内容不同）
+DYNAMIC_TEMPLATE = """## 待分类内容
+
+标题：{title}
+来源：{source}
+摘要：{summary}
+"""
+
+PROMPT = register_prompt("tag", SYSTEM_PROMPT, STATIC_PREFIX, DYNAMIC_TEMPLATE)
+
 
 def format_prompt(title: str, source: str, summary: str) -> tuple[str, str]:
     """
@@ -65,10 +77,8 @@ def format_prompt(title: str, source: str, summary: str) -> tuple[str, str]:
     Returns:
         (system_prompt, user_prompt) 元组
     """
-    user_prompt = USER_PROMPT_TEMPLATE.format(
+    return PROMPT.render(
         title=title,
         source=source,
         summary=summary
-    )
-    
-    return SYSTEM_PROMPT, user_prompt
\ No newline at end of file
+    )
\ No newline at end of file
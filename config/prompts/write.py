@@ -3,6 +3,8 @@
 用于 Writer Agent 根据大纲生成完整文章
 """
 
+from config.prompts.registry import register_prompt
+
 SYSTEM_PROMPT = """你是一位资深的技术内容创作者，拥有丰富的科技媒体写作经验。你的文章曾发表于知名技术博客和科技媒体。
 
 ## 写作风格特点
@@ -40,7 +42,40 @@ SYSTEM_PROMPT = """你是一位资深的技术内容创作者，拥有丰富的
 - 语言流畅，可读性强
 """
 
-SECTION_PROMPT_TEMPLATE = """## 写作任务
+# 章节写作：静态前缀（写作要求，所有章节一致，便于前缀缓存）
+SECTION_STATIC_PREFIX = """## 写作要求
+
+### 内容要求
+1. **紧扣要点**：确保覆盖「章节要点」中的所有要点，但不要机械罗列
+2. **深度适中**：既要有深度，又要保持可读性
+3. **素材融合**：自然地引用素材中的观点、数据或案例
+4. **逻辑连贯**：与前文保持逻辑上的承接和呼应
+
+### 格式要求
+1. 使用 Markdown 格式
+2. 可以使用**加粗**强调关键概念
+3. 适当使用列表提升可读性
+4. 重要引用要标注来源（如：据XX报道...）
+5. 如有代码示例，使用代码块并添加语言标识
+
+### 风格要求
+1. 开头要有吸引力，可以用问题、数据或场景引入
+2. 段落长度适中（3-5句为宜）
+3. 避免过于口语化或过于学术化
+4. 保持客观中立，但可以有适度的观点表达
+
+### 禁止事项
+- 不要包含章节标题（标题会自动添加）
+- 不要使用"首先、其次、最后"等过于程式化的过渡词
+- 不要出现"本文将介绍"等自我指涉的表述
+- 不要编造数据或虚构案例
+
+---
+
+"""
+
+# 章节写作：动态后缀（本章节任务、素材与上下文）
+SECTION_DYNAMIC_TEMPLATE = """## 写作任务
 
 **文章标题**：{article_title}
 **当前章节**：{section_title}
@@ -64,37 +99,50 @@ SECTION_PROMPT_TEMPLATE = """## 写作任务
 
 {previous_context}
 
----
+请直接输出该章节的正文内容。
+"""
 
-## 写作要求
+SECTION_PROMPT = register_prompt("write.section", SYSTEM_PROMPT, SECTION_STATIC_PREFIX, SECTION_DYNAMIC_TEMPLATE)
 
-### 内容要求
-1. **紧扣要点**：确保覆盖上述所有要点，但不要机械罗列
-2. **深度适中**：既要有深度，又要保持可读性
-3. **素材融合**：自然地引用素材中的观点、数据或案例
-4. **逻辑连贯**：与前文保持逻辑上的承接和呼应
 
-### 格式要求
-1. 使用 Markdown 格式
-2. 可以使用**加粗**强调关键概念
-3. 适当使用列表提升可读性
-4. 重要引用要标注来源（如：据XX报道...）
-5. 如有代码示例，使用代码块并添加语言标识
+def format_materials(
+    materials: list[dict],
+    summary_chars: int = 200,
+    max_key_points: int = 3
+) -> str:
+    """
+    将素材列表渲染为提示词中的素材块
 
-### 风格要求
-1. 开头要有吸引力，可以用问题、数据或场景引入
-2. 段落长度适中（3-5句为宜）
-3. 避免过于口语化或过于学术化
-4. 保持客观中立，但可以有适度的观点表达
+    Args:
+        materials: 素材列表（id/title/source/summary/key_points）
+        summary_chars: 摘要截取长度
+        max_key_points: 每条素材最多保留的要点数
 
-### 禁止事项
-- 不要包含章节标题（标题会自动添加）
-- 不要使用"首先、其次、最后"等过于程式化的过渡词
-- 不要出现"本文将介绍"等自我指涉的表述
-- 不要编造数据或虚构案例
+    Returns:
+        Markdown 格式的素材文本
+    """
+    materials_text = ""
+    for mat in materials:
+        mat_id = mat.get('id', 'unknown')
+        title = mat.get('title', '未知')
+        source = mat.get('source', '未知')
+        summary = mat.get('summary', '')
+        key_points = mat.get('key_points', [])
 
-请直接输出该章节的正文内容。
-"""
+        materials_text += f"### [{mat_id}] {title}\n"
+        materials_text += f"**来源**：{source}\n"
+
+        if summary:
+            materials_text += f"**摘要**：{summary[:summary_chars]}{'...' if len(summary) > summary_chars else ''}\n"
+
+        if key_points:
+            materials_text += "**可引用要点**：\n"
+            for point in key_points[:max_key_points]:
+                materials_text += f"  - {point}\n"
+
+        materials_text += "\n"
+
+    return materials_text
 
 
 def format_section_prompt(
@@ -106,7 +154,8 @@ def format_section_prompt(
     target_words: int = 400,
     section_type: str = "body",
     writing_tips: str = "",
-    core_argument: str = ""
+    core_argument: str = "",
+    materials_text: str | None = None
 ) -> tuple[str, str]:
     """
     格式化章节写作提示词
@@ -121,6 +170,7 @@ def format_section_prompt(
         section_type: 章节类型 (intro/body/conclusion/case_study/deep_dive)
         writing_tips: 写作建议
         core_argument: 核心论点
+        materials_text: 预先渲染好的素材文本（来自会话级素材摘要），提供时忽略 materials
 
     Returns:
         (system_prompt, user_prompt) 元组
@@ -136,27 +186,9 @@ def format_section_prompt(
     if writing_tips:
         points_text += f"\n**写作建议**：{writing_tips}"
 
-    # 格式化素材 - 更丰富的信息
-    materials_text = ""
-    for mat in materials:
-        mat_id = mat.get('id', 'unknown')
-        title = mat.get('title', '未知')
-        source = mat.get('source', '未知')
-        summary = mat.get('summary', '')
-        key_points = mat.get('key_points', [])
-
-        materials_text += f"### [{mat_id}] {title}\n"
-        materials_text += f"**来源**：{source}\n"
-
-        if summary:
-            materials_text += f"**摘要**：{summary[:200]}{'...' if len(summary) > 200 else ''}\n"
-
-        if key_points:
-            materials_text += "**可引用要点**：\n"
-            for point in key_points[:3]:
-                materials_text += f"  - {point}\n"
-
-        materials_text += "\n"
+    # 格式化素材 - 更丰富的信息（已有素材摘要时直接复用）
+    if materials_text is None:
+        materials_text = format_materials(materials)
 
     if not materials_text:
         materials_text = "暂无直接相关素材，请基于专业知识撰写"
@@ -182,7 +214,7 @@ def format_section_prompt(
     elif section_type == "deep_dive":
         section_guidance = "\n\n**章节类型提示**：这是深度分析部分，需要：\n- 深入剖析技术原理或机制\n- 提供详细的技术细节\n- 可以包含代码示例或架构图说明"
 
-    user_prompt = SECTION_PROMPT_TEMPLATE.format(
+    return SECTION_PROMPT.render(
         article_title=article_title,
         section_title=section_title,
         section_points=points_text + section_guidance,
@@ -191,25 +223,9 @@ def format_section_prompt(
         target_words=target_words
     )
 
-    return SYSTEM_PROMPT, user_prompt
-
-
-# 引言部分的特殊提示词
-INTRODUCTION_TEMPLATE = """## 引言写作任务
-
-**文章标题**：{article_title}
-**主题**：{topic}
-**目标字数**：200-300 字
-
----
-
-## 文章大纲概览
-
-{outline_overview}
-
----
 
-## 写作要求
+# 引言部分的特殊提示词：静态前缀
+INTRODUCTION_STATIC_PREFIX = """## 写作要求
 
 ### 引言的核心目标
 1. **抓住注意力**：用一个引人入胜的开头（可以是问题、数据、场景或故事）
@@ -230,9 +246,28 @@ INTRODUCTION_TEMPLATE = """## 引言写作任务
 - 不要使用"本文将介绍..."等程式化表述
 - 不要包含标题
 
+---
+
+"""
+
+# 引言部分的特殊提示词：动态后缀
+INTRODUCTION_DYNAMIC_TEMPLATE = """## 引言写作任务
+
+**文章标题**：{article_title}
+**主题**：{topic}
+**目标字数**：200-300 字
+
+---
+
+## 文章大纲概览
+
+{outline_overview}
+
 请直接输出引言内容。
 """
 
+INTRODUCTION_PROMPT = register_prompt("write.introduction", SYSTEM_PROMPT, INTRODUCTION_STATIC_PREFIX, INTRODUCTION_DYNAMIC_TEMPLATE)
+
 
 def format_introduction_prompt(
     article_title: str,
@@ -240,36 +275,15 @@ def format_introduction_prompt(
     outline_overview: str
 ) -> tuple[str, str]:
     """格式化引言写作提示词"""
-    user_prompt = INTRODUCTION_TEMPLATE.format(
+    return INTRODUCTION_PROMPT.render(
         article_title=article_title,
         topic=topic,
         outline_overview=outline_overview
     )
-    return SYSTEM_PROMPT, user_prompt
-
-
-# 结尾部分的特殊提示词
-CONCLUSION_TEMPLATE = """## 结尾写作任务
-
-**文章标题**：{article_title}
-**主题**：{topic}
-**目标字数**：200-300 字
-
----
-
-## 文章要点回顾
-
-{key_points}
-
----
 
-## 全文上下文（最后部分）
 
-{article_context}
-
----
-
-## 写作要求
+# 结尾部分的特殊提示词：静态前缀
+CONCLUSION_STATIC_PREFIX = """## 写作要求
 
 ### 结尾的核心目标
 1. **总结升华**：提炼全文核心观点，但不是简单重复
@@ -296,9 +310,34 @@ CONCLUSION_TEMPLATE = """## 结尾写作任务
 - 不要简单罗列前文内容
 - 不要过于说教或鸡汤
 
+---
+
+"""
+
+# 结尾部分的特殊提示词：动态后缀
+CONCLUSION_DYNAMIC_TEMPLATE = """## 结尾写作任务
+
+**文章标题**：{article_title}
+**主题**：{topic}
+**目标字数**：200-300 字
+
+---
+
+## 文章要点回顾
+
+{key_points}
+
+---
+
+## 全文上下文（最后部分）
+
+{article_context}
+
 请直接输出结尾内容。
 """
 
+CONCLUSION_PROMPT = register_prompt("write.conclusion", SYSTEM_PROMPT, CONCLUSION_STATIC_PREFIX, CONCLUSION_DYNAMIC_TEMPLATE)
+
 
 def format_conclusion_prompt(
     article_title: str,
@@ -312,10 +351,68 @@ def format_conclusion_prompt(
     if len(article_context) > 1000:
         article_context = "..." + article_context[-1000:]
     
-    user_prompt = CONCLUSION_TEMPLATE.format(
+    return CONCLUSION_PROMPT.render(
         article_title=article_title,
         topic=topic,
         key_points=points_text,
         article_context=article_context
     )
-    return SYSTEM_PROMPT, user_prompt
\ No newline at end of file
+
+# 章节优化的系统提示词
+OPTIMIZE_SYSTEM_PROMPT = """你是一个专业的文章优化编辑。
+根据评审建议优化文章中的一个章节，保持原有结构和风格，但改进内容质量。
+
+优化原则：
+1. 保持本章节的核心观点和结构
+2. 只针对给出的评审建议修改，其他内容尽量保持原样
+3. 提升可读性和专业性
+4. 不要大幅改变章节长度
+5. 与文章其他章节保持衔接，不要重复其他章节的内容"""
+
+# 章节优化：静态前缀
+OPTIMIZE_SECTION_STATIC_PREFIX = """## 输出要求
+
+- 只输出优化后的本章节正文（Markdown 格式）
+- 不要输出章节标题，不要输出其他章节的内容
+- 不要解释修改了什么
+
+---
+
+"""
+
+# 章节优化：动态后缀
+OPTIMIZE_SECTION_DYNAMIC_TEMPLATE = """## 优化任务
+
+**文章标题**：{article_title}
+**文章结构**：{outline}
+**待优化章节**：{section_title}
+
+**评审建议**：
+{suggestions}
+
+**章节原文**：
+{section_content}
+
+请直接输出优化后的章节正文。
+"""
+
+OPTIMIZE_SECTION_PROMPT = register_prompt(
+    "write.optimize_section", OPTIMIZE_SYSTEM_PROMPT, OPTIMIZE_SECTION_STATIC_PREFIX, OPTIMIZE_SECTION_DYNAMIC_TEMPLATE
+)
+
+
+def format_optimize_section_prompt(
+    article_title: str,
+    section_title: str,
+    section_content: str,
+    suggestions: list[str],
+    outline: list[str]
+) -> tuple[str, str]:
+    """格式化章节优化提示词"""
+    return OPTIMIZE_SECTION_PROMPT.render(
+        article_title=article_title,
+        outline=" → ".join(outline),
+        section_title=section_title or "开头",
+        suggestions="\n".join([f"- {s}" for s in suggestions]),
+        section_content=section_content
+    )
@@ -8,6 +8,9 @@ KnowledgeFlow 看板工具
     python3 dashboard.py stats    # 仅显示文章统计
     python3 dashboard.py rss      # 仅显示 RSS 源管理
     python3 dashboard.py creation # 仅显示创作进度
+    python3 dashboard.py metrics  # 流水线吞吐时序
+    python3 dashboard.py rebuild-stats # 重建文章统计计数表
+    python3 dashboard.py compact  # 压缩已有长文本并回收数据库空间
     python3 dashboard.py --json   # 输出 JSON 格式
 """
 
@@ -22,6 +25,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from mods.content_stats import ContentStatsMod
 from mods.rss_manager import RSSManagerMod
 from mods.creation_tracker import CreationTrackerMod
+from tools.database import Database
 
 # 默认配置
 DB_PATH = 'data/knowledge-flow/content.db'
@@ -76,6 +80,44 @@ def show_creation(as_json=False):
         print(mod.format_dashboard_text())
 
 
+def rebuild_stats(as_json=False):
+    """重建文章统计计数表（修复计数偏差）"""
+    result = get_content_stats_mod().rebuild_counters()
+    if as_json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"✅ 统计计数表已重建: {result['total']} 篇文章, {result['groups']} 个分组, {result['days']} 个日计数")
+
+
+def compact_storage(as_json=False):
+    """压缩已有的长文本列并 VACUUM 回收空间"""
+    db_file = Path(DB_PATH)
+    size_before = db_file.stat().st_size if db_file.exists() else 0
+    result = Database(DB_PATH).compact_text_storage(vacuum=True)
+    result['file_before'] = size_before
+    result['file_after'] = db_file.stat().st_size if db_file.exists() else 0
+    if as_json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"✅ 已压缩 {result['rows']} 个文本值: "
+              f"{result['bytes_before'] / 1024:.1f} KB → {result['bytes_after'] / 1024:.1f} KB")
+        print(f"   数据库文件: {result['file_before'] / 1024:.1f} KB → {result['file_after'] / 1024:.1f} KB")
+
+
+def show_metrics(as_json=False, resolution='hour', hours=24):
+    """显示流水线吞吐时序"""
+    mod = get_content_stats_mod()
+    if as_json:
+        data = {
+            'last_hour': mod.get_throughput_summary(),
+            'resolution': resolution,
+            'series': mod.get_throughput_series(resolution, hours)
+        }
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+    else:
+        print(mod.format_metrics_text(resolution, hours))
+
+
 def show_all(as_json=False):
     """显示所有看板"""
     if as_json:
@@ -103,6 +145,10 @@ def main():
   python3 dashboard.py stats        仅显示文章统计
   python3 dashboard.py rss          仅显示 RSS 源管理
   python3 dashboard.py creation     仅显示创作进度
+  python3 dashboard.py metrics      流水线吞吐（按小时，最近24小时）
+  python3 dashboard.py metrics --resolution day --hours 720
+  python3 dashboard.py rebuild-stats 重建文章统计计数表
+  python3 dashboard.py compact      压缩已有长文本并回收数据库空间
   python3 dashboard.py --json       输出 JSON 格式
   python3 dashboard.py stats --json 文章统计 JSON 格式
         """
@@ -111,7 +157,7 @@ def main():
     parser.add_argument(
         'dashboard',
         nargs='?',
-        choices=['stats', 'rss', 'creation', 'all'],
+        choices=['stats', 'rss', 'creation', 'metrics', 'rebuild-stats', 'compact', 'all'],
         default='all',
         help='要显示的看板 (默认: all)'
     )
@@ -122,6 +168,20 @@ def main():
         help='输出 JSON 格式'
     )
 
+    parser.add_argument(
+        '--resolution',
+        choices=['minute', 'hour', 'day'],
+        default='hour',
+        help='metrics 时间粒度 (默认: hour)'
+    )
+
+    parser.add_argument(
+        '--hours',
+        type=int,
+        default=24,
+        help='metrics 时间范围（小时，默认: 24）'
+    )
+
     args = parser.parse_args()
 
     if args.dashboard == 'stats':
@@ -130,6 +190,12 @@ def main():
         show_rss(args.json)
     elif args.dashboard == 'creation':
         show_creation(args.json)
+    elif args.dashboard == 'metrics':
+        show_metrics(args.json, args.resolution, args.hours)
+    elif args.dashboard == 'rebuild-stats':
+        rebuild_stats(args.json)
+    elif args.dashboard == 'compact':
+        compact_storage(args.json)
     else:
         show_all(args.json)
 
@@ -1,10 +1,13 @@
 """
 Content Stats Mod - 文章统计看板
 集成到 OpenAgents 框架的网络级 Mod
+
+总览、每日统计和流水线统计读取由触发器维护的计数表（tools/content_counters.py），
+查询代价与分组数相关而与文章总数无关；请求结果经共享查询缓存（mods/query_cache.py）返回，
+内容采集、摘要、打标签事件到达时失效
 """
 
 import sqlite3
-import json
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any, List, Optional
@@ -15,22 +18,87 @@ from openagents.models.messages import Event
 from openagents.models.event_response import EventResponse
 from openagents.models.tool import AgentTool
 
+from tools.content_counters import ensure_counters, rebuild_counters
+from tools.database import Database
+from tools.metrics_store import MetricsStore, PipelineMetric, RESOLUTIONS
+from mods.query_cache import get_query_cache, DEFAULT_TTL_SECONDS
+
 logger = logging.getLogger(__name__)
 
+# 吞吐指标显示名称（按流水线顺序）
+METRIC_LABELS = {
+    PipelineMetric.INGEST: "采集入库",
+    PipelineMetric.SUMMARIZE: "摘要生成",
+    PipelineMetric.TAG: "标签生成",
+    PipelineMetric.WRITE: "文章写作",
+    PipelineMetric.REVIEW: "评审",
+    PipelineMetric.BACKLOG_SUMMARIZE: "待摘要积压",
+    PipelineMetric.BACKLOG_TAG: "待标签积压",
+}
+
+# 标签文章列表返回的列
+ARTICLE_COLUMNS = ('id', 'title', 'source', 'category', 'status', 'collected_at')
+
 
 class ContentStatsMod(BaseMod):
     """文章统计 Mod - 提供文章收集和处理的统计信息"""
 
+    CACHE_NAMESPACE = "content_stats"
+
     def __init__(self, mod_name: str = "content_stats"):
         super().__init__(mod_name)
         self.db_path = None
+        self.database = None
+        self.metrics = None
+        self.cache = get_query_cache()
+        self.cache_ttl = DEFAULT_TTL_SECONDS
 
     def initialize(self) -> bool:
         """初始化 mod"""
         self.db_path = self.config.get('db_path', 'data/knowledge-flow/content.db')
+        self.cache_ttl = self.config.get('cache_ttl', DEFAULT_TTL_SECONDS)
+        self._ensure_counters()
+        self.database = Database(self.db_path)
+        self.metrics = MetricsStore(self.db_path)
         logger.info(f"ContentStatsMod initialized with db: {self.db_path}")
         return True
 
+    def _ensure_counters(self):
+        """确保计数表和触发器存在（content_items 表尚未创建时跳过，由 Database 初始化时创建）"""
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'content_items'")
+            if cursor.fetchone():
+                ensure_counters(conn)
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error ensuring content counters: {e}")
+        finally:
+            conn.close()
+
+    def rebuild_counters(self) -> Dict[str, int]:
+        """按原表重建计数表（修复计数偏差）"""
+        conn = self._get_connection()
+        try:
+            ensure_counters(conn)
+            result = rebuild_counters(conn)
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+
+    def _read_counters(self, cursor) -> Dict[str, Dict[str, Any]]:
+        """读取计数表 {dimension: {value: row}}"""
+        cursor.execute("""
+            SELECT dimension, value, count, score_sum, score_count
+            FROM content_counters WHERE count > 0 OR dimension = 'total'
+        """)
+        counters: Dict[str, Dict[str, Any]] = {}
+        for row in cursor.fetchall():
+            counters.setdefault(row['dimension'], {})[row['value']] = row
+        return counters
+
     def _get_connection(self) -> sqlite3.Connection:
         """获取数据库连接"""
         conn = sqlite3.connect(self.db_path)
@@ -68,20 +136,48 @@ class ContentStatsMod(BaseMod):
             )
         ]
 
+    async def _cached(self, key: str, compute) -> Any:
+        """读取查询缓存（TTL 内直接返回，并发的相同请求只计算一次）"""
+        return await self.cache.get_or_compute(self.CACHE_NAMESPACE, key, compute, ttl=self.cache_ttl)
+
+    def invalidate_cache(self, reason: str = ""):
+        """失效本 Mod 的查询缓存"""
+        self.cache.invalidate(self.CACHE_NAMESPACE, reason)
+
     async def _tool_get_stats(self, **kwargs) -> Dict[str, Any]:
         """工具：获取统计信息"""
-        return self.get_overview_stats()
+        return await self._cached("overview", self.get_overview_stats)
 
     async def _tool_get_dashboard(self, format: str = "json", **kwargs) -> Any:
         """工具：获取看板数据"""
         if format == "text":
-            return self.format_dashboard_text()
-        return self.get_dashboard_data()
+            return await self._cached("dashboard:text", self.format_dashboard_text)
+        return await self._cached("dashboard", self.get_dashboard_data)
+
+    # 内容数据变化事件：失效缓存，不拦截事件
+
+    @mod_event_handler("content.discovered")
+    async def handle_content_discovered(self, event: Event) -> Optional[EventResponse]:
+        """新内容入库"""
+        self.invalidate_cache(event.event_name)
+        return None
+
+    @mod_event_handler("content.summarized")
+    async def handle_content_summarized(self, event: Event) -> Optional[EventResponse]:
+        """内容摘要完成"""
+        self.invalidate_cache(event.event_name)
+        return None
+
+    @mod_event_handler("content.tagged")
+    async def handle_content_tagged(self, event: Event) -> Optional[EventResponse]:
+        """内容标签完成"""
+        self.invalidate_cache(event.event_name)
+        return None
 
     @mod_event_handler("content.stats.request")
     async def handle_stats_request(self, event: Event) -> Optional[EventResponse]:
         """处理统计请求事件"""
-        stats = self.get_overview_stats()
+        stats = await self._cached("overview", self.get_overview_stats)
         return EventResponse(
             success=True,
             data=stats
@@ -90,7 +186,7 @@ class ContentStatsMod(BaseMod):
     @mod_event_handler("content_stats.overview.get")
     async def handle_overview_get(self, event: Event) -> Optional[EventResponse]:
         """获取总览统计"""
-        stats = self.get_overview_stats()
+        stats = await self._cached("overview", self.get_overview_stats)
         return EventResponse(
             success=True,
             data={"overview": stats}
@@ -103,18 +199,18 @@ class ContentStatsMod(BaseMod):
         if format_type == "text":
             return EventResponse(
                 success=True,
-                data={"text": self.format_dashboard_text()}
+                data={"text": await self._cached("dashboard:text", self.format_dashboard_text)}
             )
         return EventResponse(
             success=True,
-            data=self.get_dashboard_data()
+            data=await self._cached("dashboard", self.get_dashboard_data)
         )
 
     @mod_event_handler("content_stats.daily.get")
     async def handle_daily_get(self, event: Event) -> Optional[EventResponse]:
         """获取每日统计"""
         days = event.payload.get("days", 7) if event.payload else 7
-        daily = self.get_daily_stats(days)
+        daily = await self._cached(f"daily:{days}", lambda: self.get_daily_stats(days))
         return EventResponse(
             success=True,
             data={"daily": daily}
@@ -124,26 +220,82 @@ class ContentStatsMod(BaseMod):
     async def handle_tags_get(self, event: Event) -> Optional[EventResponse]:
         """获取热门标签"""
         limit = event.payload.get("limit", 20) if event.payload else 20
-        tags = self.get_top_tags(limit)
+        tags = await self._cached(f"tags:{limit}", lambda: self.get_top_tags(limit))
         return EventResponse(
             success=True,
             data={"tags": tags}
         )
 
+    @mod_event_handler("content_stats.tags.related")
+    async def handle_tags_related(self, event: Event) -> Optional[EventResponse]:
+        """获取共现标签"""
+        payload = event.payload or {}
+        tag = payload.get("tag")
+        if not tag:
+            return EventResponse(success=False, data={'error': 'tag is required'})
+        limit = payload.get("limit", 10)
+        related = await self._cached(f"tags.related:{tag}:{limit}", lambda: self.get_related_tags(tag, limit))
+        return EventResponse(
+            success=True,
+            data={"tag": tag, "related": related}
+        )
+
+    @mod_event_handler("content_stats.tags.articles")
+    async def handle_tags_articles(self, event: Event) -> Optional[EventResponse]:
+        """获取带有指定标签的文章"""
+        payload = event.payload or {}
+        tag = payload.get("tag")
+        if not tag:
+            return EventResponse(success=False, data={'error': 'tag is required'})
+        limit = payload.get("limit", 10)
+        articles = await self._cached(f"tags.articles:{tag}:{limit}", lambda: self.get_articles_by_tag(tag, limit))
+        return EventResponse(
+            success=True,
+            data={"tag": tag, "articles": articles}
+        )
+
     @mod_event_handler("content_stats.articles.recent")
     async def handle_articles_recent(self, event: Event) -> Optional[EventResponse]:
         """获取最近文章"""
         limit = event.payload.get("limit", 10) if event.payload else 10
-        articles = self.get_recent_articles(limit)
+        articles = await self._cached(f"articles.recent:{limit}", lambda: self.get_recent_articles(limit))
         return EventResponse(
             success=True,
             data={"articles": articles}
         )
 
+    @mod_event_handler("content_stats.counters.rebuild")
+    async def handle_counters_rebuild(self, event: Event) -> Optional[EventResponse]:
+        """重建统计计数表"""
+        try:
+            result = self.rebuild_counters()
+            self.invalidate_cache(event.event_name)
+            return EventResponse(success=True, data={"rebuilt": result})
+        except Exception as e:
+            logger.error(f"Error rebuilding counters: {e}")
+            return EventResponse(success=False, data={'error': str(e)})
+
+    @mod_event_handler("content_stats.metrics.get")
+    async def handle_metrics_get(self, event: Event) -> Optional[EventResponse]:
+        """获取流水线吞吐时序（payload: resolution=minute/hour/day, hours=时间范围）"""
+        payload = event.payload or {}
+        resolution = payload.get("resolution", "hour")
+        hours = payload.get("hours", 24)
+        if resolution not in RESOLUTIONS:
+            return EventResponse(success=False, data={'error': f'unknown resolution: {resolution}'})
+        series = await self._cached(
+            f"metrics:{resolution}:{hours}", lambda: self.get_throughput_series(resolution, hours)
+        )
+        summary = await self._cached("metrics.summary", self.get_throughput_summary)
+        return EventResponse(
+            success=True,
+            data={"resolution": resolution, "series": series, "last_hour": summary}
+        )
+
     @mod_event_handler("content_stats.pipeline.get")
     async def handle_pipeline_get(self, event: Event) -> Optional[EventResponse]:
         """获取处理流水线统计"""
-        pipeline = self.get_processing_pipeline_stats()
+        pipeline = await self._cached("pipeline", self.get_processing_pipeline_stats)
         return EventResponse(
             success=True,
             data={"pipeline": pipeline}
@@ -167,36 +319,22 @@ class ContentStatsMod(BaseMod):
         }
 
         try:
-            cursor.execute("SELECT COUNT(*) FROM content_items")
-            stats['total_articles'] = cursor.fetchone()[0]
-
-            cursor.execute("""
-                SELECT status, COUNT(*) as count
-                FROM content_items GROUP BY status
-            """)
-            stats['by_status'] = {row['status']: row['count'] for row in cursor.fetchall()}
-
-            cursor.execute("""
-                SELECT source, COUNT(*) as count
-                FROM content_items GROUP BY source
-                ORDER BY count DESC LIMIT 10
-            """)
-            stats['by_source'] = {row['source'] or 'Unknown': row['count'] for row in cursor.fetchall()}
-
-            cursor.execute("""
-                SELECT category, COUNT(*) as count
-                FROM content_items WHERE category IS NOT NULL
-                GROUP BY category ORDER BY count DESC
-            """)
-            stats['by_category'] = {row['category']: row['count'] for row in cursor.fetchall()}
-
-            cursor.execute("""
-                SELECT sentiment, COUNT(*) as count
-                FROM content_items WHERE sentiment IS NOT NULL
-                GROUP BY sentiment
-            """)
-            stats['by_sentiment'] = {row['sentiment']: row['count'] for row in cursor.fetchall()}
-
+            counters = self._read_counters(cursor)
+            total = counters.get('total', {}).get('')
+
+            def ranked(dimension: str) -> List[tuple]:
+                return sorted(
+                    ((value, row['count']) for value, row in counters.get(dimension, {}).items()),
+                    key=lambda x: x[1], reverse=True
+                )
+
+            stats['total_articles'] = total['count'] if total else 0
+            stats['by_status'] = {value or None: count for value, count in ranked('status')}
+            stats['by_source'] = {value or 'Unknown': count for value, count in ranked('source')[:10]}
+            stats['by_category'] = {value: count for value, count in ranked('category') if value}
+            stats['by_sentiment'] = {value: count for value, count in ranked('sentiment') if value}
+
+            # 最近 24 小时 / 7 天：collected_at 索引上的范围计数
             yesterday = (datetime.now() - timedelta(hours=24)).isoformat()
             cursor.execute("SELECT COUNT(*) FROM content_items WHERE collected_at >= ?", (yesterday,))
             stats['recent_24h'] = cursor.fetchone()[0]
@@ -205,8 +343,7 @@ class ContentStatsMod(BaseMod):
             cursor.execute("SELECT COUNT(*) FROM content_items WHERE collected_at >= ?", (week_ago,))
             stats['recent_7d'] = cursor.fetchone()[0]
 
-            cursor.execute("SELECT AVG(relevance_score) FROM content_items WHERE relevance_score IS NOT NULL")
-            avg_score = cursor.fetchone()[0]
+            avg_score = total['score_sum'] / total['score_count'] if total and total['score_count'] else 0
             stats['avg_relevance_score'] = round(avg_score, 2) if avg_score else 0
 
         except Exception as e:
@@ -223,24 +360,22 @@ class ContentStatsMod(BaseMod):
         daily_stats = []
 
         try:
-            start_date = (datetime.now() - timedelta(days=days)).isoformat()
+            start_day = (datetime.now() - timedelta(days=days)).date().isoformat()
             cursor.execute("""
-                SELECT DATE(collected_at) as date, COUNT(*) as count,
-                    COUNT(CASE WHEN status = 'processed' THEN 1 END) as processed,
-                    COUNT(CASE WHEN status = 'summarized' THEN 1 END) as summarized,
-                    COUNT(CASE WHEN status = 'discovered' THEN 1 END) as discovered
-                FROM content_items WHERE collected_at >= ?
-                GROUP BY DATE(collected_at) ORDER BY date DESC
-            """, (start_date,))
+                SELECT day, status, count FROM content_daily_counters
+                WHERE day >= ? AND count > 0
+                ORDER BY day DESC
+            """, (start_day,))
 
+            by_day: Dict[str, Dict[str, Any]] = {}
             for row in cursor.fetchall():
-                daily_stats.append({
-                    'date': row['date'],
-                    'total': row['count'],
-                    'processed': row['processed'],
-                    'summarized': row['summarized'],
-                    'discovered': row['discovered']
+                day = by_day.setdefault(row['day'], {
+                    'date': row['day'], 'total': 0, 'processed': 0, 'summarized': 0, 'discovered': 0
                 })
+                day['total'] += row['count']
+                if row['status'] in ('processed', 'summarized', 'discovered'):
+                    day[row['status']] += row['count']
+            daily_stats = list(by_day.values())
         except Exception as e:
             logger.error(f"Error getting daily stats: {e}")
         finally:
@@ -249,33 +384,29 @@ class ContentStatsMod(BaseMod):
         return daily_stats
 
     def get_top_tags(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """获取热门标签"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        tag_counts = {}
-
+        """获取热门标签（content_tags 索引表上的分组计数）"""
         try:
-            cursor.execute("SELECT tags FROM content_items WHERE tags IS NOT NULL AND tags != ''")
-            for row in cursor.fetchall():
-                try:
-                    tags_data = json.loads(row['tags']) if row['tags'] else {}
-                    if isinstance(tags_data, dict):
-                        for tag_type, tags in tags_data.items():
-                            if isinstance(tags, list):
-                                for tag in tags:
-                                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-                    elif isinstance(tags_data, list):
-                        for tag in tags_data:
-                            tag_counts[tag] = tag_counts.get(tag, 0) + 1
-                except:
-                    pass
+            return self.database.get_top_tags(limit)
         except Exception as e:
             logger.error(f"Error getting top tags: {e}")
-        finally:
-            conn.close()
+            return []
 
-        sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
-        return [{'tag': tag, 'count': count} for tag, count in sorted_tags]
+    def get_related_tags(self, tag: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """获取与指定标签共同出现的标签"""
+        try:
+            return self.database.get_related_tags(tag, limit)
+        except Exception as e:
+            logger.error(f"Error getting related tags: {e}")
+            return []
+
+    def get_articles_by_tag(self, tag: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """获取带有指定标签的文章"""
+        try:
+            rows = self.database.get_content_by_tag(tag, limit, columns=ARTICLE_COLUMNS)
+            return [row.to_dict() for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting articles by tag: {e}")
+            return []
 
     def get_recent_articles(self, limit: int = 10) -> List[Dict[str, Any]]:
         """获取最近的文章"""
@@ -315,10 +446,12 @@ class ContentStatsMod(BaseMod):
         pipeline_stats = {'discovered': 0, 'summarized': 0, 'processed': 0, 'pending_summary': 0, 'pending_tags': 0}
 
         try:
-            cursor.execute("SELECT status, COUNT(*) as count FROM content_items GROUP BY status")
+            cursor.execute("""
+                SELECT value, count FROM content_counters WHERE dimension = 'status'
+            """)
             for row in cursor.fetchall():
-                if row['status'] in pipeline_stats:
-                    pipeline_stats[row['status']] = row['count']
+                if row['value'] in pipeline_stats:
+                    pipeline_stats[row['value']] = row['count']
             pipeline_stats['pending_summary'] = pipeline_stats.get('discovered', 0)
             pipeline_stats['pending_tags'] = pipeline_stats.get('summarized', 0)
         except Exception as e:
@@ -328,6 +461,80 @@ class ContentStatsMod(BaseMod):
 
         return pipeline_stats
 
+    def get_throughput_summary(self, window_seconds: int = 3600) -> Dict[str, Dict[str, Any]]:
+        """获取最近一段时间各环节吞吐和耗时"""
+        try:
+            return self.metrics.summary(window_seconds)
+        except Exception as e:
+            logger.error(f"Error getting throughput summary: {e}")
+            return {}
+
+    def get_throughput_series(self, resolution: str = 'hour', hours: int = 24) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        获取各环节吞吐时序
+
+        Args:
+            resolution: 粒度（minute/hour/day）
+            hours: 时间范围（小时）
+        """
+        try:
+            return self.metrics.query(resolution=resolution, since=datetime.now().timestamp() - hours * 3600)
+        except Exception as e:
+            logger.error(f"Error getting throughput series: {e}")
+            return {}
+
+    def format_metrics_text(self, resolution: str = 'hour', hours: int = 24) -> str:
+        """格式化吞吐时序为文本输出"""
+        summary = self.get_throughput_summary()
+        series = self.get_throughput_series(resolution, hours)
+        time_format = {'minute': '%H:%M', 'hour': '%m-%d %H:00', 'day': '%Y-%m-%d'}[resolution]
+
+        lines = ["=" * 50, "⏱️ 流水线吞吐", "=" * 50, ""]
+        lines.extend(self._format_throughput_summary(summary) or ["  最近1小时没有记录", ""])
+
+        for metric in METRIC_LABELS:
+            buckets = series.get(metric)
+            if not buckets:
+                continue
+            lines.append(f"📈 {METRIC_LABELS[metric]}（{resolution}）")
+            for bucket in buckets[-24:]:
+                start = datetime.fromtimestamp(bucket['bucket_start']).strftime(time_format)
+                if metric.startswith('backlog.'):
+                    lines.append(f"  {start}  积压 {bucket['avg'] or 0:.0f}")
+                    continue
+                line = f"  {start}  {bucket['count']:>4} 次"
+                if bucket['errors']:
+                    line += f"  失败 {bucket['errors']}"
+                if bucket['avg'] is not None:
+                    line += f"  平均 {bucket['avg']:.0f}ms  最大 {bucket['max']:.0f}ms"
+                lines.append(line)
+            lines.append("")
+
+        lines.extend(["=" * 50, f"生成时间: {datetime.now().isoformat()}"])
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_throughput_summary(summary: Dict[str, Dict[str, Any]]) -> List[str]:
+        """格式化最近1小时吞吐（没有记录时返回空列表）"""
+        if not summary:
+            return []
+        lines = ["⏱️ 最近1小时吞吐"]
+        for metric, label in METRIC_LABELS.items():
+            stats = summary.get(metric)
+            if not stats:
+                continue
+            if metric.startswith('backlog.'):
+                lines.append(f"  {label}: {stats['avg'] or 0:.0f}（最高 {stats['max'] or 0:.0f}）")
+                continue
+            line = f"  {label}: {stats['count']} 次, {stats['per_minute']}/分钟"
+            if stats['errors']:
+                line += f", 失败 {stats['errors']}"
+            if stats['avg'] is not None:
+                line += f", 平均 {stats['avg']:.0f}ms"
+            lines.append(line)
+        lines.append("")
+        return lines
+
     def get_dashboard_data(self) -> Dict[str, Any]:
         """获取完整的看板数据"""
         return {
@@ -336,6 +543,7 @@ class ContentStatsMod(BaseMod):
             'top_tags': self.get_top_tags(15),
             'recent_articles': self.get_recent_articles(10),
             'pipeline': self.get_processing_pipeline_stats(),
+            'throughput': self.get_throughput_summary(),
             'generated_at': datetime.now().isoformat()
         }
 
@@ -361,6 +569,7 @@ class ContentStatsMod(BaseMod):
             f"  待标签: {pipeline['pending_tags']}",
             "",
         ]
+        lines.extend(self._format_throughput_summary(data['throughput']))
 
         if overview['by_source']:
             lines.append("📰 按来源")
@@ -1,6 +1,8 @@
 """
 Creation Tracker Mod - 创作追踪器
 集成到 OpenAgents 框架的网络级 Mod
+
+请求结果经共享查询缓存（mods/query_cache.py）返回，大纲生成、开始写作、草稿完成和优化完成事件到达时失效
 """
 
 import sqlite3
@@ -15,19 +17,27 @@ from openagents.models.messages import Event
 from openagents.models.event_response import EventResponse
 from openagents.models.tool import AgentTool
 
+from tools.text_codec import decompress_text
+from mods.query_cache import get_query_cache, DEFAULT_TTL_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
 class CreationTrackerMod(BaseMod):
     """创作追踪 Mod - 追踪大纲和草稿的创作进度"""
 
+    CACHE_NAMESPACE = "creation_tracker"
+
     def __init__(self, mod_name: str = "creation_tracker"):
         super().__init__(mod_name)
         self.db_path = None
+        self.cache = get_query_cache()
+        self.cache_ttl = DEFAULT_TTL_SECONDS
 
     def initialize(self) -> bool:
         """初始化 mod"""
         self.db_path = self.config.get('db_path', 'data/knowledge-flow/content.db')
+        self.cache_ttl = self.config.get('cache_ttl', DEFAULT_TTL_SECONDS)
         logger.info(f"CreationTrackerMod initialized with db: {self.db_path}")
         return True
 
@@ -84,30 +94,64 @@ class CreationTrackerMod(BaseMod):
             )
         ]
 
+    async def _cached(self, key: str, compute) -> Any:
+        """读取查询缓存（TTL 内直接返回，并发的相同请求只计算一次）"""
+        return await self.cache.get_or_compute(self.CACHE_NAMESPACE, key, compute, ttl=self.cache_ttl)
+
+    def invalidate_cache(self, reason: str = ""):
+        """失效本 Mod 的查询缓存"""
+        self.cache.invalidate(self.CACHE_NAMESPACE, reason)
+
     async def _tool_get_stats(self, **kwargs) -> Dict[str, Any]:
-        return self.get_creation_pipeline()
+        return await self._cached("pipeline", self.get_creation_pipeline)
 
     async def _tool_list_outlines(self, limit: int = 10, **kwargs) -> List[Dict[str, Any]]:
-        return self.get_recent_outlines(limit)
+        return await self._cached(f"outlines:{limit}", lambda: self.get_recent_outlines(limit))
 
     async def _tool_list_drafts(self, limit: int = 10, **kwargs) -> List[Dict[str, Any]]:
-        return self.get_recent_drafts(limit)
+        return await self._cached(f"drafts:{limit}", lambda: self.get_recent_drafts(limit))
 
     async def _tool_get_dashboard(self, format: str = "json", **kwargs) -> Any:
         if format == "text":
-            return self.format_dashboard_text()
-        return self.get_dashboard_data()
+            return await self._cached("dashboard:text", self.format_dashboard_text)
+        return await self._cached("dashboard", self.get_dashboard_data)
+
+    # 创作数据变化事件：失效缓存，不拦截事件
+
+    @mod_event_handler("creation.outlines_ready")
+    async def handle_outlines_ready(self, event: Event) -> Optional[EventResponse]:
+        """大纲生成完成"""
+        self.invalidate_cache(event.event_name)
+        return None
+
+    @mod_event_handler("creation.start_writing")
+    async def handle_start_writing(self, event: Event) -> Optional[EventResponse]:
+        """大纲被选中，开始写作"""
+        self.invalidate_cache(event.event_name)
+        return None
+
+    @mod_event_handler("creation.draft_ready")
+    async def handle_draft_ready(self, event: Event) -> Optional[EventResponse]:
+        """草稿完成"""
+        self.invalidate_cache(event.event_name)
+        return None
+
+    @mod_event_handler("creation.optimization_done")
+    async def handle_optimization_done(self, event: Event) -> Optional[EventResponse]:
+        """草稿优化完成"""
+        self.invalidate_cache(event.event_name)
+        return None
 
     @mod_event_handler("creation.stats.request")
     async def handle_stats_request(self, event: Event) -> Optional[EventResponse]:
         """处理创作统计请求事件"""
-        stats = self.get_creation_pipeline()
+        stats = await self._cached("pipeline", self.get_creation_pipeline)
         return EventResponse(success=True, data=stats)
 
     @mod_event_handler("creation_tracker.pipeline.get")
     async def handle_pipeline_get(self, event: Event) -> Optional[EventResponse]:
         """获取创作流水线状态"""
-        pipeline = self.get_creation_pipeline()
+        pipeline = await self._cached("pipeline", self.get_creation_pipeline)
         return EventResponse(success=True, data=pipeline)
 
     @mod_event_handler("creation_tracker.outlines.list")
@@ -115,13 +159,13 @@ class CreationTrackerMod(BaseMod):
         """列出最近大纲"""
         payload = event.payload or {}
         limit = payload.get('limit', 10)
-        outlines = self.get_recent_outlines(limit)
+        outlines = await self._cached(f"outlines:{limit}", lambda: self.get_recent_outlines(limit))
         return EventResponse(success=True, data={'outlines': outlines, 'total': len(outlines)})
 
     @mod_event_handler("creation_tracker.outlines.stats")
     async def handle_outlines_stats(self, event: Event) -> Optional[EventResponse]:
         """获取大纲统计"""
-        stats = self.get_outlines_stats()
+        stats = await self._cached("outlines.stats", self.get_outlines_stats)
         return EventResponse(success=True, data=stats)
 
     @mod_event_handler("creation_tracker.drafts.list")
@@ -129,13 +173,13 @@ class CreationTrackerMod(BaseMod):
         """列出最近草稿"""
         payload = event.payload or {}
         limit = payload.get('limit', 10)
-        drafts = self.get_recent_drafts(limit)
+        drafts = await self._cached(f"drafts:{limit}", lambda: self.get_recent_drafts(limit))
         return EventResponse(success=True, data={'drafts': drafts, 'total': len(drafts)})
 
     @mod_event_handler("creation_tracker.drafts.stats")
     async def handle_drafts_stats(self, event: Event) -> Optional[EventResponse]:
         """获取草稿统计"""
-        stats = self.get_drafts_stats()
+        stats = await self._cached("drafts.stats", self.get_drafts_stats)
         return EventResponse(success=True, data=stats)
 
     @mod_event_handler("creation_tracker.dashboard.get")
@@ -145,15 +189,15 @@ class CreationTrackerMod(BaseMod):
         format_type = payload.get('format', 'json')
 
         if format_type == 'text':
-            return EventResponse(success=True, data={'text': self.format_dashboard_text()})
-        return EventResponse(success=True, data=self.get_dashboard_data())
+            return EventResponse(success=True, data={'text': await self._cached("dashboard:text", self.format_dashboard_text)})
+        return EventResponse(success=True, data=await self._cached("dashboard", self.get_dashboard_data))
 
     @mod_event_handler("creation_tracker.daily.get")
     async def handle_daily_get(self, event: Event) -> Optional[EventResponse]:
         """获取每日创作统计"""
         payload = event.payload or {}
         days = payload.get('days', 7)
-        daily = self.get_daily_creation_stats(days)
+        daily = await self._cached(f"daily:{days}", lambda: self.get_daily_creation_stats(days))
         return EventResponse(success=True, data={'daily': daily})
 
     def get_outlines_stats(self) -> Dict[str, Any]:
@@ -320,7 +364,9 @@ class CreationTrackerMod(BaseMod):
             """, (draft_id,))
             row = cursor.fetchone()
             if row:
-                return dict(row)
+                draft = dict(row)
+                draft['content'] = decompress_text(draft.get('content'))
+                return draft
         except Exception as e:
             logger.error(f"Error getting draft detail: {e}")
         finally:
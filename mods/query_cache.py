@@ -0,0 +1,159 @@
+"""
+看板查询缓存
+各看板 Mod 共用的查询结果缓存：短 TTL + 事件驱动失效 + 相同请求合并计算
+
+- 按命名空间（Mod 名）隔离，数据变化事件到达时整体失效对应命名空间
+- TTL 内的请求直接返回缓存结果
+- 并发的相同请求只在线程池中计算一次，其余请求等待同一结果
+- 计算作为独立任务运行，个别等待者被取消不影响其余等待者和结果写入缓存
+- 计算期间发生失效时，结果只返回给本次等待者，不写入缓存
+- invalidate 可以在任意线程调用（如配置变更回调运行在线程池中），缓存表的读写由锁保护
+"""
+
+import time
+import asyncio
+import threading
+import logging
+from typing import Dict, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存时间（秒），可通过 Mod 配置 cache_ttl 覆盖
+DEFAULT_TTL_SECONDS = 30
+
+# 最多缓存的查询结果数
+MAX_ENTRIES = 256
+
+
+class QueryCache:
+    """看板查询缓存"""
+
+    def __init__(self, default_ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        """
+        初始化
+
+        Args:
+            default_ttl: 默认缓存时间（秒）
+            max_entries: 最多缓存的结果数
+        """
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        # {'命名空间:键': (过期时间, 结果)}
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        # {'命名空间:键': 计算中的 Task}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # {命名空间: 失效代数}（每次失效加一）
+        self._generations: Dict[str, int] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidations': 0}
+        # 保护 _entries / _generations / _stats（计算结果写入和失效可能来自不同线程）
+        self._lock = threading.Lock()
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        读取缓存，未命中时计算并写入
+
+        Args:
+            namespace: 命名空间（通常为 Mod 名）
+            key: 查询键（需包含影响结果的参数）
+            compute: 无参的同步计算函数（在线程池中执行）
+            ttl: 缓存时间（秒），默认使用 default_ttl
+
+        Returns:
+            查询结果
+        """
+        full_key = f"{namespace}:{key}"
+
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry and entry[0] > time.monotonic():
+                self._stats['hits'] += 1
+                return entry[1]
+
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            self._stats['coalesced'] += 1
+            return await asyncio.shield(inflight)
+
+        with self._lock:
+            self._stats['misses'] += 1
+            generation = self._generations.get(namespace, 0)
+        task = asyncio.ensure_future(
+            self._compute(full_key, namespace, generation, compute, ttl)
+        )
+        # 所有等待者都被取消时避免 "exception was never retrieved" 警告
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[full_key] = task
+        # 发起者同样通过 shield 等待，被取消时计算继续完成
+        return await asyncio.shield(task)
+
+    async def _compute(
+        self,
+        full_key: str,
+        namespace: str,
+        generation: int,
+        compute: Callable[[], Any],
+        ttl: Optional[float]
+    ) -> Any:
+        """在线程池中计算并写入缓存（计算期间发生失效时不写入）"""
+        try:
+            value = await asyncio.to_thread(compute)
+        finally:
+            self._inflight.pop(full_key, None)
+
+        with self._lock:
+            if self._generations.get(namespace, 0) == generation:
+                self._store(full_key, value, self.default_ttl if ttl is None else ttl)
+        return value
+
+    def _store(self, full_key: str, value: Any, ttl: float):
+        """写入缓存（超出容量时先清理过期项，仍不足则淘汰最早写入的项；调用方需持有锁）"""
+        if full_key not in self._entries and len(self._entries) >= self.max_entries:
+            now = time.monotonic()
+            for k in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[k]
+            if len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        self._entries[full_key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, namespace: str, reason: str = ""):
+        """
+        失效命名空间下的全部缓存
+
+        Args:
+            namespace: 命名空间
+            reason: 失效原因（用于日志，如触发的事件名）
+        """
+        prefix = f"{namespace}:"
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for k in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[k]
+            self._stats['invalidations'] += 1
+        logger.debug(f"🧹 查询缓存失效: {namespace} ({reason or 'manual'})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'inflight': len(self._inflight)
+            }
+
+
+# 全局缓存实例
+_cache_instance: Optional[QueryCache] = None
+
+
+def get_query_cache() -> QueryCache:
+    """获取全局查询缓存实例"""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = QueryCache()
+    return _cache_instance
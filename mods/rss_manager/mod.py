@@ -1,13 +1,13 @@
 """
 RSS Manager Mod - RSS 源管理
 集成到 OpenAgents 框架的网络级 Mod
+
+请求结果经共享查询缓存（mods/query_cache.py）返回，订阅源配置修改和新内容入库时失效
 """
 
 import sqlite3
-import yaml
 import json
-from datetime import datetime, timedelta
-from pathlib import Path
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 import logging
 
@@ -16,26 +16,53 @@ from openagents.models.messages import Event
 from openagents.models.event_response import EventResponse
 from openagents.models.tool import AgentTool
 
+from tools.feed_registry import get_feed_registry
+from mods.query_cache import get_query_cache, DEFAULT_TTL_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
 class RSSManagerMod(BaseMod):
     """RSS 源管理 Mod - 提供 RSS 订阅源的管理和状态监控功能"""
 
+    CACHE_NAMESPACE = "rss_manager"
+
     def __init__(self, mod_name: str = "rss_manager"):
         super().__init__(mod_name)
         self.db_path = None
         self.feeds_config_path = None
-        self._feeds_cache = None
-        self._feeds_cache_time = None
+        self.registry = None
+        self.cache = get_query_cache()
+        self.cache_ttl = DEFAULT_TTL_SECONDS
 
     def initialize(self) -> bool:
         """初始化 mod"""
         self.db_path = self.config.get('db_path', 'data/knowledge-flow/content.db')
         self.feeds_config_path = self.config.get('feeds_config', 'config/rss_feeds.yaml')
+        self.registry = get_feed_registry(self.feeds_config_path)
+        self.registry.subscribe(lambda config, version: self.invalidate_cache(f"feeds config v{version}"))
+        self.cache_ttl = self.config.get('cache_ttl', DEFAULT_TTL_SECONDS)
+        self._ensure_source_index()
         logger.info(f"RSSManagerMod initialized")
         return True
 
+    def _ensure_source_index(self):
+        """确保按来源分组统计的索引存在（content_items 表尚未创建时跳过，由 Database 初始化时创建）"""
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'content_items'")
+            if cursor.fetchone():
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_content_source_collected "
+                    "ON content_items(source, collected_at)"
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error ensuring source index: {e}")
+        finally:
+            conn.close()
+
     def _get_connection(self) -> sqlite3.Connection:
         """获取数据库连接"""
         conn = sqlite3.connect(self.db_path)
@@ -92,8 +119,16 @@ class RSSManagerMod(BaseMod):
             )
         ]
 
+    async def _cached(self, key: str, compute) -> Any:
+        """读取查询缓存（TTL 内直接返回，并发的相同请求只计算一次）"""
+        return await self.cache.get_or_compute(self.CACHE_NAMESPACE, key, compute, ttl=self.cache_ttl)
+
+    def invalidate_cache(self, reason: str = ""):
+        """失效本 Mod 的查询缓存"""
+        self.cache.invalidate(self.CACHE_NAMESPACE, reason)
+
     async def _tool_list_feeds(self, **kwargs) -> List[Dict[str, Any]]:
-        return self.get_all_feeds()
+        return await self._cached("feeds", self.get_all_feeds)
 
     async def _tool_add_feed(self, name: str, url: str, category: str = "tech-news", enabled: bool = True, **kwargs) -> Dict[str, Any]:
         success = self.add_feed({'name': name, 'url': url, 'category': category, 'enabled': enabled})
@@ -107,19 +142,25 @@ class RSSManagerMod(BaseMod):
 
     async def _tool_get_dashboard(self, format: str = "json", **kwargs) -> Any:
         if format == "text":
-            return self.format_dashboard_text()
-        return self.get_feed_stats()
+            return await self._cached("dashboard:text", self.format_dashboard_text)
+        return await self._cached("stats", self.get_feed_stats)
+
+    @mod_event_handler("content.discovered")
+    async def handle_content_discovered(self, event: Event) -> Optional[EventResponse]:
+        """新内容入库：文章数和最近采集时间变化，失效缓存（不拦截事件）"""
+        self.invalidate_cache(event.event_name)
+        return None
 
     @mod_event_handler("rss.feeds.request")
     async def handle_feeds_request(self, event: Event) -> Optional[EventResponse]:
         """处理 RSS 源请求事件"""
-        feeds = self.get_all_feeds()
+        feeds = await self._cached("feeds", self.get_all_feeds)
         return EventResponse(success=True, data={'feeds': feeds})
 
     @mod_event_handler("rss_manager.feeds.list")
     async def handle_feeds_list(self, event: Event) -> Optional[EventResponse]:
         """列出所有 RSS 源"""
-        feeds = self.get_all_feeds()
+        feeds = await self._cached("feeds", self.get_all_feeds)
         return EventResponse(success=True, data={'feeds': feeds, 'total': len(feeds)})
 
     @mod_event_handler("rss_manager.feeds.add")
@@ -176,75 +217,98 @@ class RSSManagerMod(BaseMod):
         format_type = payload.get('format', 'json')
 
         if format_type == 'text':
-            return EventResponse(success=True, data={'text': self.format_dashboard_text()})
-        return EventResponse(success=True, data=self.get_feed_stats())
+            return EventResponse(success=True, data={'text': await self._cached("dashboard:text", self.format_dashboard_text)})
+        return EventResponse(success=True, data=await self._cached("stats", self.get_feed_stats))
 
     @mod_event_handler("rss_manager.stats.get")
     async def handle_stats_get(self, event: Event) -> Optional[EventResponse]:
         """获取 RSS 统计"""
-        stats = self.get_feed_stats()
+        stats = await self._cached("stats", self.get_feed_stats)
         return EventResponse(success=True, data=stats)
 
     def _load_feeds_config(self) -> Dict[str, Any]:
-        """加载 RSS 配置文件"""
-        if self._feeds_cache and self._feeds_cache_time:
-            if datetime.now() - self._feeds_cache_time < timedelta(minutes=5):
-                return self._feeds_cache
-
-        try:
-            config_path = Path(self.feeds_config_path)
-            if config_path.exists():
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    self._feeds_cache = yaml.safe_load(f)
-                    self._feeds_cache_time = datetime.now()
-                    return self._feeds_cache
-        except Exception as e:
-            logger.error(f"Error loading feeds config: {e}")
-
-        return {'feeds': [], 'collection': {}}
+        """加载 RSS 配置（由注册表按文件 mtime/哈希缓存，返回可修改的副本）"""
+        return self.registry.load()
 
     def _save_feeds_config(self, config: Dict[str, Any]) -> bool:
-        """保存 RSS 配置文件"""
-        try:
-            config_path = Path(self.feeds_config_path)
-            config_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
-            self._feeds_cache = None
-            self._feeds_cache_time = None
-            return True
-        except Exception as e:
-            logger.error(f"Error saving feeds config: {e}")
-            return False
+        """保存 RSS 配置（原子写入，注册表通知订阅者）"""
+        return self.registry.save(config)
 
     def get_all_feeds(self) -> List[Dict[str, Any]]:
         """获取所有 RSS 源配置"""
         config = self._load_feeds_config()
         feeds = config.get('feeds', [])
 
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        source_stats = self._get_source_stats()
+        fetch_stats = self._get_fetch_stats()
 
         for feed in feeds:
             feed_name = feed.get('name', '')
-            try:
-                cursor.execute("SELECT COUNT(*) FROM content_items WHERE source = ?", (feed_name,))
-                feed['article_count'] = cursor.fetchone()[0]
-
-                cursor.execute("""
-                    SELECT collected_at FROM content_items
-                    WHERE source = ? ORDER BY collected_at DESC LIMIT 1
-                """, (feed_name,))
-                row = cursor.fetchone()
-                feed['last_fetch'] = row['collected_at'] if row else None
-            except Exception as e:
-                logger.error(f"Error getting stats for feed {feed_name}: {e}")
-                feed['article_count'] = 0
-                feed['last_fetch'] = None
-
-        conn.close()
+            stats = source_stats.get(feed_name, {})
+            feed['article_count'] = stats.get('article_count', 0)
+            feed['last_fetch'] = stats.get('last_collected')
+            feed['health'] = fetch_stats.get(feed_name)
+
         return feeds
 
+    def _get_source_stats(self) -> Dict[str, Dict[str, Any]]:
+        """按来源统计文章数和最近采集时间（一次分组查询）"""
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT source, COUNT(*) AS article_count, MAX(collected_at) AS last_collected
+                FROM content_items GROUP BY source
+            """)
+            return {
+                row['source']: {'article_count': row['article_count'], 'last_collected': row['last_collected']}
+                for row in cursor.fetchall()
+            }
+        except Exception as e:
+            logger.error(f"Error getting feed stats: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    def _get_fetch_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各来源的抓取健康度（RSS 采集器每次抓取后写入 feed_fetch_stats）"""
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM feed_fetch_stats")
+            rows = cursor.fetchall()
+        except sqlite3.OperationalError:
+            # 表尚未创建（采集器还没有运行过）
+            return {}
+        except Exception as e:
+            logger.error(f"Error getting feed fetch stats: {e}")
+            return {}
+        finally:
+            conn.close()
+
+        stats = {}
+        for row in rows:
+            fetch_count = row['fetch_count'] or 0
+            stats[row['source']] = {
+                'last_success_at': row['last_success_at'],
+                'last_error_at': row['last_error_at'],
+                'last_error': row['last_error'],
+                'last_items': row['last_items'],
+                'last_latency_ms': row['last_latency_ms'],
+                'fetch_count': fetch_count,
+                'error_count': row['error_count'] or 0,
+                'avg_items': round((row['total_items'] or 0) / fetch_count, 1) if fetch_count else 0,
+                'avg_latency_ms': round((row['total_latency_ms'] or 0) / fetch_count) if fetch_count else 0
+            }
+        return stats
+
+    @staticmethod
+    def _is_failing(health: Optional[Dict[str, Any]]) -> bool:
+        """最近一次抓取是否失败（最近失败时间晚于最近成功时间）"""
+        if not health or not health.get('last_error_at'):
+            return False
+        return not health.get('last_success_at') or health['last_error_at'] > health['last_success_at']
+
     def get_feed_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """根据名称获取 RSS 源"""
         feeds = self.get_all_feeds()
@@ -343,6 +407,7 @@ class RSSManagerMod(BaseMod):
             'disabled_feeds': sum(1 for f in feeds if not f.get('enabled', True)),
             'by_category': {},
             'total_articles': 0,
+            'failing_feeds': 0,
             'collection_interval': collection_config.get('interval', 30),
             'feeds': []
         }
@@ -355,12 +420,17 @@ class RSSManagerMod(BaseMod):
             stats['by_category'][category]['articles'] += feed.get('article_count', 0)
             stats['total_articles'] += feed.get('article_count', 0)
 
+            health = feed.get('health')
+            if self._is_failing(health):
+                stats['failing_feeds'] += 1
+
             stats['feeds'].append({
                 'name': feed.get('name'),
                 'enabled': feed.get('enabled', True),
                 'category': category,
                 'article_count': feed.get('article_count', 0),
-                'last_fetch': feed.get('last_fetch')
+                'last_fetch': feed.get('last_fetch'),
+                'health': health
             })
 
         return stats
@@ -376,6 +446,7 @@ class RSSManagerMod(BaseMod):
             f"  已启用: {stats['enabled_feeds']}",
             f"  已禁用: {stats['disabled_feeds']}",
             f"  总文章数: {stats['total_articles']}",
+            f"  抓取失败: {stats['failing_feeds']}",
             f"  采集间隔: {stats['collection_interval']} 分钟",
             "", "📁 按分类",
         ]
@@ -394,6 +465,16 @@ class RSSManagerMod(BaseMod):
                 f"{feed['article_count']:>4} 篇 | "
                 f"最近: {last_fetch}"
             )
+            health = feed.get('health')
+            if health:
+                last_success = health['last_success_at'][:16] if health['last_success_at'] else "从未"
+                line = (
+                    f"      抓取 {health['fetch_count']} 次, 失败 {health['error_count']} 次 | "
+                    f"平均 {health['avg_items']} 条/{health['avg_latency_ms']}ms | 最近成功: {last_success}"
+                )
+                if self._is_failing(health):
+                    line += f" | ⚠️ {(health['last_error'] or '')[:40]}"
+                lines.append(line)
 
         lines.extend(["", "=" * 50, f"生成时间: {datetime.now().isoformat()}"])
         return "\n".join(lines)
@@ -0,0 +1,270 @@
+"""
+AI味本地统计评分器
+在调用 LLM 之前用统计特征快速估计草稿的 AI 味，并找出最典型的句子
+
+特征（一次遍历计算）：
+- 套话密度：「值得注意的是」「综上所述」等 AI 高频短语（Aho-Corasick 多模式匹配）
+- 连接词密度：句首「首先/此外/因此」等连接词占比
+- 句长离散度：句长变异系数，越均匀越像 AI
+- 结构化比例：列表行、标题行占比
+- 口语化标记：「我」「其实」「说实话」等，越多越像人写的
+
+评分模型为带手工权重的逻辑回归，输出 0-1 的 AI 味分数（越高越像 AI 生成）
+"""
+
+import math
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Any, List
+
+from tools.sensitive_scanner import AhoCorasick
+
+logger = logging.getLogger(__name__)
+
+# AI 高频套话
+STOCK_PHRASES = [
+    "值得注意的是", "需要指出的是", "需要注意的是", "不可否认", "毋庸置疑",
+    "综上所述", "总而言之", "总的来说", "总之", "由此可见",
+    "在当今", "随着科技的发展", "随着技术的不断发展", "日新月异",
+    "至关重要", "不可或缺", "举足轻重", "扮演着重要的角色", "发挥着重要作用",
+    "深入探讨", "全面解析", "让我们一起", "让我们来看看", "接下来我们",
+    "赋能", "助力", "一站式", "全方位", "多维度",
+    "一方面", "另一方面", "不仅如此", "与此同时", "换句话说",
+]
+
+# 句首连接词
+CONNECTIVES = (
+    "首先", "其次", "再次", "最后", "此外", "另外", "同时", "因此", "然而",
+    "而且", "并且", "所以", "从而", "因而", "总之", "例如", "比如",
+)
+
+# 口语化 / 个人化标记（负向特征）
+HUMAN_MARKERS = [
+    "我觉得", "我认为", "说实话", "老实说", "其实", "坦白讲", "我们团队",
+    "我自己", "踩坑", "吐槽", "哈哈", "真的", "吧。", "呢。", "啊。",
+]
+
+# 特征权重（正值 = 更像 AI）
+FEATURE_WEIGHTS = {
+    'bias': -1.2,
+    'stock_phrase_per_k': 0.9,     # 每千字套话数
+    'connective_ratio': 3.0,       # 连接词开头的句子占比
+    'length_uniformity': 1.6,      # 1 - 句长变异系数（截断到 0-1）
+    'list_ratio': 1.2,             # 列表行占比
+    'heading_ratio': 1.0,          # 标题行占比
+    'human_marker_per_k': -0.8,    # 每千字口语化标记数
+}
+
+# 每千字密度特征的上限（避免短文本密度失真）
+PER_K_CAP = 10.0
+
+# 低于该分数视为 AI 味明显较低，可跳过 LLM 审查
+SKIP_THRESHOLD = 0.35
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[。！？!?；;])|\n+')
+_LIST_LINE = re.compile(r'^\s*(?:[-*+•]|\d+[.、)])\s+')
+_HEADING_LINE = re.compile(r'^\s*(?:#{1,6}\s|\*\*[^*]+\*\*\s*$)')
+
+_stock_automaton = AhoCorasick(STOCK_PHRASES)
+_human_automaton = AhoCorasick(HUMAN_MARKERS)
+
+
+@dataclass
+class AIFlavorReport:
+    """AI味评分结果"""
+    score: float
+    features: Dict[str, float] = field(default_factory=dict)
+    top_sentences: List[Dict[str, Any]] = field(default_factory=list)
+    stock_phrase_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def clearly_low(self) -> bool:
+        """AI 味是否明显较低（可跳过 LLM）"""
+        return self.score < SKIP_THRESHOLD
+
+
+def _sigmoid(x: float) -> float:
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+def _split_sentences(text: str) -> List[str]:
+    """按中英文句末标点和换行拆句（去掉 Markdown 标记后过滤空句）"""
+    sentences = []
+    for part in _SENTENCE_SPLIT.split(text):
+        part = (part or '').strip().lstrip('#>-*+• ').strip()
+        if len(part) >= 4:
+            sentences.append(part)
+    return sentences
+
+
+class AIFlavorScorer:
+    """AI味本地统计评分器"""
+
+    def __init__(self, weights: Dict[str, float] = None, top_k: int = 8):
+        """
+        初始化评分器
+
+        Args:
+            weights: 特征权重（默认 FEATURE_WEIGHTS）
+            top_k: 返回的典型句子数量
+        """
+        self.weights = dict(FEATURE_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        self.top_k = top_k
+
+    def extract_features(self, text: str) -> tuple:
+        """
+        提取特征
+
+        Returns:
+            (features, sentence_scores, stock_phrase_counts)
+        """
+        chars = max(len(text), 1)
+        lines = [line for line in text.split('\n') if line.strip()]
+        sentences = _split_sentences(text)
+
+        # 套话与口语化标记
+        stock_counts: Dict[str, int] = {}
+        for _, _, index in _stock_automaton.iter_matches(text):
+            phrase = STOCK_PHRASES[index]
+            stock_counts[phrase] = stock_counts.get(phrase, 0) + 1
+        human_hits = sum(1 for _ in _human_automaton.iter_matches(text))
+
+        # 句子级：长度、连接词、套话
+        lengths = []
+        connective_sentences = 0
+        sentence_scores = []
+        for sentence in sentences:
+            lengths.append(len(sentence))
+            starts_with_connective = sentence.startswith(CONNECTIVES)
+            if starts_with_connective:
+                connective_sentences += 1
+
+            phrases = [STOCK_PHRASES[i] for _, _, i in _stock_automaton.iter_matches(sentence)]
+            sentence_score = len(phrases) + (0.8 if starts_with_connective else 0)
+            if sentence_score > 0:
+                reasons = []
+                if phrases:
+                    reasons.append("套话：" + "、".join(dict.fromkeys(phrases)))
+                if starts_with_connective:
+                    reasons.append("程式化连接词开头")
+                sentence_scores.append({
+                    'text': sentence,
+                    'score': sentence_score,
+                    'reasons': reasons
+                })
+
+        if lengths:
+            mean = sum(lengths) / len(lengths)
+            variance = sum((l - mean) ** 2 for l in lengths) / len(lengths)
+            cv = math.sqrt(variance) / mean if mean else 0.0
+        else:
+            cv = 1.0
+
+        features = {
+            'stock_phrase_per_k': min(PER_K_CAP, sum(stock_counts.values()) * 1000 / chars),
+            'connective_ratio': connective_sentences / len(sentences) if sentences else 0.0,
+            'length_uniformity': max(0.0, min(1.0, 1.0 - cv)),
+            'list_ratio': sum(1 for line in lines if _LIST_LINE.match(line)) / len(lines) if lines else 0.0,
+            'heading_ratio': sum(1 for line in lines if _HEADING_LINE.match(line)) / len(lines) if lines else 0.0,
+            'human_marker_per_k': min(PER_K_CAP, human_hits * 1000 / chars),
+        }
+
+        return features, sentence_scores, stock_counts
+
+    def score(self, text: str) -> AIFlavorReport:
+        """
+        计算 AI 味分数
+
+        Args:
+            text: 草稿正文（Markdown）
+
+        Returns:
+            AIFlavorReport
+        """
+        if not text or not text.strip():
+            return AIFlavorReport(score=0.0)
+
+        features, sentence_scores, stock_counts = self.extract_features(text)
+
+        z = self.weights.get('bias', 0.0)
+        for name, value in features.items():
+            z += self.weights.get(name, 0.0) * value
+
+        sentence_scores.sort(key=lambda s: -s['score'])
+        report = AIFlavorReport(
+            score=round(_sigmoid(z), 3),
+            features={k: round(v, 3) for k, v in features.items()},
+            top_sentences=sentence_scores[:self.top_k],
+            stock_phrase_counts=stock_counts
+        )
+        logger.debug(f"AI flavor score={report.score} features={report.features}")
+        return report
+
+    def build_local_review(self, report: AIFlavorReport) -> Dict[str, Any]:
+        """
+        根据本地评分生成审查结果（与 AI味审查员的 LLM 报告结构一致）
+        """
+        overall = round(10 - 9 * report.score, 1)
+        features = report.features
+
+        indicators = []
+        tips = []
+        if report.stock_phrase_counts:
+            top_phrases = sorted(report.stock_phrase_counts.items(), key=lambda x: -x[1])[:5]
+            indicators.append({
+                'indicator': '套话较多',
+                'examples': [phrase for phrase, _ in top_phrases],
+                'severity': '高' if features.get('stock_phrase_per_k', 0) > 3 else '中'
+            })
+            tips.append('删减「值得注意的是」「综上所述」等套话，直接陈述观点')
+        if features.get('connective_ratio', 0) > 0.2:
+            indicators.append({
+                'indicator': '过度使用连接词',
+                'examples': [s['text'][:20] for s in report.top_sentences if '程式化连接词开头' in s['reasons']][:3],
+                'severity': '中'
+            })
+            tips.append('减少「首先其次最后」「此外」等程式化连接')
+        if features.get('length_uniformity', 0) > 0.6:
+            indicators.append({'indicator': '句子长度过于均匀', 'examples': [], 'severity': '中'})
+            tips.append('长短句交替，增加节奏变化')
+        if features.get('list_ratio', 0) > 0.3:
+            indicators.append({'indicator': '列表化表达过多', 'examples': [], 'severity': '低'})
+            tips.append('把部分列表改写为连贯的叙述')
+        if features.get('human_marker_per_k', 0) < 0.5:
+            tips.append('加入个人经历、观点或口语化表达')
+
+        return {
+            'scores': {
+                'originality': overall,
+                'naturalness': overall,
+                'emotionality': overall,
+                'colloquialism': overall
+            },
+            'overall_score': overall,
+            'strengths': ['本地统计未发现明显 AI 生成痕迹'] if report.clearly_low else [],
+            'weaknesses': [i['indicator'] for i in indicators],
+            'ai_indicators': indicators,
+            'humanization_tips': tips,
+            'rewrite_suggestions': [],
+            'verdict': (
+                f"本地统计 AI 味评分 {report.score:.2f}，"
+                + ("AI 味较低，语言整体自然" if report.clearly_low else "存在一定 AI 生成痕迹，建议按提示调整")
+            ),
+            'local_score': report.score,
+            'review_mode': 'local'
+        }
+
+
+# 全局评分器实例
+_scorer_instance = None
+
+
+def get_ai_flavor_scorer() -> AIFlavorScorer:
+    """获取全局 AI味评分器实例"""
+    global _scorer_instance
+    if _scorer_instance is None:
+        _scorer_instance = AIFlavorScorer()
+    return _scorer_instance
@@ -0,0 +1,151 @@
+"""
+内容统计计数表
+由 content_items 上的触发器增量维护，统计看板按分组数读取，不再全表聚合
+
+- content_counters：按维度（total/status/source/category/sentiment）计数，total 行额外记录相关性分数之和
+- content_daily_counters：按采集日期 + 状态计数
+
+触发器覆盖所有写入路径（新增、更新状态/分类/标签、删除）；计数出现偏差时用 rebuild_counters 按原表重建。
+"""
+
+import sqlite3
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# 计数维度（content_items 中对应的列）
+COUNTER_DIMENSIONS = ('status', 'source', 'category', 'sentiment')
+
+# 触发器监听的列（这些列变化时需要调整计数）
+_WATCHED_COLUMNS = COUNTER_DIMENSIONS + ('relevance_score', 'collected_at')
+
+
+def _apply_statements(ref: str, sign: int) -> List[str]:
+    """
+    生成把一行（NEW/OLD）计入或移出计数表的语句
+
+    Args:
+        ref: 'NEW' 或 'OLD'
+        sign: 1 表示计入，-1 表示移出
+    """
+    statements = [
+        "INSERT OR IGNORE INTO content_counters (dimension, value, count, score_sum, score_count) "
+        "VALUES ('total', '', 0, 0, 0)",
+        f"UPDATE content_counters SET count = count + {sign}, "
+        f"score_sum = score_sum + {sign} * COALESCE({ref}.relevance_score, 0), "
+        f"score_count = score_count + {sign} * ({ref}.relevance_score IS NOT NULL) "
+        f"WHERE dimension = 'total' AND value = ''",
+    ]
+    for column in COUNTER_DIMENSIONS:
+        value = f"COALESCE({ref}.{column}, '')"
+        statements.append(
+            "INSERT OR IGNORE INTO content_counters (dimension, value, count, score_sum, score_count) "
+            f"VALUES ('{column}', {value}, 0, 0, 0)"
+        )
+        statements.append(
+            f"UPDATE content_counters SET count = count + {sign} "
+            f"WHERE dimension = '{column}' AND value = {value}"
+        )
+
+    day = f"COALESCE(DATE({ref}.collected_at), '')"
+    status = f"COALESCE({ref}.status, '')"
+    statements.append(
+        f"INSERT OR IGNORE INTO content_daily_counters (day, status, count) VALUES ({day}, {status}, 0)"
+    )
+    statements.append(
+        f"UPDATE content_daily_counters SET count = count + {sign} WHERE day = {day} AND status = {status}"
+    )
+    return statements
+
+
+def _trigger_sql(name: str, timing: str, statements: List[str]) -> str:
+    """生成触发器 DDL"""
+    body = ";\n    ".join(statements)
+    return f"CREATE TRIGGER IF NOT EXISTS {name} {timing} ON content_items\nBEGIN\n    {body};\nEND"
+
+
+def ensure_counters(conn: sqlite3.Connection):
+    """
+    创建计数表和触发器；计数表为空而原表有数据时（首次启用）自动重建
+
+    Args:
+        conn: 数据库连接（content_items 表需已存在；调用方负责提交）
+    """
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS content_counters (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER DEFAULT 0,
+            score_sum REAL DEFAULT 0,
+            score_count INTEGER DEFAULT 0,
+            PRIMARY KEY (dimension, value)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS content_daily_counters (
+            day TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER DEFAULT 0,
+            PRIMARY KEY (day, status)
+        )
+    """)
+
+    cursor.execute(_trigger_sql(
+        "trg_content_counters_insert", "AFTER INSERT", _apply_statements('NEW', 1)
+    ))
+    cursor.execute(_trigger_sql(
+        "trg_content_counters_delete", "AFTER DELETE", _apply_statements('OLD', -1)
+    ))
+    cursor.execute(_trigger_sql(
+        "trg_content_counters_update",
+        f"AFTER UPDATE OF {', '.join(_WATCHED_COLUMNS)}",
+        _apply_statements('OLD', -1) + _apply_statements('NEW', 1)
+    ))
+
+    cursor.execute("SELECT 1 FROM content_counters WHERE dimension = 'total'")
+    if cursor.fetchone() is None:
+        cursor.execute("SELECT 1 FROM content_items LIMIT 1")
+        if cursor.fetchone() is not None:
+            rebuild_counters(conn)
+
+
+def rebuild_counters(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    按 content_items 重建计数表（修复偏差；调用方负责提交）
+
+    Returns:
+        {'total': 文章总数, 'groups': 计数行数, 'days': 日计数行数}
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM content_counters")
+    cursor.execute("DELETE FROM content_daily_counters")
+
+    cursor.execute("""
+        INSERT INTO content_counters (dimension, value, count, score_sum, score_count)
+        SELECT 'total', '', COUNT(*), COALESCE(SUM(relevance_score), 0), COUNT(relevance_score)
+        FROM content_items
+    """)
+    for column in COUNTER_DIMENSIONS:
+        cursor.execute(f"""
+            INSERT INTO content_counters (dimension, value, count, score_sum, score_count)
+            SELECT '{column}', COALESCE({column}, ''), COUNT(*), 0, 0
+            FROM content_items GROUP BY COALESCE({column}, '')
+        """)
+    cursor.execute("""
+        INSERT INTO content_daily_counters (day, status, count)
+        SELECT COALESCE(DATE(collected_at), ''), COALESCE(status, ''), COUNT(*)
+        FROM content_items GROUP BY 1, 2
+    """)
+
+    cursor.execute("SELECT count FROM content_counters WHERE dimension = 'total'")
+    total = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM content_counters")
+    groups = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM content_daily_counters")
+    days = cursor.fetchone()[0]
+
+    logger.info(f"Rebuilt content counters: {total} articles, {groups} groups, {days} daily rows")
+    return {'total': total, 'groups': groups, 'days': days}
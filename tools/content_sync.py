@@ -1,164 +1,104 @@
 """
 内容同步工具 - 将 content_items 同步到 Wiki
+
+增量同步：content_items 记录每条内容的同步时间、页面内容哈希和页面路径，
+只处理从未同步或同步后被重新处理的条目；页面渲染和发布由 WikiPublisher 完成（与 TaggerAgent 共用），
+渲染结果未变化的条目不重复发送，首次同步创建页面，之后在原路径更新页面。
+发布失败的条目排在最后，连续失败达到上限后不再自动重试（内容重新处理或 --force 时再次尝试），
+避免反复被拒绝的条目占满每次同步的数量上限。
 """
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any
+
+from tools.database import LazyRow, select_columns
+from tools.wiki_publisher import (
+    WikiPublisher, WIKI_PAGE_COLUMNS, PUBLISH_BATCH_SIZE, PUBLISH_CONCURRENCY, PUBLISH_MAX_FAILURES
+)
 
 logger = logging.getLogger(__name__)
 
+# 待同步：从未同步或同步后被重新处理
+_PENDING_CONDITION = "(wiki_synced_at IS NULL OR processed_at > wiki_synced_at)"
+
+# 可自动重试：连续失败未达上限，或上次失败后内容被重新处理
+_RETRYABLE_CONDITION = "(wiki_sync_failures < ? OR wiki_attempted_at IS NULL OR processed_at > wiki_attempted_at)"
+
 
 class ContentSyncTool:
     """将 content_items 数据库内容同步到 Wiki"""
 
-    def __init__(self, db, workspace_client=None):
+    def __init__(self, db, workspace_client=None, concurrency: int = PUBLISH_CONCURRENCY):
         """
         初始化同步工具
 
         Args:
             db: Database 实例
             workspace_client: Workspace 客户端（用于发送 Wiki 事件）
+            concurrency: 同时发送的 Wiki 事件数
         """
         self.db = db
         self.workspace_client = workspace_client
+        self.publisher = WikiPublisher(
+            db, workspace_client.send_event, source_id="content_sync", concurrency=concurrency
+        ) if workspace_client else None
 
-    async def sync_all_to_wiki(self, limit: int = 100) -> Dict[str, Any]:
+    def get_pending_content(self, limit: int = 100, force: bool = False) -> List[LazyRow]:
         """
-        同步所有已处理的内容到 Wiki
+        获取待同步的内容（从未同步，或同步后被重新处理）
 
         Args:
-            limit: 最大同步数量
+            limit: 最大数量
+            force: 忽略同步状态和失败次数，返回全部已处理内容
 
         Returns:
-            同步结果统计
+            内容列表（失败次数少的在前，其次按处理时间升序）
         """
         conn = self.db._get_connection()
         cursor = conn.cursor()
 
-        # 获取已处理但未同步的内容
-        cursor.execute("""
-            SELECT * FROM content_items
-            WHERE status = 'processed'
-            ORDER BY collected_at DESC
-            LIMIT ?
-        """, (limit,))
+        query = f"SELECT {select_columns(WIKI_PAGE_COLUMNS)} FROM content_items WHERE status = 'processed'"
+        params: list = []
+        if not force:
+            query += f" AND {_PENDING_CONDITION} AND {_RETRYABLE_CONDITION}"
+            params.append(PUBLISH_MAX_FAILURES)
+        query += " ORDER BY wiki_sync_failures, processed_at LIMIT ?"
+        params.append(limit)
+        cursor.execute(query, params)
 
         rows = cursor.fetchall()
         conn.close()
-
-        results = {
-            'total': len(rows),
-            'synced': 0,
-            'failed': 0,
-            'skipped': 0
-        }
-
-        for row in rows:
-            content = self.db._row_to_dict(row)
-            try:
-                success = await self._sync_content_to_wiki(content)
-                if success:
-                    results['synced'] += 1
-                else:
-                    results['skipped'] += 1
-            except Exception as e:
-                logger.error(f"同步失败: {content.get('title', 'N/A')} - {e}")
-                results['failed'] += 1
-
-        logger.info(f"同步完成: {results}")
-        return results
-
-    async def _sync_content_to_wiki(self, content: Dict[str, Any]) -> bool:
+        return [LazyRow(row) for row in rows]
+
+    async def sync_all_to_wiki(
+        self,
+        limit: int = 100,
+        batch_size: int = PUBLISH_BATCH_SIZE,
+        force: bool = False
+    ) -> Dict[str, Any]:
         """
-        同步单条内容到 Wiki
+        增量同步已处理的内容到 Wiki
 
         Args:
-            content: 内容数据
+            limit: 最大同步数量
+            batch_size: 每批处理的条目数
+            force: 忽略同步状态，重新检查全部已处理内容（页面未变化的仍会跳过）
 
         Returns:
-            是否成功
+            同步结果统计
         """
-        try:
-            content_id = content.get('id', '')
-            title = content.get('title', 'N/A')
-            source = content.get('source', '未知')
-            category = content.get('category', 'tech')
-            summary = content.get('summary_paragraph', '')
-            key_points = content.get('key_points', [])
-            tags = content.get('tags', [])
-            url = content.get('url', '')
-            collected_at = content.get('collected_at', '')
-
-            # 构建 Wiki 页面内容
-            wiki_content = f"# {title}\n\n"
-            wiki_content += f"**来源**: {source}\n"
-            wiki_content += f"**分类**: {category}\n"
-            wiki_content += f"**收集时间**: {collected_at}\n"
-            if url:
-                wiki_content += f"**原文链接**: [{url}]({url})\n"
-            wiki_content += "\n---\n\n"
-
-            if summary:
-                wiki_content += f"## 摘要\n\n{summary}\n\n"
-
-            if key_points:
-                wiki_content += "## 要点\n\n"
-                if isinstance(key_points, str):
-                    import json
-                    try:
-                        key_points = json.loads(key_points)
-                    except:
-                        key_points = [key_points]
-                for point in key_points:
-                    wiki_content += f"- {point}\n"
-                wiki_content += "\n"
-
-            if tags:
-                if isinstance(tags, str):
-                    import json
-                    try:
-                        tags = json.loads(tags)
-                    except:
-                        tags = [tags]
-                wiki_content += f"**标签**: {', '.join(tags)}\n"
-
-            # 生成安全的页面路径
-            import re
-            safe_title = re.sub(r'[^\w\u4e00-\u9fff\-]', '_', title)[:80]
-            page_path = f"materials/{category}/{safe_title}"
-
-            # 如果有 workspace_client，通过事件发送
-            if self.workspace_client:
-                from openagents.models.event import Event
-                wiki_event = Event(
-                    event_name="wiki.page.create",
-                    source_id="content_sync",
-                    target_agent_id="mod:openagents.mods.workspace.wiki",
-                    payload={
-                        "page_path": page_path,
-                        "title": title,
-                        "wiki_content": wiki_content,
-                        "metadata": {
-                            "content_id": content_id,
-                            "source": source,
-                            "category": category
-                        }
-                    },
-                    visibility="network"
-                )
-                await self.workspace_client.send_event(wiki_event)
-                logger.info(f"✅ 已发送 Wiki 同步事件: {title}")
-                return True
-            else:
-                # 直接写入数据库（如果 Wiki mod 不可用）
-                logger.warning(f"⚠️ 无 workspace_client，跳过: {title}")
-                return False
-
-        except Exception as e:
-            logger.error(f"同步内容失败: {e}")
-            return False
+        contents = self.get_pending_content(limit, force)
+
+        if not self.publisher:
+            logger.warning(f"⚠️ 无 workspace_client，跳过 {len(contents)} 条待同步内容")
+            return {'total': len(contents), 'created': 0, 'updated': 0, 'proposed': 0, 'unchanged': 0,
+                    'failed': 0, 'in_progress': 0, 'skipped': len(contents)}
+
+        results = await self.publisher.publish_contents(contents, batch_size)
+        results['skipped'] = 0
+        logger.info(f"同步完成: {results}")
+        return results
 
     def get_sync_status(self) -> Dict[str, int]:
         """获取同步状态统计"""
@@ -170,11 +110,25 @@ class ContentSyncTool:
             FROM content_items
             GROUP BY status
         """)
+        status = {row['status']: row['count'] for row in cursor.fetchall()}
+
+        cursor.execute(
+            f"SELECT COUNT(*) FROM content_items WHERE status = 'processed' "
+            f"AND {_PENDING_CONDITION} AND {_RETRYABLE_CONDITION}",
+            (PUBLISH_MAX_FAILURES,)
+        )
+        status['wiki_pending'] = cursor.fetchone()[0]
+
+        # 连续失败达到上限、等待人工处理（--force）的条目
+        cursor.execute(
+            f"SELECT COUNT(*) FROM content_items WHERE status = 'processed' "
+            f"AND {_PENDING_CONDITION} AND NOT {_RETRYABLE_CONDITION}",
+            (PUBLISH_MAX_FAILURES,)
+        )
+        status['wiki_failed'] = cursor.fetchone()[0]
 
-        rows = cursor.fetchall()
         conn.close()
-
-        return {row['status']: row['count'] for row in rows}
+        return status
 
 
 async def sync_content_to_wiki_cli():
@@ -185,6 +139,7 @@ async def sync_content_to_wiki_cli():
     parser = argparse.ArgumentParser(description="同步 content_items 到 Wiki")
     parser.add_argument("--limit", type=int, default=50, help="最大同步数量")
     parser.add_argument("--dry-run", action="store_true", help="仅显示将要同步的内容")
+    parser.add_argument("--force", action="store_true", help="忽略同步状态，重新检查全部已处理内容")
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO)
@@ -199,20 +154,12 @@ async def sync_content_to_wiki_cli():
         for s, count in status.items():
             print(f"  - {s}: {count}")
 
-        conn = db._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT title, source, category FROM content_items
-            WHERE status = 'processed'
-            ORDER BY collected_at DESC
-            LIMIT ?
-        """, (args.limit,))
-        rows = cursor.fetchall()
-        conn.close()
+        rows = sync_tool.get_pending_content(args.limit, args.force)
 
         print(f"\n📝 将要同步的内容 (前 {args.limit} 条):")
         for i, row in enumerate(rows, 1):
-            print(f"  {i}. [{row['category']}] {row['title'][:50]}... ({row['source']})")
+            action = "更新" if row.get('wiki_page_path') else "新建"
+            print(f"  {i}. {action} [{row['category']}] {row['title'][:50]}... ({row['source']})")
     else:
         print("⚠️ 需要在 Agent 环境中运行才能同步到 Wiki")
         print("💡 请使用 --dry-run 查看将要同步的内容")
@@ -3,15 +3,17 @@
 包含 RSS 解析、网页抓取、全文提取等功能
 """
 
+import time
 import feedparser
 import trafilatura
-import yaml
 import logging
 import requests
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
 
+from tools.feed_registry import get_feed_registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,18 +28,28 @@ class RSSFeedReader:
             config_path: RSS 配置文件路径
         """
         self.config_path = config_path
+        self.registry = get_feed_registry(config_path)
         self.feeds = []
         self.config = {}
+        self._config_version = None
+        # 最近一次 fetch_all_feeds 的逐源抓取结果（成功与否、条目数、耗时）
+        self.last_fetch_results: List[Dict[str, Any]] = []
+        self._last_error: Optional[str] = None
         self._load_config()
     
     def _load_config(self):
-        """加载 RSS 配置"""
+        """加载 RSS 配置（配置文件未变化时不重新解析）"""
+        version = self.registry.version
+        if version == self._config_version:
+            return
+
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                self.feeds = [feed for feed in data.get('feeds', []) if feed.get('enabled', True)]
-                self.config = data.get('collection', {})
-                logger.info(f"Loaded {len(self.feeds)} RSS feeds")
+            data = self.registry.load()
+            self.feeds = [feed for feed in data.get('feeds') or [] if feed.get('enabled', True)]
+            self.config = data.get('collection') or {}
+            if self._config_version is not None:
+                logger.info(f"Reloaded RSS config: {len(self.feeds)} enabled feeds")
+            self._config_version = version
         except Exception as e:
             logger.error(f"Failed to load RSS config: {str(e)}")
             self.feeds = []
@@ -58,6 +70,8 @@ class RSSFeedReader:
             
             if feed.bozo:  # 解析出错
                 logger.warning(f"Feed parsing error for {feed_url}: {feed.bozo_exception}")
+                if not feed.entries:
+                    self._last_error = f"parse error: {feed.bozo_exception}"
             
             items = []
             for entry in feed.entries[:max_items]:
@@ -82,6 +96,7 @@ class RSSFeedReader:
             
         except Exception as e:
             logger.error(f"Error fetching feed {feed_url}: {str(e)}")
+            self._last_error = str(e)
             return []
     
     def fetch_hackernews_api(self, api_type: str = "top", count: int = 5) -> List[Dict[str, Any]]:
@@ -143,6 +158,7 @@ class RSSFeedReader:
             
         except Exception as e:
             logger.error(f"Error fetching Hacker News API: {str(e)}")
+            self._last_error = str(e)
             return []
     
     def fetch_all_feeds(self) -> List[Dict[str, Any]]:
@@ -152,7 +168,11 @@ class RSSFeedReader:
         Returns:
             包含来源信息的文章列表
         """
+        # 热加载：通过 add_rss_feed 等方式修改的订阅源在下一轮采集生效
+        self._load_config()
+
         all_items = []
+        self.last_fetch_results = []
         max_items = self.config.get('max_items_per_feed', 10)
         
         for feed_config in self.feeds:
@@ -161,6 +181,8 @@ class RSSFeedReader:
             feed_type = feed_config.get('type', 'rss')
             
             logger.info(f"Fetching feed: {feed_name} (type: {feed_type})")
+            self._last_error = None
+            started = time.monotonic()
             
             # 根据类型选择抓取方法
             if feed_type == 'hackernews_api':
@@ -173,6 +195,14 @@ class RSSFeedReader:
                 feed_url = feed_config['url']
                 items = self.fetch_feed(feed_url, max_items)
             
+            self.last_fetch_results.append({
+                'source': feed_name,
+                'success': self._last_error is None,
+                'items': len(items),
+                'latency_ms': int((time.monotonic() - started) * 1000),
+                'error': self._last_error
+            })
+            
             # 添加来源信息
             for item in items:
                 item['source'] = feed_name
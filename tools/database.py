@@ -3,16 +3,155 @@
 使用 SQLite 存储内容、大纲和草稿
 """
 
+import re
 import sqlite3
 import json
 import uuid
+from collections.abc import MutableMapping
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Sequence
 import logging
 
+from tools.draft_sections import section_hashes
+from tools.content_counters import ensure_counters
+from tools.text_codec import compress_text, decompress_text, register_text_functions, compact_text_columns
+
 logger = logging.getLogger(__name__)
 
+# 存储为 JSON 文本的列
+JSON_COLUMNS = frozenset(['key_points', 'key_quotes', 'tags', 'related_content_ids', 'content', 'section_hashes'])
+
+# 原文预览长度（raw_preview 计算列）
+RAW_PREVIEW_CHARS = 300
+
+# 列表/搜索接口默认读取的 content_items 列（不含 raw_content、summary_detailed 等大字段）
+CONTENT_LIST_COLUMNS = (
+    'id', 'title', 'url', 'source', 'source_type', 'collected_at',
+    'summary_one_line', 'summary_paragraph', 'key_points', 'tags',
+    'category', 'sentiment', 'relevance_score', 'status', 'processed_at', 'raw_preview'
+)
+
+# 可投影的计算列
+_COMPUTED_COLUMNS = {
+    'raw_preview': f"SUBSTR(kf_text(raw_content), 1, {RAW_PREVIEW_CHARS}) AS raw_preview",
+}
+
+_COLUMN_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+_DELETED = object()
+
+
+def select_columns(columns: Optional[Sequence[str]]) -> str:
+    """
+    生成 SELECT 列清单
+
+    Args:
+        columns: 列名列表（可包含计算列 raw_preview），None 表示全部列
+
+    Returns:
+        SQL 列清单
+    """
+    if columns is None:
+        return '*'
+    parts = []
+    for column in columns:
+        if column in _COMPUTED_COLUMNS:
+            parts.append(_COMPUTED_COLUMNS[column])
+        elif _COLUMN_NAME.fullmatch(column):
+            parts.append(column)
+        else:
+            raise ValueError(f"非法的列名: {column}")
+    return ', '.join(parts)
+
+
+class LazyRow(MutableMapping):
+    """
+    数据库行的轻量映射
+
+    直接包装 sqlite3.Row，不预先复制整行；JSON 列和压缩文本在首次访问时解析并缓存。
+    支持 dict 的读写接口，需要真正的 dict（如 json.dumps）时调用 to_dict。
+    """
+
+    __slots__ = ('_row', '_values')
+
+    def __init__(self, row: sqlite3.Row):
+        self._row = row
+        # 已解析或被修改的字段
+        self._values: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._values:
+            value = self._values[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        try:
+            value = self._row[key]
+        except (IndexError, KeyError):
+            raise KeyError(key) from None
+        if isinstance(value, bytes):
+            value = decompress_text(value)
+            self._values[key] = value
+        if key in JSON_COLUMNS and value:
+            try:
+                value = json.loads(value)
+            except (TypeError, ValueError):
+                pass
+            self._values[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._values[key] = value
+
+    def __delitem__(self, key: str):
+        self[key]
+        self._values[key] = _DELETED
+
+    def __iter__(self) -> Iterator[str]:
+        row_keys = self._row.keys()
+        for key in row_keys:
+            if self._values.get(key) is not _DELETED:
+                yield key
+        for key, value in self._values.items():
+            if value is not _DELETED and key not in row_keys:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为普通字典（解析全部 JSON 列）"""
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return f"LazyRow({self.to_dict()!r})"
+
+
+def flatten_tags(tags_data: Any) -> List[tuple]:
+    """
+    把标签 JSON 展开为 (tag_type, tag) 列表
+
+    Args:
+        tags_data: {tag_type: [tag, ...]} 或 [tag, ...]（旧格式，类型记为 'tag'）
+
+    Returns:
+        去重后的 (tag_type, tag) 列表
+    """
+    if isinstance(tags_data, dict):
+        items = [
+            (str(tag_type), tag)
+            for tag_type, tags in tags_data.items() if isinstance(tags, list)
+            for tag in tags
+        ]
+    elif isinstance(tags_data, list):
+        items = [('tag', tag) for tag in tags_data]
+    else:
+        items = []
+    return list(dict.fromkeys(
+        (tag_type, str(tag).strip()) for tag_type, tag in items if tag is not None and str(tag).strip()
+    ))
+
 
 class Database:
     """数据库管理类"""
@@ -38,6 +177,7 @@ class Database:
         """获取数据库连接"""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row  # 返回字典格式
+        register_text_functions(conn)
         return conn
     
     def _init_tables(self):
@@ -113,6 +253,85 @@ class Database:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_content_status ON content_items(status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_content_category ON content_items(category)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_content_collected ON content_items(collected_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_drafts_outline ON drafts(outline_id)")
+        # 按来源分组统计（文章数、最近采集时间）只需扫描索引
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_content_source_collected ON content_items(source, collected_at)"
+        )
+
+        # 订阅源抓取健康度（每个来源一行，每次抓取后更新）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS feed_fetch_stats (
+                source TEXT PRIMARY KEY,
+                last_fetch_at DATETIME,
+                last_success_at DATETIME,
+                last_error_at DATETIME,
+                last_error TEXT,
+                last_items INTEGER DEFAULT 0,
+                last_latency_ms INTEGER DEFAULT 0,
+                fetch_count INTEGER DEFAULT 0,
+                error_count INTEGER DEFAULT 0,
+                total_items INTEGER DEFAULT 0,
+                total_latency_ms INTEGER DEFAULT 0
+            )
+        """)
+
+        # 统计计数表（由触发器增量维护，供统计看板读取）
+        ensure_counters(conn)
+
+        # 标签索引表（content_items.tags 的规范化展开）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS content_tags (
+                content_id TEXT NOT NULL,
+                tag_type TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (content_id, tag_type, tag)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_content_tags_tag ON content_tags(tag, content_id)")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_content_tags_delete AFTER DELETE ON content_items
+            BEGIN
+                DELETE FROM content_tags WHERE content_id = OLD.id;
+            END
+        """)
+
+        # 迁移：回填已有内容的标签
+        cursor.execute("SELECT 1 FROM content_tags LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute("SELECT id, tags FROM content_items WHERE tags IS NOT NULL AND tags != ''")
+            rows = []
+            for row in cursor.fetchall():
+                try:
+                    rows.extend((row['id'], tag_type, tag) for tag_type, tag in flatten_tags(json.loads(row['tags'])))
+                except (TypeError, ValueError):
+                    continue
+            if rows:
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO content_tags (content_id, tag_type, tag) VALUES (?, ?, ?)", rows
+                )
+                logger.info(f"Backfilled {len(rows)} content tags")
+
+        # 迁移：草稿章节哈希（用于优化后的增量复审）
+        try:
+            cursor.execute("ALTER TABLE drafts ADD COLUMN section_hashes TEXT")
+        except sqlite3.OperationalError:
+            # 列已存在，忽略错误
+            pass
+
+        # 迁移：Wiki 同步状态（增量同步只处理新增或内容变化的条目）
+        for column in (
+            'wiki_synced_at DATETIME', 'wiki_content_hash TEXT', 'wiki_page_path TEXT',
+            'wiki_sync_failures INTEGER DEFAULT 0', 'wiki_attempted_at DATETIME', 'wiki_claimed_at DATETIME'
+        ):
+            try:
+                cursor.execute(f"ALTER TABLE content_items ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                # 列已存在，忽略错误
+                pass
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_content_wiki_sync ON content_items(status, wiki_synced_at)"
+        )
         
         conn.commit()
         conn.close()
@@ -143,7 +362,7 @@ class Database:
                 content_id,
                 content_data['title'],
                 content_data.get('url'),
-                content_data.get('raw_content'),
+                compress_text(content_data.get('raw_content')),
                 content_data.get('source'),
                 content_data.get('source_type', 'rss'),
                 datetime.now().isoformat()
@@ -176,7 +395,7 @@ class Database:
         """, (
             summary_data.get('one_line'),
             summary_data.get('paragraph'),
-            summary_data.get('detailed'),
+            compress_text(summary_data.get('detailed')),
             json.dumps(summary_data.get('key_points', []), ensure_ascii=False),
             json.dumps(summary_data.get('key_quotes', []), ensure_ascii=False),
             content_id
@@ -208,6 +427,13 @@ class Database:
             datetime.now().isoformat(),
             content_id
         ))
+
+        # 同步标签索引表
+        cursor.execute("DELETE FROM content_tags WHERE content_id = ?", (content_id,))
+        cursor.executemany(
+            "INSERT OR IGNORE INTO content_tags (content_id, tag_type, tag) VALUES (?, ?, ?)",
+            [(content_id, tag_type, tag) for tag_type, tag in flatten_tags(tag_data.get('tags', {}))]
+        )
         
         conn.commit()
         conn.close()
@@ -241,15 +467,19 @@ class Database:
         self,
         keywords: Optional[List[str]] = None,
         category: Optional[str] = None,
-        limit: int = 10
-    ) -> List[Dict[str, Any]]:
+        limit: int = 10,
+        tags: Optional[List[str]] = None,
+        columns: Optional[Sequence[str]] = CONTENT_LIST_COLUMNS
+    ) -> List[LazyRow]:
         """
-        搜索内容（简单关键词匹配）
+        搜索内容（关键词匹配标题、摘要或标签）
         
         Args:
             keywords: 关键词列表
             category: 分类过滤
             limit: 返回数量限制
+            tags: 标签过滤（命中任一标签）
+            columns: 返回的列，默认 CONTENT_LIST_COLUMNS，None 表示全部列
             
         Returns:
             内容列表
@@ -257,19 +487,27 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        query = "SELECT * FROM content_items WHERE status = 'processed'"
+        query = f"SELECT {select_columns(columns)} FROM content_items WHERE status = 'processed'"
         params = []
         
         if category:
             query += " AND category = ?"
             params.append(category)
+
+        if tags:
+            query += f" AND id IN (SELECT content_id FROM content_tags WHERE tag IN ({','.join('?' for _ in tags)}))"
+            params.extend(tags)
         
         if keywords:
-            # 简单的关键词匹配
+            # 简单的关键词匹配，关键词与标签完全相同时也算命中
             keyword_conditions = []
             for keyword in keywords:
                 keyword_conditions.append("(title LIKE ? OR summary_paragraph LIKE ?)")
                 params.extend([f"%{keyword}%", f"%{keyword}%"])
+            keyword_conditions.append(
+                f"id IN (SELECT content_id FROM content_tags WHERE tag IN ({','.join('?' for _ in keywords)}))"
+            )
+            params.extend(keywords)
             
             query += " AND (" + " OR ".join(keyword_conditions) + ")"
         
@@ -280,15 +518,92 @@ class Database:
         rows = cursor.fetchall()
         conn.close()
         
-        return [self._row_to_dict(row) for row in rows]
+        return [LazyRow(row) for row in rows]
     
-    def get_recent_content(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """获取最近的内容"""
+    # ========== 标签查询 ==========
+
+    def get_top_tags(self, limit: int = 20, tag_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        获取热门标签
+
+        Args:
+            limit: 返回数量
+            tag_type: 只统计指定类型的标签
+
+        Returns:
+            [{'tag', 'count'}]
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
-        
+
+        if tag_type:
+            cursor.execute("""
+                SELECT tag, COUNT(*) AS count FROM content_tags WHERE tag_type = ?
+                GROUP BY tag ORDER BY count DESC LIMIT ?
+            """, (tag_type, limit))
+        else:
+            cursor.execute("""
+                SELECT tag, COUNT(*) AS count FROM content_tags
+                GROUP BY tag ORDER BY count DESC LIMIT ?
+            """, (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [{'tag': row['tag'], 'count': row['count']} for row in rows]
+
+    def get_related_tags(self, tag: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        获取与指定标签共同出现的标签
+
+        Returns:
+            [{'tag', 'count'}]，count 为共同出现的内容数
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
         cursor.execute("""
-            SELECT * FROM content_items 
+            SELECT other.tag AS tag, COUNT(DISTINCT other.content_id) AS count
+            FROM content_tags AS base
+            JOIN content_tags AS other ON other.content_id = base.content_id
+            WHERE base.tag = ? AND other.tag != ?
+            GROUP BY other.tag ORDER BY count DESC LIMIT ?
+        """, (tag, tag, limit))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [{'tag': row['tag'], 'count': row['count']} for row in rows]
+
+    def get_content_by_tag(
+        self,
+        tag: str,
+        limit: int = 20,
+        columns: Optional[Sequence[str]] = CONTENT_LIST_COLUMNS
+    ) -> List[LazyRow]:
+        """获取带有指定标签的内容（按采集时间倒序，columns 同 search_content）"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(f"""
+            SELECT {select_columns(columns)} FROM content_items
+            WHERE id IN (SELECT content_id FROM content_tags WHERE tag = ?)
+            ORDER BY collected_at DESC LIMIT ?
+        """, (tag, limit))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [LazyRow(row) for row in rows]
+
+    def get_recent_content(
+        self,
+        limit: int = 20,
+        columns: Optional[Sequence[str]] = CONTENT_LIST_COLUMNS
+    ) -> List[LazyRow]:
+        """获取最近的内容（columns 同 search_content）"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            SELECT {select_columns(columns)} FROM content_items 
             WHERE status = 'processed'
             ORDER BY collected_at DESC 
             LIMIT ?
@@ -297,8 +612,57 @@ class Database:
         rows = cursor.fetchall()
         conn.close()
         
-        return [self._row_to_dict(row) for row in rows]
+        return [LazyRow(row) for row in rows]
     
+    # ========== 订阅源抓取健康度 ==========
+
+    def record_feed_fetches(self, results: List[Dict[str, Any]]):
+        """
+        记录一批订阅源抓取结果
+
+        Args:
+            results: [{'source', 'success', 'items', 'latency_ms', 'error'}]
+        """
+        if not results:
+            return
+
+        now = datetime.now().isoformat()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        for result in results:
+            success = bool(result.get('success'))
+            items = int(result.get('items') or 0)
+            latency_ms = int(result.get('latency_ms') or 0)
+            cursor.execute(
+                "INSERT OR IGNORE INTO feed_fetch_stats (source) VALUES (?)", (result['source'],)
+            )
+            cursor.execute("""
+                UPDATE feed_fetch_stats SET
+                    last_fetch_at = ?,
+                    last_success_at = CASE WHEN ? THEN ? ELSE last_success_at END,
+                    last_error_at = CASE WHEN ? THEN last_error_at ELSE ? END,
+                    last_error = CASE WHEN ? THEN last_error ELSE ? END,
+                    last_items = ?,
+                    last_latency_ms = ?,
+                    fetch_count = fetch_count + 1,
+                    error_count = error_count + ?,
+                    total_items = total_items + ?,
+                    total_latency_ms = total_latency_ms + ?
+                WHERE source = ?
+            """, (
+                now,
+                success, now,
+                success, now,
+                success, result.get('error'),
+                items, latency_ms,
+                0 if success else 1, items, latency_ms,
+                result['source']
+            ))
+
+        conn.commit()
+        conn.close()
+
     # ========== 大纲操作 ==========
     
     def save_outline(self, outline_data: Dict[str, Any]) -> str:
@@ -362,15 +726,17 @@ class Database:
         
         cursor.execute("""
             INSERT INTO drafts (
-                id, outline_id, title, content, word_count, status, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                id, outline_id, title, content, word_count, status, section_hashes,
+                created_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             draft_id,
             draft_data.get('outline_id'),
             draft_data['title'],
-            draft_data['content'],
+            compress_text(draft_data['content']),
             draft_data.get('word_count', 0),
             draft_data.get('status', 'draft'),
+            json.dumps(section_hashes(draft_data['content']), ensure_ascii=False),
             datetime.now().isoformat(),
             datetime.now().isoformat()
         ))
@@ -393,6 +759,22 @@ class Database:
             return self._row_to_dict(row)
         return None
 
+    def get_latest_draft_by_outline(self, outline_id: str) -> Optional[Dict[str, Any]]:
+        """获取大纲最近生成的草稿"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT * FROM drafts WHERE outline_id = ?
+            ORDER BY created_at DESC LIMIT 1
+        """, (outline_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if row:
+            return self._row_to_dict(row)
+        return None
+
     def update_draft(self, draft_id: str, draft_data: Dict[str, Any]):
         """更新草稿"""
         conn = self._get_connection()
@@ -404,7 +786,9 @@ class Database:
 
         if 'content' in draft_data:
             update_fields.append("content = ?")
-            params.append(draft_data['content'])
+            params.append(compress_text(draft_data['content']))
+            update_fields.append("section_hashes = ?")
+            params.append(json.dumps(section_hashes(draft_data['content']), ensure_ascii=False))
 
         if 'word_count' in draft_data:
             update_fields.append("word_count = ?")
@@ -464,14 +848,35 @@ class Database:
         conn.close()
         logger.info(f"Updated outline: {outline_id}")
 
+    # ========== 存储维护 ==========
+
+    def compact_text_storage(self, vacuum: bool = True) -> Dict[str, int]:
+        """
+        压缩已有的未压缩长文本（新写入的长文本已自动压缩）
+
+        Args:
+            vacuum: 完成后是否 VACUUM 回收空闲页
+
+        Returns:
+            {'rows', 'bytes_before', 'bytes_after'}
+        """
+        conn = self._get_connection()
+        try:
+            result = compact_text_columns(conn)
+            if vacuum:
+                conn.execute("VACUUM")
+        finally:
+            conn.close()
+        return result
+
     # ========== 辅助方法 ==========
     
     def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
         """将数据库行转换为字典"""
-        result = dict(row)
+        result = {key: decompress_text(value) for key, value in dict(row).items()}
         
         # 解析 JSON 字段
-        for key in ['key_points', 'key_quotes', 'tags', 'related_content_ids', 'content']:
+        for key in JSON_COLUMNS:
             if key in result and result[key]:
                 try:
                     result[key] = json.loads(result[key])
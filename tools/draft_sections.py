@@ -0,0 +1,204 @@
+"""
+草稿章节工具
+按二级标题（## ）把文章切分为章节并计算内容哈希，用于优化后的增量复审：
+
+- 比较两个版本的章节哈希，找出修改过的章节
+- 只把修改过的章节发给评审员，未修改章节沿用上一轮的评审发现
+- 合并时只保留证据（原文片段）仍存在于未修改章节中的旧发现，评分按修改字数比例加权
+"""
+
+import hashlib
+import re
+from typing import Dict, Any, List, Optional
+
+# 证据字段：评审发现中引用原文的字段
+EVIDENCE_KEYS = ('word', 'original', 'examples', 'content', 'quote', 'evidence')
+
+# 文章开头（第一个二级标题之前）的章节键
+PREAMBLE_KEY = "（开头）"
+
+_QUOTED = re.compile(r'[「“"]([^」”"]{2,})[」”"]')
+
+
+def _hash(text: str) -> str:
+    """章节内容哈希（忽略首尾空白）"""
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()[:16]
+
+
+def split_sections(content: str) -> List[Dict[str, Any]]:
+    """
+    按二级标题切分章节
+
+    Args:
+        content: 文章正文（Markdown）
+
+    Returns:
+        [{'key', 'title', 'text', 'hash'}]，text 包含标题行；重名章节的键追加序号
+    """
+    sections = []
+    current_title = None
+    current_lines: List[str] = []
+
+    def flush():
+        text = '\n'.join(current_lines).strip()
+        if current_title is None and not text:
+            return
+        sections.append({'title': current_title or '', 'text': text})
+
+    for line in (content or '').split('\n'):
+        if line.startswith('## '):
+            flush()
+            current_title = line[3:].strip()
+            current_lines = [line]
+        else:
+            current_lines.append(line)
+    flush()
+
+    seen: Dict[str, int] = {}
+    for section in sections:
+        key = section['title'] or PREAMBLE_KEY
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] > 1:
+            key = f"{key}#{seen[key]}"
+        section['key'] = key
+        section['hash'] = _hash(section['text'])
+
+    return sections
+
+
+def section_hashes(content: str) -> Dict[str, str]:
+    """计算章节哈希 {section_key: hash}（保持章节顺序）"""
+    return {s['key']: s['hash'] for s in split_sections(content)}
+
+
+def diff_sections(old_hashes: Dict[str, str], content: str) -> Dict[str, Any]:
+    """
+    比较新版本与旧版本的章节
+
+    Args:
+        old_hashes: 旧版本章节哈希
+        content: 新版本正文
+
+    Returns:
+        {'changed', 'unchanged', 'changed_text', 'unchanged_text',
+         'changed_chars', 'total_chars', 'changed_ratio'}
+    """
+    changed, unchanged = [], []
+    changed_parts, unchanged_parts = [], []
+
+    for section in split_sections(content):
+        if old_hashes.get(section['key']) == section['hash']:
+            unchanged.append(section['key'])
+            unchanged_parts.append(section['text'])
+        else:
+            changed.append(section['key'])
+            changed_parts.append(section['text'])
+
+    changed_text = '\n\n'.join(changed_parts)
+    unchanged_text = '\n\n'.join(unchanged_parts)
+    changed_chars = len(changed_text)
+    total_chars = changed_chars + len(unchanged_text)
+
+    return {
+        'changed': changed,
+        'unchanged': unchanged,
+        'changed_text': changed_text,
+        'unchanged_text': unchanged_text,
+        'changed_chars': changed_chars,
+        'total_chars': total_chars,
+        'changed_ratio': changed_chars / total_chars if total_chars else 0.0
+    }
+
+
+def stitch_sections(sections: List[Dict[str, Any]], replacements: Dict[str, str]) -> str:
+    """
+    按原顺序拼接章节
+
+    Args:
+        sections: split_sections 的结果
+        replacements: {section_key: 新章节文本（含标题行）}，未替换的章节保持原文
+
+    Returns:
+        拼接后的正文
+    """
+    return '\n\n'.join(replacements.get(s['key'], s['text']) for s in sections)
+
+
+def extract_evidence(item: Any) -> List[str]:
+    """提取评审发现中引用的原文片段"""
+    if isinstance(item, str):
+        return _QUOTED.findall(item)
+    if not isinstance(item, dict):
+        return []
+
+    evidence = []
+    for key in EVIDENCE_KEYS:
+        value = item.get(key)
+        values = value if isinstance(value, list) else [value]
+        for v in values:
+            if isinstance(v, str):
+                v = v.strip().strip('.。…').strip()
+                if len(v) >= 2:
+                    evidence.append(v)
+    return evidence
+
+
+def evidence_present(item: Any, text: str) -> bool:
+    """
+    判断评审发现的证据是否仍存在于文本中
+
+    没有引用原文的发现（如泛泛的建议）视为无法验证，返回 False，由新一轮评审重新给出
+    """
+    return any(fragment in text for fragment in extract_evidence(item))
+
+
+def _blend(old: Any, new: Any, ratio: float) -> Any:
+    """按修改比例加权两个分数"""
+    if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+        return round(old * (1 - ratio) + new * ratio, 1)
+    return new if new is not None else old
+
+
+def merge_findings(
+    prior: Dict[str, Any],
+    partial: Optional[Dict[str, Any]],
+    unchanged_text: str,
+    changed_ratio: float
+) -> Dict[str, Any]:
+    """
+    合并上一轮的完整评审与本轮修改章节的评审
+
+    Args:
+        prior: 上一轮的完整评审报告
+        partial: 本轮只针对修改章节的评审报告（None 表示本轮没有修改章节）
+        unchanged_text: 未修改章节的正文
+        changed_ratio: 修改章节占全文的字数比例
+
+    Returns:
+        合并后的评审报告
+    """
+    prior = prior or {}
+    if not partial:
+        return dict(prior)
+
+    merged = dict(partial)
+
+    # 评分按修改比例加权
+    merged['overall_score'] = _blend(prior.get('overall_score'), partial.get('overall_score'), changed_ratio)
+    prior_scores = prior.get('scores') or {}
+    merged['scores'] = {
+        key: _blend(prior_scores.get(key), value, changed_ratio)
+        for key, value in (partial.get('scores') or {}).items()
+    }
+
+    # 列表型发现：新发现 + 证据仍在未修改章节中的旧发现
+    for key, old_items in prior.items():
+        if not isinstance(old_items, list):
+            continue
+        new_items = list(merged.get(key) or [])
+        for item in old_items:
+            if item not in new_items and evidence_present(item, unchanged_text):
+                new_items.append(item)
+        merged[key] = new_items
+
+    return merged
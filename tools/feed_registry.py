@@ -0,0 +1,203 @@
+"""
+RSS 订阅源注册表
+RSSManagerMod 和 RSSFeedReader 共用的 config/rss_feeds.yaml 读写组件
+
+- 读取：按文件 mtime/大小判断是否变化，变化时再比较内容哈希，内容确实改变才重新解析
+- 写入：先写临时文件再原子替换，读者不会读到写了一半的配置
+- 变更通知：配置内容变化（本进程写入或其他进程修改文件）时回调订阅者
+"""
+
+import os
+import copy
+import hashlib
+import tempfile
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEEDS_CONFIG = "config/rss_feeds.yaml"
+
+
+def _empty_config() -> Dict[str, Any]:
+    """配置文件缺失时的空配置"""
+    return {'feeds': [], 'collection': {}}
+
+
+class FeedRegistry:
+    """RSS 订阅源注册表"""
+
+    def __init__(self, config_path: str = DEFAULT_FEEDS_CONFIG):
+        """
+        初始化
+
+        Args:
+            config_path: RSS 配置文件路径
+        """
+        self.config_path = Path(config_path)
+        self._lock = threading.RLock()
+        self._config: Optional[Dict[str, Any]] = None
+        # (mtime_ns, size)，用于快速判断文件是否变化
+        self._stat_key: Optional[Tuple[int, int]] = None
+        self._content_hash: Optional[str] = None
+        self._version = 0
+        self._listeners: List[Callable[[Dict[str, Any], int], None]] = []
+
+    @property
+    def version(self) -> int:
+        """配置版本号（内容每变化一次加一）"""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def subscribe(self, callback: Callable[[Dict[str, Any], int], None]):
+        """
+        订阅配置变化
+
+        Args:
+            callback: 回调函数 (config, version)，config 为副本
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def load(self) -> Dict[str, Any]:
+        """
+        读取配置（文件未变化时直接返回缓存）
+
+        Returns:
+            配置字典的副本（调用方可以修改后传给 save）
+        """
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._config)
+
+    def get_feeds(self, enabled_only: bool = False) -> List[Dict[str, Any]]:
+        """获取订阅源列表"""
+        feeds = self.load().get('feeds') or []
+        if enabled_only:
+            feeds = [feed for feed in feeds if feed.get('enabled', True)]
+        return feeds
+
+    def get_collection_config(self) -> Dict[str, Any]:
+        """获取采集配置"""
+        return self.load().get('collection') or {}
+
+    def save(self, config: Dict[str, Any]) -> bool:
+        """
+        原子写入配置
+
+        Args:
+            config: 完整配置
+
+        Returns:
+            是否成功
+        """
+        data = yaml.dump(config, allow_unicode=True, default_flow_style=False).encode('utf-8')
+
+        with self._lock:
+            tmp_path = None
+            try:
+                self.config_path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(
+                    prefix=f".{self.config_path.name}.", suffix=".tmp", dir=str(self.config_path.parent)
+                )
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.config_path)
+                tmp_path = None
+            except Exception as e:
+                logger.error(f"Error saving feeds config: {e}")
+                return False
+            finally:
+                if tmp_path and os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+
+            self._apply(copy.deepcopy(config), hashlib.sha1(data).hexdigest(), self._stat())
+            return True
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """读取文件 mtime/大小（文件不存在时返回 None）"""
+        try:
+            st = self.config_path.stat()
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        """文件变化时重新加载（调用方需持有锁）"""
+        stat_key = self._stat()
+        if self._config is not None and stat_key == self._stat_key:
+            return
+
+        if stat_key is None:
+            if self._config is None or self._content_hash is not None:
+                self._apply(_empty_config(), None, None)
+            return
+
+        try:
+            data = self.config_path.read_bytes()
+        except OSError as e:
+            logger.error(f"Error reading feeds config: {e}")
+            if self._config is None:
+                self._config = _empty_config()
+            return
+
+        content_hash = hashlib.sha1(data).hexdigest()
+        if self._config is not None and content_hash == self._content_hash:
+            # 只有 mtime 变化（如 touch），内容未变
+            self._stat_key = stat_key
+            return
+
+        try:
+            config = yaml.safe_load(data) or {}
+            if not isinstance(config, dict):
+                raise ValueError(f"顶层应为映射，实际为 {type(config).__name__}")
+        except (yaml.YAMLError, ValueError) as e:
+            # 保留上一份有效配置，等待文件修复
+            logger.error(f"Error parsing feeds config: {e}")
+            if self._config is None:
+                self._config = _empty_config()
+            self._stat_key = stat_key
+            return
+
+        config.setdefault('feeds', [])
+        self._apply(config, content_hash, stat_key)
+
+    def _apply(self, config: Dict[str, Any], content_hash: Optional[str], stat_key: Optional[Tuple[int, int]]):
+        """更新缓存并通知订阅者（调用方需持有锁）"""
+        first_load = self._config is None
+        self._config = config
+        self._content_hash = content_hash
+        self._stat_key = stat_key
+        self._version += 1
+
+        if first_load:
+            logger.info(f"Loaded {len(config.get('feeds') or [])} RSS feeds from {self.config_path}")
+            return
+
+        logger.info(f"📡 RSS 配置已更新 (v{self._version}): {len(config.get('feeds') or [])} 个订阅源")
+        for callback in list(self._listeners):
+            try:
+                callback(copy.deepcopy(config), self._version)
+            except Exception as e:
+                logger.error(f"Error in feeds config listener: {e}")
+
+
+# 按配置路径共享的注册表实例
+_registries: Dict[str, FeedRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_feed_registry(config_path: str = DEFAULT_FEEDS_CONFIG) -> FeedRegistry:
+    """获取指定配置文件的注册表实例（同一路径共享一个实例）"""
+    key = str(Path(config_path).resolve())
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = FeedRegistry(config_path)
+        return _registries[key]
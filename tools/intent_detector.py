@@ -1,10 +1,15 @@
 """
 意图识别模块 - 使用 LLM 判断用户意图
 替代硬编码的正则规则，更灵活地理解用户输入
+
+分两级识别：
+1. 规则快速通道：按会话状态匹配关键词表和数字（如「1」「是」「继续」「取消」），无需调用 LLM
+2. 规则无法确定的自由文本才交给 LLM 判断
 """
 
+import re
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -52,8 +57,152 @@ class IntentResult:
     reasoning: str  # LLM 的推理过程
 
 
+# 快速通道只匹配短输入（长文本交给 LLM）
+FAST_PATH_MAX_CHARS = 16
+
+# 中文数字
+_CN_DIGITS = {'一': 1, '二': 2, '两': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9, '十': 10}
+
+_NUMBER = r'(\d{1,2}|[一二两三四五六七八九十])'
+_SELECT_PATTERN = re.compile(rf'^(?:我?选择?|要|用)?\s*(?:第|方案|大纲)?\s*{_NUMBER}\s*(?:个|号|套)?(?:方案|大纲)?(?:吧|就好|好了)?$')
+_MODIFY_PATTERN = re.compile(rf'^(?:修改|编辑|调整|改)(?:一下)?\s*(?:第|方案|大纲)?\s*{_NUMBER}?\s*(?:个|号|套)?(?:方案|大纲)?$')
+_TOPIC_PATTERNS = [
+    re.compile(r'写.*?关于[《【「\s]*(.+?)[》】」\s]*的'),
+    re.compile(r'(?:创作)?主题[：:]\s*(.+?)(?:[，,\n]|$)'),
+]
+_TRAILING = re.compile(r'[\s。！!~～.，,]+$')
+
+# 任何状态都生效的取消指令
+CANCEL_WORDS = {'取消', '取消创作', '取消任务', '中止', '退出', 'cancel'}
+
+# 可能表达取消的关键词：处理中状态下含这些词的输入交给 LLM 判断（如「帮我取消吧」「先不写了」）
+CANCEL_HINTS = ('取消', '中止', '终止', '退出', '停', '不写', '不要了', '算了', '放弃', 'cancel', 'stop')
+
+YES_WORDS = {'是', '是的', '好', '好的', '确认', '确定', '可以', '行', '嗯', '对', '要', 'yes', 'y', 'ok', 'okay'}
+NO_WORDS = {'否', '不', '不是', '不用', '不要', '不需要', '不了', 'no', 'n'}
+
+# 各状态的关键词表：{state: [(意图, 关键词集合)]}
+STATE_KEYWORDS: Dict[str, List[Tuple[UserIntent, set]]] = {
+    'confirming_materials': [
+        (UserIntent.CONFIRM_YES, YES_WORDS | {'使用', '用', '使用素材', '用吧'}),
+        (UserIntent.CONFIRM_NO, NO_WORDS | {'跳过', '不使用', '不用素材', '直接生成'}),
+    ],
+    'waiting_selection': [
+        (UserIntent.MODIFY_OUTLINE, {'修改', '编辑', '调整', '修改大纲', '编辑大纲'}),
+    ],
+    'editing_outline': [
+        (UserIntent.FINISH_EDITING, {'完成', '结束', '确定', '好了', '可以了', '就这样', '完成编辑', 'done', 'ok'}),
+    ],
+    'confirming_start': [
+        (UserIntent.CONFIRM_YES, YES_WORDS | {'开始', '开始写', '开始写作', '写吧', '开写'}),
+        (UserIntent.CONFIRM_NO, NO_WORDS | {'重选', '重新选择', '重新选'}),
+        (UserIntent.MODIFY_OUTLINE, {'修改', '修改大纲', '编辑', '调整'}),
+    ],
+    'paused_writing': [
+        (UserIntent.CONTINUE_WRITING, {'继续', '继续写', '继续写作', '下一章', '接着写', '好', '好的', 'ok', 'go on'}),
+        (UserIntent.REWRITE_SECTION, {'重写', '重写这章', '重写本章', '重写章节', '重写这一章'}),
+        (UserIntent.STOP_WRITING, {'结束', '停止', '停', '保存', '结束写作', '停止写作'}),
+    ],
+    'waiting_optimization': [
+        (UserIntent.REQUEST_OPTIMIZE, {'优化', '自动优化', '改进', '优化一下', '优化吧', '开始优化'}),
+        (UserIntent.FINISH_CREATION, {'完成', '保存', '结束', '不优化', '不用优化', '完成创作', '就这样'}),
+        (UserIntent.VIEW_DETAIL_REPORT, {'详细', '详情', '查看详细', '详细报告', '看详细报告', '查看报告', '报告'}),
+    ],
+}
+
+# 处理中状态：除取消外的输入都只会得到「处理中」提示，无需识别（可能是取消的仍交给 LLM）
+BUSY_STATES = {'generating_outlines', 'writing', 'reviewing', 'optimizing'}
+
+# 可以开始新创作的状态
+TOPIC_STATES = {'idle', 'completed'}
+
+
+def _parse_number(token: Optional[str]) -> Optional[int]:
+    """解析阿拉伯数字或中文数字"""
+    if not token:
+        return None
+    return int(token) if token.isdigit() else _CN_DIGITS.get(token)
+
+
+class FastPathMatcher:
+    """基于会话状态的规则意图匹配器（快速通道）"""
+
+    def match(
+        self,
+        user_input: str,
+        current_state: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Optional[IntentResult]:
+        """
+        规则匹配用户意图
+
+        Args:
+            user_input: 用户输入
+            current_state: 当前会话状态
+            context: 额外上下文（outline_count 用于校验数字范围）
+
+        Returns:
+            IntentResult；无法确定时返回 None（交给 LLM）
+        """
+        context = context or {}
+        text = _TRAILING.sub('', user_input.strip()).lower()
+        if not text:
+            return None
+
+        if text in CANCEL_WORDS:
+            return self._result(UserIntent.CANCEL, "取消指令")
+
+        if current_state in BUSY_STATES:
+            if any(hint in text for hint in CANCEL_HINTS):
+                return None
+            return self._result(UserIntent.UNKNOWN, "处理中状态，无需识别")
+
+        if current_state in TOPIC_STATES:
+            for pattern in _TOPIC_PATTERNS:
+                match = pattern.search(user_input)
+                if match and match.group(1).strip():
+                    return self._result(UserIntent.NEW_TOPIC, "创作主题句式", topic=match.group(1).strip())
+            return None
+
+        if len(text) > FAST_PATH_MAX_CHARS:
+            return None
+
+        if current_state == 'waiting_selection':
+            outline_count = context.get('outline_count') or 0
+            match = _SELECT_PATTERN.match(text)
+            if match:
+                number = _parse_number(match.group(1))
+                if number and (not outline_count or 1 <= number <= outline_count):
+                    return self._result(UserIntent.SELECT_OUTLINE, "数字选择", number=number)
+                return None
+            match = _MODIFY_PATTERN.match(text)
+            if match:
+                return self._result(
+                    UserIntent.MODIFY_OUTLINE, "修改指令",
+                    number=_parse_number(match.group(1)) or 1
+                )
+
+        for intent, words in STATE_KEYWORDS.get(current_state, []):
+            if text in words:
+                return self._result(intent, "关键词匹配")
+
+        return None
+
+    def _result(self, intent: UserIntent, reason: str, **extracted) -> IntentResult:
+        """构建快速通道识别结果"""
+        return IntentResult(
+            intent=intent,
+            confidence=1.0,
+            extracted_data=extracted,
+            reasoning=f"规则快速通道: {reason}"
+        )
+
+
 class IntentDetector:
-    """基于 LLM 的意图识别器"""
+    """意图识别器（规则快速通道 + LLM）"""
+
+    # 每处理多少条输入输出一次命中率日志
+    LOG_EVERY = 20
 
     def __init__(self, llm_client):
         """
@@ -63,6 +212,43 @@ class IntentDetector:
             llm_client: LLM 客户端实例
         """
         self.llm = llm_client
+        self.fast_path = FastPathMatcher()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, current_state: str, fast_path: bool):
+        """记录一次识别（按状态统计快速通道命中）"""
+        stats = self._stats.setdefault(current_state, {'total': 0, 'fast_path': 0})
+        stats['total'] += 1
+        if fast_path:
+            stats['fast_path'] += 1
+
+        total = sum(s['total'] for s in self._stats.values())
+        if total % self.LOG_EVERY == 0:
+            summary = self.get_stats()
+            logger.info(
+                f"⚡ 意图识别快速通道命中率 {summary['hit_rate']:.0%} "
+                f"({summary['fast_path']}/{summary['total']}，LLM {summary['llm']} 次)"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取快速通道命中统计
+
+        Returns:
+            {'total', 'fast_path', 'llm', 'hit_rate', 'by_state'}
+        """
+        total = sum(s['total'] for s in self._stats.values())
+        fast = sum(s['fast_path'] for s in self._stats.values())
+        return {
+            'total': total,
+            'fast_path': fast,
+            'llm': total - fast,
+            'hit_rate': fast / total if total else 0.0,
+            'by_state': {
+                state: dict(s, hit_rate=s['fast_path'] / s['total'] if s['total'] else 0.0)
+                for state, s in self._stats.items()
+            }
+        }
 
     async def detect_intent(
         self,
@@ -83,6 +269,12 @@ class IntentDetector:
         """
         context = context or {}
 
+        # 规则快速通道
+        fast_result = self.fast_path.match(user_input, current_state, context)
+        self._record(current_state, fast_result is not None)
+        if fast_result:
+            return fast_result
+
         system_prompt = self._build_system_prompt()
         user_prompt = self._build_user_prompt(user_input, current_state, context)
 
@@ -0,0 +1,75 @@
+"""
+按键加锁
+为每个键（如会话ID）提供独立的 asyncio 锁：同一键的处理串行执行，不同键之间完全并行
+
+锁在没有持有者和等待者时自动释放，不会随会话数量无限增长。
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+class KeyedLock:
+    """按键加锁"""
+
+    def __init__(self, name: str = "keyed-lock"):
+        """
+        初始化
+
+        Args:
+            name: 锁名称（用于日志）
+        """
+        self.name = name
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refs: Dict[str, int] = {}
+        self._acquisitions = 0
+        self._contended = 0
+
+    @asynccontextmanager
+    async def acquire(self, key: str) -> AsyncIterator[None]:
+        """
+        获取指定键的锁
+
+        用法：
+            async with keyed_lock.acquire(session_id):
+                ...
+        """
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._refs[key] = self._refs.get(key, 0) + 1
+
+        self._acquisitions += 1
+        if lock.locked():
+            self._contended += 1
+            logger.debug(f"🔒 {self.name}: 等待 {key}")
+
+        try:
+            async with lock:
+                yield
+        finally:
+            self._refs[key] -= 1
+            if self._refs[key] == 0:
+                del self._refs[key]
+                del self._locks[key]
+
+    def __call__(self, key: str):
+        """等价于 acquire(key)"""
+        return self.acquire(key)
+
+    def locked(self, key: str) -> bool:
+        """指定键当前是否被持有"""
+        lock = self._locks.get(key)
+        return bool(lock and lock.locked())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取锁统计"""
+        return {
+            'active_keys': len(self._locks),
+            'acquisitions': self._acquisitions,
+            'contended': self._contended
+        }
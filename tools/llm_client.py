@@ -4,6 +4,7 @@ LLM 客户端封装
 """
 
 import os
+import time
 import asyncio
 import json
 import logging
@@ -14,6 +15,142 @@ from openai import APIError, APIConnectionError, RateLimitError
 logger = logging.getLogger(__name__)
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的 token 数量（粗略估计）
+
+    中文约1字符=1token，英文约4字符=1token
+    """
+    if not text:
+        return 0
+    chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
+    other_chars = len(text) - chinese_chars
+
+    return chinese_chars + (other_chars // 4)
+
+
+class PromptTelemetry:
+    """
+    提示词调用遥测
+
+    按提示词名称统计调用次数、prompt/缓存 token 与耗时。
+    缓存 token 来自 API 返回的 usage.prompt_tokens_details.cached_tokens，
+    服务端不返回该字段时记为 0。
+    """
+
+    # 每累计多少次调用输出一次汇总日志
+    LOG_EVERY = 20
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(
+        self,
+        prompt_name: str,
+        usage: Any,
+        latency: float,
+        success: bool = True
+    ):
+        """
+        记录一次调用
+
+        Args:
+            prompt_name: 提示词名称（见 config/prompts/registry.py）
+            usage: API 返回的 usage 对象（可为 None）
+            latency: 调用耗时（秒）
+            success: 是否成功
+        """
+        stats = self._stats.get(prompt_name)
+        if stats is None:
+            stats = {
+                'prefix_hash': self._lookup_prefix_hash(prompt_name),
+                'calls': 0,
+                'errors': 0,
+                'prompt_tokens': 0,
+                'cached_tokens': 0,
+                'completion_tokens': 0,
+                'cache_hits': 0,
+                'latency_total': 0.0,
+                'latency_cached': 0.0,
+                'latency_uncached': 0.0
+            }
+            self._stats[prompt_name] = stats
+
+        stats['calls'] += 1
+        stats['latency_total'] += latency
+        if not success:
+            stats['errors'] += 1
+            return
+
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', 0) or 0
+
+        stats['prompt_tokens'] += prompt_tokens
+        stats['completion_tokens'] += completion_tokens
+        stats['cached_tokens'] += cached_tokens
+        if cached_tokens > 0:
+            stats['cache_hits'] += 1
+            stats['latency_cached'] += latency
+        else:
+            stats['latency_uncached'] += latency
+
+        logger.debug(
+            f"[{prompt_name}] prompt={prompt_tokens} cached={cached_tokens} "
+            f"completion={completion_tokens} latency={latency:.2f}s"
+        )
+
+        if stats['calls'] % self.LOG_EVERY == 0:
+            summary = self.summary(prompt_name)
+            logger.info(
+                f"📊 提示词 {prompt_name} (prefix={summary['prefix_hash']}): "
+                f"{summary['calls']} 次调用，缓存命中率 {summary['cache_hit_rate']:.0%}，"
+                f"缓存 token 占比 {summary['cached_token_ratio']:.0%}，"
+                f"平均耗时 {summary['avg_latency']:.2f}s"
+            )
+
+    def _lookup_prefix_hash(self, prompt_name: str) -> str:
+        """从提示词注册表查询前缀哈希"""
+        try:
+            from config.prompts.registry import get_prompt_registry
+            prompt = get_prompt_registry().get(prompt_name)
+            return prompt.prefix_hash if prompt else ''
+        except ImportError:
+            return ''
+
+    def summary(self, prompt_name: str) -> Dict[str, Any]:
+        """
+        获取单个提示词的汇总统计
+
+        Returns:
+            包含调用次数、命中率、平均耗时等字段的字典
+        """
+        stats = dict(self._stats.get(prompt_name, {}))
+        if not stats:
+            return {}
+
+        ok_calls = stats['calls'] - stats['errors']
+        uncached_calls = ok_calls - stats['cache_hits']
+        stats['prompt_name'] = prompt_name
+        stats['cache_hit_rate'] = stats['cache_hits'] / ok_calls if ok_calls else 0.0
+        stats['cached_token_ratio'] = (
+            stats['cached_tokens'] / stats['prompt_tokens'] if stats['prompt_tokens'] else 0.0
+        )
+        stats['avg_latency'] = stats['latency_total'] / stats['calls'] if stats['calls'] else 0.0
+        stats['avg_latency_cached'] = (
+            stats['latency_cached'] / stats['cache_hits'] if stats['cache_hits'] else 0.0
+        )
+        stats['avg_latency_uncached'] = (
+            stats['latency_uncached'] / uncached_calls if uncached_calls else 0.0
+        )
+        return stats
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有提示词的汇总统计"""
+        return {name: self.summary(name) for name in self._stats}
+
+
 class LLMClient:
     """LLM 客户端封装类"""
     
@@ -53,6 +190,7 @@ class LLMClient:
             logger.info(f"Using custom API base: {api_base}")
         
         self.client = AsyncOpenAI(**client_kwargs)
+        self.telemetry = PromptTelemetry()
         
         logger.info(f"LLM client initialized with model: {model}")
     
@@ -62,7 +200,8 @@ class LLMClient:
         user_prompt: str,
         temperature: float = 0.7,
         max_tokens: int = 20000,
-        json_mode: bool = False
+        json_mode: bool = False,
+        prompt_name: Optional[str] = None
     ) -> str:
         """
         生成文本
@@ -73,6 +212,7 @@ class LLMClient:
             temperature: 温度参数（0-2）
             max_tokens: 最大token数
             json_mode: 是否使用JSON模式
+            prompt_name: 提示词名称（用于前缀缓存遥测）
             
         Returns:
             生成的文本
@@ -82,6 +222,7 @@ class LLMClient:
             {"role": "user", "content": user_prompt}
         ]
         
+        started = time.monotonic()
         try:
             kwargs = {
                 "model": self.model,
@@ -94,6 +235,12 @@ class LLMClient:
                 kwargs["response_format"] = {"type": "json_object"}
             
             response = await self.client.chat.completions.create(**kwargs)
+
+            self.telemetry.record(
+                prompt_name or "unnamed",
+                getattr(response, 'usage', None),
+                time.monotonic() - started
+            )
             
             content = response.choices[0].message.content
             logger.debug(f"Generated {len(content)} characters")
@@ -101,6 +248,12 @@ class LLMClient:
             return content
             
         except Exception as e:
+            self.telemetry.record(
+                prompt_name or "unnamed",
+                None,
+                time.monotonic() - started,
+                success=False
+            )
             logger.error(f"Error in LLM generation: {str(e)}")
             raise
     
@@ -110,7 +263,8 @@ class LLMClient:
         user_prompt: str,
         temperature: float = 0.7,
         max_tokens: int = 20000,
-        json_mode: bool = False
+        json_mode: bool = False,
+        prompt_name: Optional[str] = None
     ) -> Optional[str]:
         """
         带重试机制的生成
@@ -127,7 +281,8 @@ class LLMClient:
                     user_prompt=user_prompt,
                     temperature=temperature,
                     max_tokens=max_tokens,
-                    json_mode=json_mode
+                    json_mode=json_mode,
+                    prompt_name=prompt_name
                 )
             
             except RateLimitError:
@@ -163,7 +318,8 @@ class LLMClient:
         system_prompt: str,
         user_prompt: str,
         temperature: float = 0.7,
-        max_tokens: int = 20000
+        max_tokens: int = 20000,
+        prompt_name: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """
         生成 JSON 格式的响应
@@ -176,7 +332,8 @@ class LLMClient:
             user_prompt=user_prompt,
             temperature=temperature,
             max_tokens=max_tokens,
-            json_mode=True
+            json_mode=True,
+            prompt_name=prompt_name
         )
         
         if not response_text:
@@ -224,17 +381,22 @@ class LLMClient:
             logger.error(f"Error in stream generation: {str(e)}")
             raise
     
+    def get_prompt_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各提示词的缓存命中与耗时统计
+
+        Returns:
+            {prompt_name: {...}}
+        """
+        return self.telemetry.snapshot()
+    
     def estimate_tokens(self, text: str) -> int:
         """
         估算文本的 token 数量（粗略估计）
         
         实际应该使用 tiktoken 库，这里简化为字符数/4
         """
-        # 简单估算：中文约1字符=1token，英文约4字符=1token
-        chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
-        other_chars = len(text) - chinese_chars
-        
-        return chinese_chars + (other_chars // 4)
+        return estimate_tokens(text)
     
     def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
         """
@@ -0,0 +1,311 @@
+"""
+素材摘要（Materials Digest）
+为一次创作会话构建一次性的素材摘要，供大纲和各章节写作提示词复用
+
+- 构建一次：按素材ID和标题去重，预先渲染每条素材的文本块并估算 token
+- 按章节相关性排序：根据章节标题/要点/核心论点挑选最相关的素材
+- token 预算：每个章节只放入预算内的素材
+- 统计节省：对比"每章节都发送完整素材块"的基线，记录节省的 prompt token
+- 会话级缓存：get_session_digest 按 session_id 缓存，写作和大纲提示词共用同一份摘要和素材格式
+  （缓存在进程内，Agent 分进程运行时各进程为每个会话各构建一次）
+"""
+
+import re
+import math
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Any, Tuple
+
+from config.prompts.write import format_materials
+from tools.llm_client import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 最多缓存的会话素材摘要数
+MAX_SESSION_DIGESTS = 32
+
+# 中文连续片段 / 英文单词
+_CJK_RUN = re.compile(r'[\u4e00-\u9fff]+')
+_WORD = re.compile(r'[a-zA-Z][a-zA-Z0-9+#.\-]*')
+
+
+def extract_terms(text: str) -> set:
+    """
+    提取用于相关性匹配的词项
+
+    中文使用字符二元组（bigram），英文使用小写单词
+    """
+    terms = set()
+    if not text:
+        return terms
+
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            terms.add(run)
+            continue
+        for i in range(len(run) - 1):
+            terms.add(run[i:i + 2])
+
+    for word in _WORD.findall(text):
+        if len(word) > 1:
+            terms.add(word.lower())
+
+    return terms
+
+
+def _normalize(text: str) -> str:
+    """归一化文本（用于去重）"""
+    return re.sub(r'[\s\W_]+', '', (text or '').lower())
+
+
+class MaterialsDigest:
+    """会话级素材摘要"""
+
+    def __init__(
+        self,
+        materials: List[Dict[str, Any]],
+        summary_chars: int = 200,
+        max_key_points: int = 3
+    ):
+        """
+        构建素材摘要
+
+        Args:
+            materials: 素材列表 [{"id", "title", "summary", "source", "key_points"}]
+            summary_chars: 摘要截取长度
+            max_key_points: 每条素材保留的要点数量
+        """
+        self.summary_chars = summary_chars
+        self.max_key_points = max_key_points
+        self.entries = self._build_entries(materials or [])
+
+        # 基线：旧方式下每次都会发送的完整素材块
+        self.full_block_tokens = sum(e['tokens'] for e in self.entries)
+
+        self.materials_in = len(materials or [])
+        self.reset_stats()
+
+        self._section_cache: Dict[tuple, str] = {}
+
+    def _build_entries(self, materials: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """去重并预渲染素材条目"""
+        entries = []
+        seen_ids = set()
+        seen_titles = set()
+        seen_points = set()
+
+        for mat in materials:
+            mat_id = mat.get('id', 'unknown')
+            title = mat.get('title', '未知')
+            title_key = _normalize(title)
+
+            if mat_id in seen_ids or (title_key and title_key in seen_titles):
+                continue
+            seen_ids.add(mat_id)
+            if title_key:
+                seen_titles.add(title_key)
+
+            summary = mat.get('summary') or ''
+
+            # 要点去重（跨素材）
+            key_points = []
+            for point in mat.get('key_points') or []:
+                point_key = _normalize(str(point))
+                if not point_key or point_key in seen_points:
+                    continue
+                seen_points.add(point_key)
+                key_points.append(str(point))
+                if len(key_points) >= self.max_key_points:
+                    break
+
+            # 与写作提示词共用同一素材格式
+            text = format_materials(
+                [{
+                    'id': mat_id,
+                    'title': title,
+                    'source': mat.get('source', '未知'),
+                    'summary': summary,
+                    'key_points': key_points
+                }],
+                summary_chars=self.summary_chars,
+                max_key_points=self.max_key_points
+            )
+            entries.append({
+                'id': mat_id,
+                'order': len(entries),
+                'text': text,
+                'tokens': estimate_tokens(text),
+                'terms': extract_terms(f"{title} {summary} {' '.join(key_points)}")
+            })
+
+        return entries
+
+    def rank(self, query: str) -> List[tuple]:
+        """
+        按与查询文本的相关性对素材排序
+
+        Returns:
+            [(score, entry), ...] 按分数降序
+        """
+        query_terms = extract_terms(query)
+        ranked = []
+        for entry in self.entries:
+            overlap = len(query_terms & entry['terms'])
+            score = overlap / math.sqrt(len(entry['terms'])) if entry['terms'] else 0.0
+            ranked.append((score, entry))
+
+        ranked.sort(key=lambda x: (-x[0], x[1]['order']))
+        return ranked
+
+    def select_for_section(
+        self,
+        section_title: str,
+        section_points: List[str],
+        core_argument: str = "",
+        budget_tokens: int = 600,
+        max_items: int = 3
+    ) -> str:
+        """
+        为章节挑选最相关的素材，返回素材文本
+
+        Args:
+            section_title: 章节标题
+            section_points: 章节要点
+            core_argument: 核心论点
+            budget_tokens: 素材部分的 token 预算
+            max_items: 最多放入的素材数量
+
+        Returns:
+            素材文本（无素材时返回空字符串）
+        """
+        cache_key = (section_title, tuple(section_points or []), core_argument, budget_tokens, max_items)
+        if cache_key in self._section_cache:
+            text = self._section_cache[cache_key]
+        else:
+            query = f"{section_title} {core_argument} {' '.join(section_points or [])}"
+            ranked = self.rank(query)
+
+            # 都不相关时只保留第一条素材作为背景
+            if ranked and ranked[0][0] == 0:
+                ranked = ranked[:1]
+
+            chosen = []
+            used = 0
+            for score, entry in ranked:
+                if len(chosen) >= max_items:
+                    break
+                if score == 0 and chosen:
+                    break
+                if chosen and used + entry['tokens'] > budget_tokens:
+                    continue
+                chosen.append(entry)
+                used += entry['tokens']
+
+            # 保持素材原有顺序，便于阅读
+            chosen.sort(key=lambda e: e['order'])
+            text = "".join(e['text'] for e in chosen)
+            self._section_cache[cache_key] = text
+
+        self._record(text)
+        return text
+
+    def render_all(self, budget_tokens: int = 1500) -> str:
+        """
+        按原顺序渲染素材，直到用完 token 预算（用于大纲生成）
+        """
+        chosen = []
+        used = 0
+        for entry in self.entries:
+            if chosen and used + entry['tokens'] > budget_tokens:
+                break
+            chosen.append(entry)
+            used += entry['tokens']
+
+        text = "".join(e['text'] for e in chosen)
+        self._record(text)
+        return text
+
+    def reset_stats(self):
+        """重置节省统计（每篇文章单独统计）"""
+        self.stats = {
+            'materials_in': self.materials_in,
+            'materials_kept': len(self.entries),
+            'prompts': 0,
+            'baseline_tokens': 0,
+            'sent_tokens': 0
+        }
+
+    def _record(self, text: str):
+        """记录一次提示词使用"""
+        self.stats['prompts'] += 1
+        self.stats['baseline_tokens'] += self.full_block_tokens
+        self.stats['sent_tokens'] += estimate_tokens(text)
+
+    def savings_report(self) -> Dict[str, Any]:
+        """
+        获取 prompt token 节省统计
+
+        Returns:
+            {'prompts', 'baseline_tokens', 'sent_tokens', 'saved_tokens', 'saved_ratio', ...}
+        """
+        report = dict(self.stats)
+        saved = report['baseline_tokens'] - report['sent_tokens']
+        report['saved_tokens'] = saved
+        report['saved_ratio'] = round(saved / report['baseline_tokens'], 3) if report['baseline_tokens'] else 0.0
+        return report
+
+
+# 会话级素材摘要缓存 {session_id: (素材ID元组, MaterialsDigest)}
+_session_digests: "OrderedDict[str, Tuple[tuple, MaterialsDigest]]" = OrderedDict()
+
+
+def build_materials(related_contents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    把数据库中的相关内容转换为素材列表
+
+    Args:
+        related_contents: content_items 行（完整行或列表投影）
+
+    Returns:
+        素材列表 [{"id", "title", "summary", "source", "key_points"}]
+    """
+    materials = []
+    for content in related_contents:
+        materials.append({
+            'id': content.get('id', 'unknown'),
+            'title': content.get('title', 'N/A'),
+            'summary': (
+                content.get('summary_paragraph')
+                or content.get('raw_preview')
+                or (content.get('raw_content') or '')[:300]
+            ),
+            'source': content.get('source', '未知'),
+            'key_points': content.get('key_points', [])
+        })
+    return materials
+
+
+def get_session_digest(session_id: str, related_contents: List[Dict[str, Any]]) -> MaterialsDigest:
+    """
+    获取会话级素材摘要（按 session_id 缓存，素材变化时重建）
+
+    Args:
+        session_id: 会话ID（为空时不缓存）
+        related_contents: 数据库中的相关内容
+
+    Returns:
+        MaterialsDigest 实例
+    """
+    material_ids = tuple(c.get('id') for c in related_contents)
+    cached = _session_digests.get(session_id) if session_id else None
+    if cached and cached[0] == material_ids:
+        _session_digests.move_to_end(session_id)
+        return cached[1]
+
+    digest = MaterialsDigest(build_materials(related_contents))
+    if session_id:
+        _session_digests[session_id] = (material_ids, digest)
+        while len(_session_digests) > MAX_SESSION_DIGESTS:
+            _session_digests.popitem(last=False)
+
+    return digest
@@ -0,0 +1,311 @@
+"""
+流水线吞吐时序指标
+按固定时间桶（分钟 / 小时 / 天）记录各环节的处理数量、失败数和耗时，看板按桶读取，不再扫描 content_items
+
+- 写入只落分钟桶；维护时把分钟桶汇总为小时桶、小时桶汇总为天桶（可重复执行，结果不变）
+- 各粒度按保留期过期：分钟 24 小时、小时 30 天、天 365 天
+- 维护由 record 按间隔顺带触发，同时采样待处理积压（来自统计计数表）
+- 桶起点为 UTC 时间戳，按粒度对齐
+"""
+
+import time
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "data/knowledge-flow/content.db"
+
+# 粒度 -> (桶长度秒数, 保留秒数)
+RESOLUTIONS = {
+    'minute': (60, 24 * 3600),
+    'hour': (3600, 30 * 86400),
+    'day': (86400, 365 * 86400),
+}
+
+# 维护（汇总、过期、积压采样）最小间隔（秒）
+MAINTAIN_INTERVAL_SECONDS = 60
+
+
+class PipelineMetric:
+    """指标名常量"""
+    INGEST = 'ingest'            # RSS 新入库内容
+    SUMMARIZE = 'summarize'      # 摘要生成（耗时为 LLM 调用）
+    TAG = 'tag'                  # 标签生成（耗时为 LLM 调用）
+    WRITE = 'write'              # 文章写作（耗时为整篇写作）
+    REVIEW = 'review'            # 评审员评审（耗时为 LLM 调用）
+    BACKLOG_SUMMARIZE = 'backlog.summarize'   # 待摘要积压（采样值）
+    BACKLOG_TAG = 'backlog.tag'               # 待打标签积压（采样值）
+
+
+# 积压采样：指标 -> content_items 状态
+_BACKLOG_STATUSES = {
+    PipelineMetric.BACKLOG_SUMMARIZE: 'discovered',
+    PipelineMetric.BACKLOG_TAG: 'summarized',
+}
+
+
+def _bucket_start(ts: float, resolution: str) -> int:
+    """时间戳对齐到桶起点"""
+    size = RESOLUTIONS[resolution][0]
+    return int(ts) - int(ts) % size
+
+
+class MetricsStore:
+    """时序指标存储"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        """
+        初始化
+
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db_path = db_path
+        self._last_maintain = 0.0
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._init_table()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """获取数据库连接"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_table(self):
+        """创建指标桶表"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS metric_buckets (
+                metric TEXT NOT NULL,
+                resolution TEXT NOT NULL,
+                bucket_start INTEGER NOT NULL,
+                count INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0,
+                value_sum REAL DEFAULT 0,
+                value_count INTEGER DEFAULT 0,
+                value_max REAL,
+                PRIMARY KEY (metric, resolution, bucket_start)
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_metric_buckets_expire ON metric_buckets(resolution, bucket_start)"
+        )
+        conn.commit()
+        conn.close()
+
+    def record(
+        self,
+        metric: str,
+        value: Optional[float] = None,
+        count: int = 1,
+        error: bool = False,
+        ts: Optional[float] = None
+    ):
+        """
+        记录一次事件
+
+        Args:
+            metric: 指标名（见 PipelineMetric）
+            value: 耗时（毫秒）或采样值，可为空
+            count: 事件数
+            error: 是否失败
+            ts: 事件时间戳，默认当前时间
+        """
+        ts = ts or time.time()
+        try:
+            conn = self._get_connection()
+            self._add(conn.cursor(), metric, _bucket_start(ts, 'minute'), value, count, error)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error recording metric {metric}: {e}")
+            return
+
+        self._maybe_maintain()
+
+    def _add(self, cursor, metric: str, bucket_start: int, value: Optional[float], count: int, error: bool):
+        """累加到分钟桶"""
+        cursor.execute("""
+            INSERT OR IGNORE INTO metric_buckets (metric, resolution, bucket_start)
+            VALUES (?, 'minute', ?)
+        """, (metric, bucket_start))
+        cursor.execute("""
+            UPDATE metric_buckets SET
+                count = count + ?,
+                errors = errors + ?,
+                value_sum = value_sum + COALESCE(?, 0),
+                value_count = value_count + (? IS NOT NULL),
+                value_max = CASE WHEN ? IS NULL THEN value_max ELSE MAX(COALESCE(value_max, ?), ?) END
+            WHERE metric = ? AND resolution = 'minute' AND bucket_start = ?
+        """, (count, 1 if error else 0, value, value, value, value, value, metric, bucket_start))
+
+    # ==================== 维护 ====================
+
+    def _maybe_maintain(self):
+        """距上次维护超过间隔时执行维护"""
+        now = time.time()
+        if now - self._last_maintain < MAINTAIN_INTERVAL_SECONDS:
+            return
+        self._last_maintain = now
+        try:
+            self.maintain(now)
+        except Exception as e:
+            logger.error(f"Error maintaining metrics: {e}")
+
+    def maintain(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        采样积压、汇总粗粒度桶并过期旧桶
+
+        Returns:
+            {'expired': 删除的桶数}
+        """
+        now = now or time.time()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        self._sample_backlog(cursor, now)
+        self._rollup(cursor, 'minute', 'hour', now)
+        self._rollup(cursor, 'hour', 'day', now)
+
+        expired = 0
+        for resolution, (_, retention) in RESOLUTIONS.items():
+            cursor.execute(
+                "DELETE FROM metric_buckets WHERE resolution = ? AND bucket_start < ?",
+                (resolution, int(now) - retention)
+            )
+            expired += cursor.rowcount
+
+        conn.commit()
+        conn.close()
+        if expired:
+            logger.info(f"🗑️ 过期指标桶 {expired} 个")
+        return {'expired': expired}
+
+    def _rollup(self, cursor, source: str, target: str, now: float):
+        """
+        用细粒度桶重新计算粗粒度桶
+
+        只汇总细粒度数据完整保留的时间段（起点晚于细粒度保留期），当前未结束的桶也一并刷新
+        """
+        size = RESOLUTIONS[target][0]
+        since = int(now) - RESOLUTIONS[source][1]
+        since = since - since % size + size
+        cursor.execute("""
+            INSERT OR REPLACE INTO metric_buckets
+            (metric, resolution, bucket_start, count, errors, value_sum, value_count, value_max)
+            SELECT metric, ?, bucket_start - bucket_start % ?,
+                SUM(count), SUM(errors), SUM(value_sum), SUM(value_count), MAX(value_max)
+            FROM metric_buckets
+            WHERE resolution = ? AND bucket_start >= ?
+            GROUP BY metric, bucket_start - bucket_start % ?
+        """, (target, size, source, since, size))
+
+    def _sample_backlog(self, cursor, now: float):
+        """从统计计数表采样各环节待处理数量"""
+        try:
+            cursor.execute("SELECT value, count FROM content_counters WHERE dimension = 'status'")
+            counts = {row['value']: row['count'] for row in cursor.fetchall()}
+        except sqlite3.OperationalError:
+            # 计数表尚未创建
+            return
+        bucket_start = _bucket_start(now, 'minute')
+        for metric, status in _BACKLOG_STATUSES.items():
+            self._add(cursor, metric, bucket_start, counts.get(status, 0), 0, False)
+
+    # ==================== 查询 ====================
+
+    def query(
+        self,
+        metrics: Optional[List[str]] = None,
+        resolution: str = 'hour',
+        since: Optional[float] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        读取时序数据
+
+        Args:
+            metrics: 指标名列表，默认全部
+            resolution: 粒度（minute/hour/day）
+            since: 起始时间戳，默认该粒度保留期内全部
+
+        Returns:
+            {metric: [{'bucket_start', 'count', 'errors', 'avg', 'max'}]}（按时间升序）
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"未知的粒度: {resolution}")
+        since = int(since if since is not None else time.time() - RESOLUTIONS[resolution][1])
+
+        query = "SELECT * FROM metric_buckets WHERE resolution = ? AND bucket_start >= ?"
+        params: List[Any] = [resolution, since]
+        if metrics:
+            query += f" AND metric IN ({', '.join('?' * len(metrics))})"
+            params.extend(metrics)
+        query += " ORDER BY metric, bucket_start"
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        series: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            series.setdefault(row['metric'], []).append({
+                'bucket_start': row['bucket_start'],
+                'count': row['count'],
+                'errors': row['errors'],
+                'avg': round(row['value_sum'] / row['value_count'], 1) if row['value_count'] else None,
+                'max': row['value_max']
+            })
+        return series
+
+    def summary(self, window_seconds: int = 3600) -> Dict[str, Dict[str, Any]]:
+        """
+        最近一段时间各指标汇总（读取分钟桶）
+
+        Args:
+            window_seconds: 时间窗口（秒）
+
+        Returns:
+            {metric: {'count', 'errors', 'per_minute', 'avg', 'max'}}
+        """
+        since = _bucket_start(time.time() - window_seconds, 'minute')
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT metric, SUM(count) AS count, SUM(errors) AS errors,
+                SUM(value_sum) AS value_sum, SUM(value_count) AS value_count, MAX(value_max) AS value_max
+            FROM metric_buckets
+            WHERE resolution = 'minute' AND bucket_start >= ?
+            GROUP BY metric
+        """, (since,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        minutes = max(window_seconds / 60, 1)
+        return {
+            row['metric']: {
+                'count': row['count'],
+                'errors': row['errors'],
+                'per_minute': round(row['count'] / minutes, 2),
+                'avg': round(row['value_sum'] / row['value_count'], 1) if row['value_count'] else None,
+                'max': row['value_max']
+            }
+            for row in rows
+        }
+
+
+# 全局指标存储实例
+_store_instance: Optional[MetricsStore] = None
+
+
+def get_metrics_store(db_path: str = DEFAULT_DB_PATH) -> MetricsStore:
+    """获取全局指标存储实例"""
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = MetricsStore(db_path)
+    return _store_instance
@@ -0,0 +1,555 @@
+"""
+评审编排器 - 多评审员并发评审的聚合状态持久化
+
+一次评审称为一轮（review round）：
+  协调器发出 creation.review_request → 各评审员并发审查 → creation.review_completed 回传
+  → 全部返回或到达截止时间后汇总（超时的评审员记为缺失，返回部分结果）
+
+聚合状态保存在 review_rounds 表中，协调器重启后可继续等待未完成的评审轮次。
+
+优化后的复审为增量轮次：只评审与上一轮相比修改过的章节，汇总时与上一轮结果合并。
+"""
+
+import json
+import os
+import uuid
+import sqlite3
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+import logging
+
+from tools.draft_sections import section_hashes, diff_sections, merge_findings, split_sections
+from tools.sensitive_scanner import get_sensitive_scanner
+from tools.ai_flavor_scorer import get_ai_flavor_scorer
+
+logger = logging.getLogger(__name__)
+
+
+# 评审类型 → 评审员
+REVIEW_TYPES = ('sensitive', 'ai_flavor', 'public_opinion')
+
+REVIEW_TYPE_NAMES = {
+    'sensitive': '敏感词审查',
+    'ai_flavor': 'AI味审查',
+    'public_opinion': '舆情审查'
+}
+
+# 各评审类型的改进建议字段（与三个评审员提示词的输出格式对应）
+SUGGESTION_FIELDS = {
+    'sensitive': 'recommendations',
+    'ai_flavor': 'humanization_tips',
+    'public_opinion': 'mitigation_suggestions'
+}
+
+# 默认每个评审员的截止时间（秒），可通过环境变量覆盖
+DEFAULT_REVIEW_DEADLINE = int(os.getenv("REVIEW_DEADLINE_SECONDS", "120"))
+
+# 草稿不超过该字数时使用一次调用的合并审查（0 表示禁用）
+COMBINED_REVIEW_MAX_CHARS = int(os.getenv("COMBINED_REVIEW_MAX_CHARS", "3000"))
+
+
+class RoundStatus:
+    """评审轮次状态常量"""
+    PENDING = 'pending'        # 等待评审结果
+    COMPLETED = 'completed'    # 全部评审员已返回
+    PARTIAL = 'partial'        # 截止时间已到，部分评审员未返回
+
+
+class RoundMode:
+    """评审轮次分发方式常量"""
+    DISPATCH = 'dispatch'      # 评审请求已分发给各评审员
+    COMBINED = 'combined'      # 协调器自己进行合并审查（重启后需要重新执行）
+
+
+class ReviewOrchestrator:
+    """评审编排器"""
+
+    def __init__(self, db, deadlines: Optional[Dict[str, int]] = None):
+        """
+        初始化评审编排器
+
+        Args:
+            db: Database 实例
+            deadlines: 各评审类型的截止时间（秒），未指定的使用默认值
+        """
+        self.db = db
+        self.deadlines = {t: DEFAULT_REVIEW_DEADLINE for t in REVIEW_TYPES}
+        if deadlines:
+            self.deadlines.update(deadlines)
+        self._init_table()
+
+    def _init_table(self):
+        """初始化评审轮次表"""
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS review_rounds (
+                id TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                draft_id TEXT,
+                draft_title TEXT,
+                status TEXT DEFAULT 'pending',
+                deadlines TEXT,
+                results TEXT,
+                started_at REAL,
+                completed_at REAL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_review_rounds_session
+            ON review_rounds(session_id)
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_review_rounds_status
+            ON review_rounds(status)
+        """)
+
+        # 迁移：增量复审字段（评审时的章节哈希、基准轮次、修改范围）和分发方式
+        for column in ('section_hashes', 'base_round_id', 'scope', 'mode'):
+            try:
+                cursor.execute(f"ALTER TABLE review_rounds ADD COLUMN {column} TEXT")
+            except sqlite3.OperationalError:
+                # 列已存在，忽略错误
+                pass
+
+        conn.commit()
+        conn.close()
+
+    def _row_to_round(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """将数据库行转换为评审轮次字典"""
+        data = dict(row)
+        data['deadlines'] = json.loads(data['deadlines']) if data.get('deadlines') else {}
+        data['results'] = json.loads(data['results']) if data.get('results') else {}
+        data['section_hashes'] = json.loads(data['section_hashes']) if data.get('section_hashes') else {}
+        data['scope'] = json.loads(data['scope']) if data.get('scope') else None
+        data['mode'] = data.get('mode') or RoundMode.DISPATCH
+        return data
+
+    def start_round(
+        self,
+        session_id: str,
+        draft_id: str,
+        draft_title: str = "",
+        review_types: Optional[List[str]] = None,
+        content: str = "",
+        base_round_id: Optional[str] = None,
+        scope: Optional[Dict[str, Any]] = None,
+        mode: str = RoundMode.DISPATCH
+    ) -> Dict[str, Any]:
+        """
+        开始新一轮评审（同一会话未完成的旧轮次会被关闭）
+
+        Args:
+            session_id: 会话ID
+            draft_id: 草稿ID
+            draft_title: 草稿标题
+            review_types: 参与本轮的评审类型，默认全部（空列表表示无需评审）
+            content: 本轮评审的完整正文（记录章节哈希，供下一轮增量复审比较）
+            base_round_id: 增量复审的基准轮次
+            scope: 增量复审的修改范围
+            mode: 分发方式（RoundMode）
+
+        Returns:
+            评审轮次字典
+        """
+        now = datetime.now().timestamp()
+        review_types = list(REVIEW_TYPES if review_types is None else review_types)
+        deadlines = {t: now + self.deadlines.get(t, DEFAULT_REVIEW_DEADLINE) for t in review_types}
+        round_id = f"review-{uuid.uuid4().hex[:12]}"
+
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            UPDATE review_rounds
+            SET status = ?, completed_at = ?
+            WHERE session_id = ? AND status = ?
+        """, (RoundStatus.PARTIAL, now, session_id, RoundStatus.PENDING))
+
+        cursor.execute("""
+            INSERT INTO review_rounds
+            (id, session_id, draft_id, draft_title, status, deadlines, results, started_at,
+             section_hashes, base_round_id, scope, mode)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            round_id, session_id, draft_id, draft_title, RoundStatus.PENDING,
+            json.dumps(deadlines), json.dumps({}), now,
+            json.dumps(section_hashes(content), ensure_ascii=False) if content else None,
+            base_round_id,
+            json.dumps(scope, ensure_ascii=False) if scope else None,
+            mode
+        ))
+
+        conn.commit()
+        conn.close()
+
+        logger.info(f"🔍 开始评审轮次: {round_id} (session={session_id}, types={review_types}, mode={mode})")
+        return self.get_round(round_id)
+
+    def get_round(self, round_id: str) -> Optional[Dict[str, Any]]:
+        """获取评审轮次"""
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM review_rounds WHERE id = ?", (round_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return self._row_to_round(row) if row else None
+
+    def get_active_round(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """获取会话当前等待中的评审轮次"""
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT * FROM review_rounds
+            WHERE session_id = ? AND status = ?
+            ORDER BY started_at DESC LIMIT 1
+        """, (session_id, RoundStatus.PENDING))
+        row = cursor.fetchone()
+        conn.close()
+        return self._row_to_round(row) if row else None
+
+    def get_last_round(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """获取会话最近一个已结束的评审轮次"""
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT * FROM review_rounds
+            WHERE session_id = ? AND status != ?
+            ORDER BY started_at DESC LIMIT 1
+        """, (session_id, RoundStatus.PENDING))
+        row = cursor.fetchone()
+        conn.close()
+        return self._row_to_round(row) if row else None
+
+    def plan_incremental(self, session_id: str, content: str) -> tuple:
+        """
+        规划增量复审：与上一轮评审时的章节哈希比较
+
+        Args:
+            session_id: 会话ID
+            content: 新版本正文
+
+        Returns:
+            (base_round, diff)；没有可用的基准轮次时返回 (None, None)，需要完整评审
+        """
+        base = self.get_last_round(session_id)
+        if not base or not base.get('section_hashes') or not base['results']:
+            return None, None
+        return base, diff_sections(base['section_hashes'], content)
+
+    def get_pending_rounds(self) -> List[Dict[str, Any]]:
+        """获取所有等待中的评审轮次（用于重启后恢复）"""
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM review_rounds WHERE status = ?", (RoundStatus.PENDING,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._row_to_round(row) for row in rows]
+
+    def record_result(
+        self,
+        session_id: str,
+        review_type: str,
+        result: Dict[str, Any],
+        round_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        记录一个评审员的结果
+
+        Args:
+            session_id: 会话ID
+            review_type: 评审类型
+            result: {'score', 'verdict', 'suggestions', 'full_review'}
+            round_id: 评审轮次ID（旧版评审员不带该字段时按会话查找）
+
+        Returns:
+            更新后的评审轮次；轮次已结束或不存在时返回 None（迟到的结果被丢弃）
+        """
+        round_data = self.get_round(round_id) if round_id else self.get_active_round(session_id)
+        if not round_data or round_data['status'] != RoundStatus.PENDING:
+            logger.info(f"⏱️  丢弃迟到或无效的评审结果: session={session_id}, type={review_type}")
+            return None
+
+        if review_type not in round_data['deadlines']:
+            logger.warning(f"⚠️  评审类型不在本轮中: {review_type}")
+            return None
+
+        result = dict(result)
+        result['received_at'] = datetime.now().timestamp()
+        round_data['results'][review_type] = result
+
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE review_rounds SET results = ? WHERE id = ?",
+            (json.dumps(round_data['results'], ensure_ascii=False), round_data['id'])
+        )
+        conn.commit()
+        conn.close()
+
+        return round_data
+
+    def set_mode(self, round_id: str, mode: str):
+        """更新评审轮次的分发方式（合并审查回退为单独评审时使用）"""
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE review_rounds SET mode = ? WHERE id = ? AND status = ?",
+            (mode, round_id, RoundStatus.PENDING)
+        )
+        conn.commit()
+        conn.close()
+
+    def reopen_deadlines(self, round_id: str, review_types: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        为重新分发的评审类型重置截止时间（协调器重启后补发评审请求时使用）
+
+        Returns:
+            更新后的评审轮次；轮次不存在或已结束时返回 None
+        """
+        round_data = self.get_round(round_id)
+        if not round_data or round_data['status'] != RoundStatus.PENDING:
+            return None
+
+        now = datetime.now().timestamp()
+        for review_type in review_types:
+            round_data['deadlines'][review_type] = now + self.deadlines.get(review_type, DEFAULT_REVIEW_DEADLINE)
+
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE review_rounds SET deadlines = ? WHERE id = ? AND status = ?",
+            (json.dumps(round_data['deadlines']), round_id, RoundStatus.PENDING)
+        )
+        conn.commit()
+        conn.close()
+        return round_data
+
+    def outstanding(self, round_data: Dict[str, Any]) -> List[str]:
+        """获取尚未返回结果的评审类型"""
+        return [t for t in round_data['deadlines'] if t not in round_data['results']]
+
+    def is_settled(self, round_data: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """
+        判断评审轮次是否可以汇总
+
+        所有评审类型都已返回结果或已过截止时间时返回 True
+        """
+        now = now or datetime.now().timestamp()
+        return all(round_data['deadlines'][t] <= now for t in self.outstanding(round_data))
+
+    def next_deadline(self, round_data: Dict[str, Any]) -> Optional[float]:
+        """获取未返回评审类型中最早的截止时间"""
+        pending = [round_data['deadlines'][t] for t in self.outstanding(round_data)]
+        return min(pending) if pending else None
+
+    def finalize_round(self, round_id: str) -> Optional[Dict[str, Any]]:
+        """
+        结束评审轮次（幂等：只有第一次调用会返回轮次数据）
+
+        Returns:
+            结束后的评审轮次；已被结束过时返回 None
+        """
+        round_data = self.get_round(round_id)
+        if not round_data:
+            return None
+
+        status = RoundStatus.PARTIAL if self.outstanding(round_data) else RoundStatus.COMPLETED
+        now = datetime.now().timestamp()
+
+        # 增量轮次结束时保存与基准合并后的全文结果，下一轮可以继续以它为基准
+        if round_data.get('base_round_id'):
+            round_data['results'] = self._merge_with_base(round_data)
+
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE review_rounds
+            SET status = ?, completed_at = ?, results = ?
+            WHERE id = ? AND status = ?
+        """, (
+            status, now, json.dumps(round_data['results'], ensure_ascii=False),
+            round_id, RoundStatus.PENDING
+        ))
+        updated = cursor.rowcount
+        conn.commit()
+        conn.close()
+
+        if not updated:
+            return None
+
+        round_data['status'] = status
+        round_data['completed_at'] = now
+        logger.info(
+            f"✅ 评审轮次结束: {round_id} status={status} "
+            f"耗时 {now - round_data['started_at']:.1f}s"
+        )
+        return round_data
+
+    def should_combine(self, draft: Dict[str, Any]) -> bool:
+        """
+        判断草稿是否使用合并审查
+
+        评审员本身只审查前 3000 字，短稿三次调用发送的是同一份正文，合并为一次调用；
+        合并前先经 local_reviews 本地预检，结果已确定的视角不再交给 LLM
+        """
+        if COMBINED_REVIEW_MAX_CHARS <= 0:
+            return False
+        content = draft.get('content') or ''
+        return 0 < len(content) <= COMBINED_REVIEW_MAX_CHARS
+
+    def local_reviews(self, draft: Dict[str, Any], review_types: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        合并审查前的本地预检：能由本地结果确定的评审类型不再交给 LLM
+
+        - sensitive：本地词库无命中时直接使用本地结果（与敏感词审查员的判断一致）
+        - ai_flavor：本地统计评分明显较低时直接使用本地结果（与AI味审查员的判断一致）
+
+        Args:
+            draft: 本轮下发的草稿（增量轮次只包含修改过的章节）
+            review_types: 本轮需要的评审类型
+
+        Returns:
+            {review_type: result}
+        """
+        content = draft.get('content') or ''
+        results = {}
+
+        if 'sensitive' in review_types:
+            scanner = get_sensitive_scanner()
+            scan = scanner.scan(content)
+            if scan.is_clean:
+                results['sensitive'] = self._to_result('sensitive', scanner.build_local_review(scan), 'local')
+
+        if 'ai_flavor' in review_types:
+            scorer = get_ai_flavor_scorer()
+            report = scorer.score(content)
+            if report.clearly_low:
+                results['ai_flavor'] = self._to_result('ai_flavor', scorer.build_local_review(report), 'local')
+
+        return results
+
+    @staticmethod
+    def _to_result(review_type: str, review: Dict[str, Any], mode: str) -> Dict[str, Any]:
+        """审查报告转换为轮次结果"""
+        return {
+            'score': review.get('overall_score', 0),
+            'verdict': review.get('verdict', ''),
+            'suggestions': review.get(SUGGESTION_FIELDS.get(review_type, ''), []),
+            'full_review': review,
+            'mode': mode
+        }
+
+    def split_combined_review(
+        self,
+        combined: Optional[Dict[str, Any]],
+        review_types: List[str]
+    ) -> tuple:
+        """
+        将合并审查的 JSON 拆分为各评审类型的结果
+
+        Args:
+            combined: LLM 返回的 {"sensitive": {...}, "ai_flavor": {...}, "public_opinion": {...}}（只含参与的视角）
+            review_types: 本轮需要的评审类型
+
+        Returns:
+            (results, missing)：results 为 {review_type: result}，
+            missing 为缺失或格式不完整、需要回退到单独评审的类型
+        """
+        results = {}
+        missing = []
+
+        for review_type in review_types:
+            review = (combined or {}).get(review_type)
+            if not isinstance(review, dict) or 'overall_score' not in review:
+                missing.append(review_type)
+                continue
+
+            results[review_type] = self._to_result(review_type, review, 'combined')
+
+        return results, missing
+
+    def _merge_with_base(self, round_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        增量轮次：把修改章节的评审结果与基准轮次合并
+
+        本轮未参与的评审类型（没有修改章节时）直接沿用基准结果；
+        参与但超时的类型保持缺失
+        """
+        base = self.get_round(round_data['base_round_id'])
+        if not base:
+            return round_data['results']
+
+        scope = round_data.get('scope') or {}
+        ratio = scope.get('changed_ratio', 1.0)
+        unchanged = set(scope.get('unchanged') or [])
+        draft = self.db.get_draft(round_data['draft_id']) or {}
+        unchanged_text = '\n\n'.join(
+            s['text'] for s in split_sections(draft.get('content') or '') if s['key'] in unchanged
+        )
+
+        results = {}
+        for review_type in REVIEW_TYPES:
+            prior = base['results'].get(review_type)
+            current = round_data['results'].get(review_type)
+
+            if review_type not in round_data['deadlines']:
+                if prior:
+                    results[review_type] = prior
+                continue
+            if not current:
+                continue
+            if not prior:
+                results[review_type] = current
+                continue
+
+            full_review = merge_findings(
+                prior.get('full_review') or {},
+                current.get('full_review') or {},
+                unchanged_text,
+                ratio
+            )
+            results[review_type] = {
+                'score': full_review.get('overall_score', current.get('score', 0)),
+                'verdict': current.get('verdict', ''),
+                'suggestions': full_review.get(SUGGESTION_FIELDS.get(review_type, ''), current.get('suggestions') or []),
+                'full_review': full_review
+            }
+
+        return results
+
+    def aggregate(self, round_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        聚合评审结果（供协调器生成汇总，增量轮次需先经 finalize_round 合并）
+
+        Returns:
+            {'sensitive': {score, verdict} | None, ..., 'suggestions', 'full_reviews',
+             'draft_title', 'missing', 'scope'}
+        """
+        results = round_data['results']
+
+        reviews = {
+            'suggestions': [],
+            'full_reviews': {},
+            'draft_title': round_data.get('draft_title', ''),
+            'missing': self.outstanding(round_data),
+            'scope': round_data.get('scope')
+        }
+
+        for review_type in REVIEW_TYPES:
+            result = results.get(review_type)
+            if not result:
+                reviews[review_type] = None
+                continue
+
+            reviews[review_type] = {
+                'score': result.get('score', 0),
+                'verdict': result.get('verdict', '')
+            }
+            reviews['suggestions'].extend(result.get('suggestions') or [])
+            reviews['full_reviews'][review_type] = result.get('full_review') or {}
+
+        return reviews
@@ -0,0 +1,177 @@
+"""
+章节级优化规划
+把评审建议映射到它涉及的章节，优化时只重写这些章节
+
+映射规则（按优先级）：
+1. 建议引用的原文片段（「」/引号、评审报告中的 word/original/content 等字段）出现在哪个章节
+2. 建议中提到了哪个章节标题
+3. 与建议词项重合度最高且超过阈值的章节
+4. 以上都不满足的泛化建议（如「增加个人观点」）作用于所有待优化章节；
+   若没有任何章节被具体建议命中，则作用于全部章节
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+from tools.draft_sections import split_sections, extract_evidence, PREAMBLE_KEY
+from tools.materials_digest import extract_terms
+
+logger = logging.getLogger(__name__)
+
+# 词项重合度阈值（建议词项中出现在章节内的比例）
+MIN_TERM_OVERLAP = 0.35
+
+# 每个章节最多附带的建议数
+MAX_SUGGESTIONS_PER_SECTION = 8
+
+
+@dataclass
+class SectionEdit:
+    """一个待优化章节"""
+    key: str
+    title: str
+    text: str
+    suggestions: List[str] = field(default_factory=list)
+
+
+def _describe_finding(item: Dict[str, Any], evidence: List[str]) -> str:
+    """把评审报告中的结构化发现转换为一条建议"""
+    if item.get('original') and item.get('suggested'):
+        return f"将「{item['original']}」改为「{item['suggested']}」"
+
+    advice = item.get('suggestion') or item.get('indicator') or item.get('risk') or '修改该表述'
+    if item.get('risk') and item.get('suggestion'):
+        advice = f"{item['risk']}：{item['suggestion']}"
+    return advice if evidence[0] in advice else f"「{evidence[0]}」：{advice}"
+
+
+def collect_findings(
+    suggestions: List[str],
+    full_reviews: Optional[Dict[str, Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    汇总评审建议和评审报告中带原文证据的发现
+
+    Returns:
+        [{'suggestion': str, 'evidence': [str], 'specific': bool}]，
+        specific 为 True 表示来自评审报告的具体发现（找不到对应原文时丢弃）
+    """
+    findings = [
+        {'suggestion': s, 'evidence': extract_evidence(s), 'specific': False}
+        for s in suggestions or [] if isinstance(s, str) and s.strip()
+    ]
+
+    for review in (full_reviews or {}).values():
+        for value in (review or {}).values():
+            if not isinstance(value, list):
+                continue
+            for item in value:
+                if not isinstance(item, dict):
+                    continue
+                evidence = extract_evidence(item)
+                if evidence:
+                    findings.append({
+                        'suggestion': _describe_finding(item, evidence),
+                        'evidence': evidence,
+                        'specific': True
+                    })
+
+    return findings
+
+
+def _match_sections(finding: Dict[str, Any], sections: List[Dict[str, Any]], section_terms: List[set]) -> List[int]:
+    """找出建议涉及的章节下标"""
+    matched = [
+        i for i, section in enumerate(sections)
+        if any(fragment in section['text'] for fragment in finding['evidence'])
+    ]
+    if matched or finding['specific']:
+        return matched
+
+    text = finding['suggestion']
+    matched = [i for i, section in enumerate(sections) if section['title'] and section['title'] in text]
+    if matched:
+        return matched
+
+    terms = extract_terms(text)
+    if not terms:
+        return []
+    overlaps = [len(terms & st) / len(terms) for st in section_terms]
+    best = max(range(len(sections)), key=lambda i: overlaps[i])
+    return [best] if overlaps[best] >= MIN_TERM_OVERLAP else []
+
+
+def plan_section_edits(
+    content: str,
+    suggestions: List[str],
+    full_reviews: Optional[Dict[str, Dict[str, Any]]] = None
+) -> tuple:
+    """
+    规划章节级优化
+
+    Args:
+        content: 文章正文
+        suggestions: 评审建议
+        full_reviews: 各评审员的完整报告（可选，用于定位具体问题）
+
+    Returns:
+        (sections, edits)：sections 为 split_sections 的结果，edits 为按原顺序排列的 SectionEdit 列表
+    """
+    sections = split_sections(content)
+    if not sections:
+        return sections, []
+
+    section_terms = [extract_terms(s['text']) for s in sections]
+    assigned: Dict[int, List[str]] = {}
+    general: List[str] = []
+
+    for finding in collect_findings(suggestions, full_reviews):
+        matched = _match_sections(finding, sections, section_terms)
+        if matched:
+            for i in matched:
+                if finding['suggestion'] not in assigned.setdefault(i, []):
+                    assigned[i].append(finding['suggestion'])
+        elif not finding['specific'] and finding['suggestion'] not in general:
+            general.append(finding['suggestion'])
+
+    # 泛化建议：附加到已命中的章节；没有章节被命中时作用于全部章节
+    targets = sorted(assigned) if assigned else (list(range(len(sections))) if general else [])
+
+    edits = []
+    for i in targets:
+        section = sections[i]
+        edits.append(SectionEdit(
+            key=section['key'],
+            title=section['title'],
+            text=section['text'],
+            suggestions=(assigned.get(i, []) + general)[:MAX_SUGGESTIONS_PER_SECTION]
+        ))
+
+    logger.info(
+        f"🎯 章节优化规划: {len(edits)}/{len(sections)} 个章节待优化 "
+        f"({', '.join(e.key for e in edits) or '无'})，泛化建议 {len(general)} 条"
+    )
+    return sections, edits
+
+
+def section_body(text: str) -> str:
+    """去掉章节文本的标题行，返回正文"""
+    if text.startswith('## '):
+        return text.split('\n', 1)[1].strip() if '\n' in text else ''
+    return text
+
+
+def rebuild_section(edit: SectionEdit, body: str) -> str:
+    """用优化后的正文重建章节文本（保留原标题；去掉 LLM 可能重复输出的标题行）"""
+    body = (body or '').strip()
+    if edit.title and body.startswith('#'):
+        first, _, rest = body.partition('\n')
+        if edit.title in first:
+            body = rest.strip()
+    return f"## {edit.title}\n\n{body}" if edit.title else body
+
+
+def describe_key(key: str) -> str:
+    """章节键的展示名称"""
+    return "开头" if key == PREAMBLE_KEY else key
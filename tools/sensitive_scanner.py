@@ -0,0 +1,333 @@
+"""
+敏感违禁词本地扫描器
+基于 Aho-Corasick 自动机的多模式匹配，词库编译一次后以线性时间扫描全文
+
+- 词库：config/sensitive_lexicon.yaml（分类、风险等级、默认建议、白名单）
+- 扫描结果包含命中位置、分类、所在段落，可直接生成本地审查结果
+- 只把命中片段及其上下文交给 LLM 复核，无命中的草稿不调用 LLM
+"""
+
+import yaml
+import bisect
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEXICON_PATH = Path(__file__).parent.parent / "config" / "sensitive_lexicon.yaml"
+
+# 白名单词条使用的内部分类
+_ALLOW = "__allow__"
+
+
+def _fold(ch: str) -> str:
+    """单字符大小写折叠（保证折叠后长度不变，命中位置可直接对应原文）"""
+    lowered = ch.lower()
+    return lowered if len(lowered) == 1 else ch
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机"""
+
+    def __init__(self, patterns: List[str]):
+        """
+        编译自动机
+
+        Args:
+            patterns: 模式串列表（匹配结果以下标引用）
+        """
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            self._add(pattern, index)
+        self._build_fail_links()
+
+    def _add(self, pattern: str, index: int):
+        """向字典树中加入模式串"""
+        state = 0
+        for ch in pattern:
+            ch = _fold(ch)
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        if pattern:
+            self._out[state].append(index)
+
+    def _build_fail_links(self):
+        """按层序构建失败指针，并合并输出集合"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        扫描文本
+
+        Yields:
+            (start, end, pattern_index)，end 为开区间
+        """
+        state = 0
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        for pos, ch in enumerate(text):
+            ch = _fold(ch)
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                yield pos - len(self.patterns[index]) + 1, pos + 1, index
+
+
+@dataclass
+class ScanResult:
+    """扫描结果"""
+    hits: List[Dict[str, Any]] = field(default_factory=list)
+    text_length: int = 0
+
+    @property
+    def is_clean(self) -> bool:
+        """是否未命中任何敏感词"""
+        return not self.hits
+
+    def categories(self) -> Dict[str, int]:
+        """各分类命中次数"""
+        counts: Dict[str, int] = {}
+        for hit in self.hits:
+            counts[hit['category_name']] = counts.get(hit['category_name'], 0) + 1
+        return counts
+
+
+class SensitiveScanner:
+    """敏感违禁词扫描器"""
+
+    def __init__(self, lexicon_path: Optional[str] = None):
+        """
+        加载词库并编译自动机
+
+        Args:
+            lexicon_path: 词库 YAML 路径（默认 config/sensitive_lexicon.yaml）
+        """
+        self.lexicon_path = Path(lexicon_path) if lexicon_path else DEFAULT_LEXICON_PATH
+        self.categories: Dict[str, Dict[str, Any]] = {}
+        self._entries: List[Tuple[str, str]] = []   # (word, category_key)
+        self._load_lexicon()
+        self._automaton = AhoCorasick([word for word, _ in self._entries])
+
+    def _load_lexicon(self):
+        """加载词库"""
+        try:
+            with open(self.lexicon_path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f) or {}
+        except Exception as e:
+            logger.error(f"Failed to load sensitive lexicon: {str(e)}")
+            data = {}
+
+        seen = set()
+        for key, category in (data.get('categories') or {}).items():
+            self.categories[key] = {
+                'name': category.get('name', key),
+                'risk_level': category.get('risk_level', '中'),
+                'suggestion': category.get('suggestion', '')
+            }
+            for word in category.get('words') or []:
+                word = str(word).strip()
+                if word and (word, key) not in seen:
+                    seen.add((word, key))
+                    self._entries.append((word, key))
+
+        for word in data.get('allow') or []:
+            word = str(word).strip()
+            if word:
+                self._entries.append((word, _ALLOW))
+
+        logger.info(f"Loaded sensitive lexicon: {len(self._entries)} entries, {len(self.categories)} categories")
+
+    def scan(self, text: str) -> ScanResult:
+        """
+        扫描文本中的敏感违禁词
+
+        重叠命中按「最左、最长」保留；落在白名单短语内部的命中会被忽略。
+
+        Returns:
+            ScanResult
+        """
+        if not text:
+            return ScanResult(text_length=0)
+
+        raw = []
+        allowed = []
+        for start, end, index in self._automaton.iter_matches(text):
+            word, key = self._entries[index]
+            if key == _ALLOW:
+                allowed.append((start, end))
+            else:
+                raw.append((start, end, word, key))
+
+        raw.sort(key=lambda h: (h[0], -(h[1] - h[0])))
+
+        # 段落分隔位置（只在有命中时计算一次）
+        breaks = []
+        if raw:
+            pos = text.find('\n\n')
+            while pos != -1:
+                breaks.append(pos)
+                pos = text.find('\n\n', pos + 2)
+
+        hits = []
+        last_end = -1
+        for start, end, word, key in raw:
+            if start < last_end:
+                continue
+            if any(a_start <= start and end <= a_end for a_start, a_end in allowed):
+                continue
+            category = self.categories[key]
+            hits.append({
+                'word': text[start:end],
+                'category': key,
+                'category_name': category['name'],
+                'risk_level': category['risk_level'],
+                'suggestion': category['suggestion'],
+                'start': start,
+                'end': end,
+                'paragraph': bisect.bisect_right(breaks, start) + 1
+            })
+            last_end = end
+
+        return ScanResult(hits=hits, text_length=len(text))
+
+    def extract_spans(self, text: str, result: ScanResult, context_chars: int = 60) -> str:
+        """
+        提取命中片段及上下文（相邻窗口合并），命中词用【】标出
+
+        Args:
+            text: 原文
+            result: 扫描结果
+            context_chars: 命中词前后保留的字符数
+
+        Returns:
+            片段文本
+        """
+        windows = []
+        for hit in result.hits:
+            start = max(0, hit['start'] - context_chars)
+            end = min(len(text), hit['end'] + context_chars)
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end)
+                windows[-1][2].append(hit)
+            else:
+                windows.append([start, end, [hit]])
+
+        spans = []
+        for i, (start, end, hits) in enumerate(windows, 1):
+            snippet = ""
+            cursor = start
+            for hit in hits:
+                snippet += text[cursor:hit['start']] + f"【{text[hit['start']:hit['end']]}】"
+                cursor = hit['end']
+            snippet += text[cursor:end]
+            snippet = snippet.replace('\n', ' ')
+            prefix = "..." if start > 0 else ""
+            suffix = "..." if end < len(text) else ""
+            spans.append(f"{i}. （第{hits[0]['paragraph']}段）{prefix}{snippet}{suffix}")
+
+        return "\n".join(spans)
+
+    def to_sensitive_words(self, result: ScanResult) -> List[Dict[str, str]]:
+        """转换为审查报告中的 sensitive_words 格式（同词同段只保留一条）"""
+        words = []
+        seen = set()
+        for hit in result.hits:
+            key = (hit['word'], hit['paragraph'])
+            if key in seen:
+                continue
+            seen.add(key)
+            words.append({
+                'word': hit['word'],
+                'location': f"第{hit['paragraph']}段",
+                'risk_level': hit['risk_level'],
+                'suggestion': hit['suggestion']
+            })
+        return words
+
+    def build_local_review(self, result: ScanResult) -> Dict[str, Any]:
+        """
+        根据扫描结果生成本地审查结果（与 LLM 审查报告结构一致）
+
+        无命中时给出满分；有命中时按风险等级扣分（LLM 复核不可用时的兜底结果）
+        """
+        if result.is_clean:
+            return {
+                'scores': {
+                    'political_compliance': 10,
+                    'ad_compliance': 10,
+                    'content_health': 10,
+                    'expression_standard': 10
+                },
+                'overall_score': 10,
+                'strengths': ['本地词库扫描未发现敏感违禁词'],
+                'weaknesses': [],
+                'sensitive_words': [],
+                'risk_areas': [],
+                'recommendations': [],
+                'verdict': '本地词库扫描未发现敏感违禁词，内容合规',
+                'review_mode': 'local'
+            }
+
+        penalty = {'高': 2.0, '中': 1.0, '低': 0.5}
+        deduction = sum(penalty.get(hit['risk_level'], 1.0) for hit in result.hits)
+        overall = max(1.0, round(10 - deduction, 1))
+        categories = result.categories()
+
+        recommendations = []
+        for key, category in self.categories.items():
+            if category['name'] in categories and category['suggestion']:
+                recommendations.append(f"{category['name']}：{category['suggestion']}")
+
+        return {
+            'scores': {
+                'political_compliance': 10,
+                'ad_compliance': overall,
+                'content_health': overall,
+                'expression_standard': overall
+            },
+            'overall_score': overall,
+            'strengths': [],
+            'weaknesses': [f"{name} {count} 处" for name, count in categories.items()],
+            'sensitive_words': self.to_sensitive_words(result),
+            'risk_areas': list(categories.keys()),
+            'recommendations': recommendations,
+            'verdict': f"本地词库命中 {len(result.hits)} 处敏感违禁词，建议修改后发布",
+            'review_mode': 'local'
+        }
+
+
+# 全局扫描器实例（词库只编译一次）
+_scanner_instance = None
+
+
+def get_sensitive_scanner() -> SensitiveScanner:
+    """获取全局敏感词扫描器实例"""
+    global _scanner_instance
+    if _scanner_instance is None:
+        _scanner_instance = SensitiveScanner()
+    return _scanner_instance
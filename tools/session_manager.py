@@ -14,18 +14,96 @@
     → waiting_optimization (等待优化决定)
     → optimizing (优化中) [可选]
     → completed (完成)
+
+会话缓存：
+  进程内按会话ID缓存已解析的会话对象（LRU 淘汰），并维护用户ID → 活跃会话的索引；
+  写入时同步落库（write-through），通过 version 列做乐观并发控制。
+
+存储：
+  会话对象记录被修改的字段，更新时只写入脏字段；
+  章节内容和完整评审等大字段存放在附表中（按会话 + 章节/评审类型分行），首次访问时才加载；
+  附表中的长文本和归档快照按 tools/text_codec.py 压缩存储。
+
+分片：
+  多个协调器实例分片运行时，owner_shard 列记录会话所属分片（见 tools/shard_router.py）。
+
+过期：
+  过期时间同时以整数时间戳存放在 expires_at_epoch 列，查询直接比较该列以使用索引；
+  后台清理任务按批把过期会话归档到 creation_sessions_archive（未开始创作的空会话直接删除）。
 """
 
+import os
+import copy
 import json
+import time
+import asyncio
 import uuid
+import hashlib
 import sqlite3
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import logging
 
+from tools.text_codec import compress_text, decompress_text
+
 logger = logging.getLogger(__name__)
 
 
+# 会话缓存容量，可通过环境变量覆盖
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "256"))
+
+# 会话有效期（小时）
+SESSION_TTL_HOURS = 2
+
+# 过期清理每批处理的会话数
+SWEEP_BATCH_SIZE = 500
+
+# 过期清理间隔（秒），可通过环境变量覆盖
+SESSION_SWEEP_INTERVAL_SECONDS = int(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "300"))
+
+
+class SessionConflictError(Exception):
+    """会话并发写冲突（会话已被其他写入者更新）"""
+
+    def __init__(self, session_id: str, expected_version: int):
+        super().__init__(f"会话 {session_id} 已被更新（期望版本 {expected_version}）")
+        self.session_id = session_id
+        self.expected_version = expected_version
+
+
+# 主表中的普通字段
+SCALAR_FIELDS = (
+    'topic', 'state', 'selected_outline_id', 'draft_id', 'current_section_index',
+    'total_sections', 'writing_mode', 'optimization_count'
+)
+
+# 主表中以 JSON 存储的字段
+JSON_FIELDS = (
+    'material_ids', 'confirmed_material_ids', 'outline_ids', 'selected_outline',
+    'original_outline', 'review_scores', 'review_suggestions'
+)
+
+# 存放在附表中、按需加载的大字段：{字段: (表名, 键列)}
+BLOB_TABLES = {
+    'section_contents': ('session_section_contents', 'section_key'),
+    'full_reviews': ('session_reviews', 'review_type'),
+}
+
+# 读取主表时的列（不含大字段）
+_SESSION_COLUMNS = ', '.join(
+    ('id', 'user_id') + SCALAR_FIELDS + JSON_FIELDS + ('created_at', 'updated_at', 'expires_at', 'version')
+)
+
+
+def _to_epoch(value: Optional[str]) -> int:
+    """ISO 时间字符串转换为整数时间戳（无法解析时视为已过期）"""
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+
 # 状态常量
 class SessionState:
     """会话状态常量"""
@@ -66,9 +144,19 @@ class SessionState:
 
 
 class CreationSession:
-    """创作会话对象"""
+    """
+    创作会话对象
+
+    对字段赋值会被记录为脏字段，SessionManager.update_session 只写入脏字段；
+    原地修改列表/字典字段后需调用 mark_dirty 标记。
+    大字段（section_contents、full_reviews）在首次访问时通过 loader 从附表加载。
+    """
+
+    def __init__(self, data: dict, loader=None):
+        object.__setattr__(self, '_tracking', False)
+        object.__setattr__(self, '_dirty', set())
+        object.__setattr__(self, '_loader', loader)
 
-    def __init__(self, data: dict):
         self.id = data.get('id')
         self.user_id = data.get('user_id')
         self.topic = data.get('topic')
@@ -88,23 +176,64 @@ class CreationSession:
         self.draft_id = data.get('draft_id')
         self.current_section_index = data.get('current_section_index', 0)  # 当前写作章节
         self.total_sections = data.get('total_sections', 0)  # 总章节数
-        self.section_contents = data.get('section_contents', {})  # 各章节内容 {index: content}
         self.writing_mode = data.get('writing_mode', 'auto')  # 写作模式: auto/step_by_step
 
         # 评审相关
         self.review_scores = data.get('review_scores', {})  # {technical: 8, business: 7, ux: 9}
         self.review_suggestions = data.get('review_suggestions', [])  # 改进建议列表
         self.optimization_count = data.get('optimization_count', 0)  # 优化次数
-        # 完整评审数据（用于按需展示详细报告）
-        self.full_reviews = data.get('full_reviews', {})
+
+        # 大字段：各章节内容 {index: content}、完整评审数据（用于按需展示详细报告）
+        # 有 loader 且 data 中未提供时延迟加载
+        for field in BLOB_TABLES:
+            if field in data or loader is None:
+                setattr(self, field, data.get(field) or {})
 
         # 时间戳
         self.created_at = data.get('created_at')
         self.updated_at = data.get('updated_at')
         self.expires_at = data.get('expires_at')
 
+        # 乐观并发版本号（每次写入递增）
+        self.version = data.get('version') or 0
+
+        object.__setattr__(self, '_tracking', True)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if self._tracking and (name in SCALAR_FIELDS or name in JSON_FIELDS or name in BLOB_TABLES):
+            self._dirty.add(name)
+
+    def __getattr__(self, name):
+        # 只有常规属性查找失败时才会调用：用于延迟加载大字段
+        if name in BLOB_TABLES:
+            loader = self.__dict__.get('_loader')
+            value = loader(self.__dict__.get('id'), name) if loader else {}
+            object.__setattr__(self, name, value)
+            return value
+        raise AttributeError(name)
+
+    def mark_dirty(self, *fields: str):
+        """标记原地修改过的字段"""
+        self._dirty.update(fields)
+
+    @property
+    def dirty_fields(self) -> set:
+        """自上次保存以来修改过的字段"""
+        return set(self._dirty)
+
+    def copy(self) -> "CreationSession":
+        """复制会话对象（不触发大字段加载；列表/字典字段深拷贝，原地修改不会影响原对象）"""
+        clone = object.__new__(CreationSession)
+        clone.__dict__.update(self.__dict__)
+        for name in (*JSON_FIELDS, *BLOB_TABLES):
+            if name in clone.__dict__:
+                clone.__dict__[name] = copy.deepcopy(clone.__dict__[name])
+        object.__setattr__(clone, '_dirty', set())
+        return clone
+
     def to_dict(self) -> dict:
-        """转换为字典"""
+        """转换为字典（会加载大字段）"""
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -127,7 +256,8 @@ class CreationSession:
             'full_reviews': self.full_reviews,
             'created_at': self.created_at,
             'updated_at': self.updated_at,
-            'expires_at': self.expires_at
+            'expires_at': self.expires_at,
+            'version': self.version
         }
 
     def get_state_name(self) -> str:
@@ -149,14 +279,24 @@ class CreationSession:
 class SessionManager:
     """会话管理器"""
 
-    def __init__(self, db):
+    def __init__(self, db, cache_size: int = SESSION_CACHE_SIZE, owner_shard: Optional[int] = None):
         """
         初始化会话管理器
 
         Args:
             db: Database 实例
+            cache_size: 会话缓存容量
+            owner_shard: 本实例的分片编号（新建会话时记录归属）
         """
         self.db = db
+        self.cache_size = cache_size
+        self.owner_shard = owner_shard
+        # {session_id: CreationSession}，按最近访问排序
+        self._cache: "OrderedDict[str, CreationSession]" = OrderedDict()
+        # {user_id: session_id}，用户当前活跃会话
+        self._user_index: Dict[str, str] = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
         self._init_table()
         logger.info("✅ SessionManager 初始化完成")
 
@@ -214,9 +354,46 @@ class SessionManager:
             ON creation_sessions_v2(state)
         """)
 
+        # 迁移：整数过期时间戳（替代 datetime(expires_at) 比较，可以使用索引）
+        try:
+            cursor.execute("ALTER TABLE creation_sessions_v2 ADD COLUMN expires_at_epoch INTEGER")
+            logger.info("✅ 已添加 expires_at_epoch 列")
+        except sqlite3.OperationalError:
+            pass
+
+        cursor.execute("SELECT id, expires_at FROM creation_sessions_v2 WHERE expires_at_epoch IS NULL")
+        backfill = [(_to_epoch(row['expires_at']), row['id']) for row in cursor.fetchall()]
+        if backfill:
+            cursor.executemany("UPDATE creation_sessions_v2 SET expires_at_epoch = ? WHERE id = ?", backfill)
+            logger.info(f"✅ 已回填 {len(backfill)} 个会话的过期时间戳")
+
+        cursor.execute("DROP INDEX IF EXISTS idx_session_v2_expires")
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_session_v2_expires
-            ON creation_sessions_v2(expires_at)
+            CREATE INDEX IF NOT EXISTS idx_session_v2_expires_epoch
+            ON creation_sessions_v2(expires_at_epoch)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_session_v2_user_expires
+            ON creation_sessions_v2(user_id, expires_at_epoch, state)
+        """)
+
+        # 过期会话归档表（快照整个会话，含大字段）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS creation_sessions_archive (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                topic TEXT,
+                state TEXT,
+                draft_id TEXT,
+                created_at DATETIME,
+                updated_at DATETIME,
+                archived_at DATETIME,
+                data TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_session_archive_user
+            ON creation_sessions_archive(user_id, updated_at)
         """)
 
         # 迁移：为已存在的表添加 full_reviews 列（如果不存在）
@@ -227,6 +404,56 @@ class SessionManager:
             # 列已存在，忽略错误
             pass
 
+        # 迁移：乐观并发版本号
+        try:
+            cursor.execute("ALTER TABLE creation_sessions_v2 ADD COLUMN version INTEGER DEFAULT 0")
+            logger.info("✅ 已添加 version 列")
+        except sqlite3.OperationalError:
+            pass
+
+        # 迁移：会话所属分片
+        try:
+            cursor.execute("ALTER TABLE creation_sessions_v2 ADD COLUMN owner_shard INTEGER")
+            logger.info("✅ 已添加 owner_shard 列")
+        except sqlite3.OperationalError:
+            pass
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_session_v2_owner_shard
+            ON creation_sessions_v2(owner_shard, state)
+        """)
+
+        # 大字段附表：章节内容、完整评审（按会话 + 键分行存储）
+        for table, key_column in BLOB_TABLES.values():
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    session_id TEXT NOT NULL,
+                    {key_column} TEXT NOT NULL,
+                    value TEXT,
+                    value_hash TEXT,
+                    updated_at DATETIME,
+                    PRIMARY KEY (session_id, {key_column})
+                )
+            """)
+
+        # 迁移：把主表中的旧大字段搬到附表
+        cursor.execute("""
+            SELECT id, section_contents, full_reviews FROM creation_sessions_v2
+            WHERE section_contents IS NOT NULL OR full_reviews IS NOT NULL
+        """)
+        legacy_rows = cursor.fetchall()
+        for row in legacy_rows:
+            for field in BLOB_TABLES:
+                value = self._parse_json_field(row[field], {})
+                if value:
+                    self._write_blob(cursor, row['id'], field, value)
+            cursor.execute("""
+                UPDATE creation_sessions_v2 SET section_contents = NULL, full_reviews = NULL
+                WHERE id = ?
+            """, (row['id'],))
+        if legacy_rows:
+            logger.info(f"✅ 已迁移 {len(legacy_rows)} 个会话的大字段到附表")
+
         conn.commit()
         conn.close()
         logger.info("✅ 会话表 v2 初始化完成")
@@ -241,7 +468,7 @@ class SessionManager:
             return default if default is not None else []
 
     def _row_to_session(self, row) -> CreationSession:
-        """将数据库行转换为 CreationSession 对象"""
+        """将数据库行转换为 CreationSession 对象（大字段延迟加载）"""
         data = dict(row)
         # 解析 JSON 字段
         data['material_ids'] = self._parse_json_field(data.get('material_ids'), [])
@@ -249,11 +476,120 @@ class SessionManager:
         data['outline_ids'] = self._parse_json_field(data.get('outline_ids'), [])
         data['selected_outline'] = self._parse_json_field(data.get('selected_outline'), None)
         data['original_outline'] = self._parse_json_field(data.get('original_outline'), None)
-        data['section_contents'] = self._parse_json_field(data.get('section_contents'), {})
         data['review_scores'] = self._parse_json_field(data.get('review_scores'), {})
         data['review_suggestions'] = self._parse_json_field(data.get('review_suggestions'), [])
-        data['full_reviews'] = self._parse_json_field(data.get('full_reviews'), {})
-        return CreationSession(data)
+        return CreationSession(data, loader=self._load_blob)
+
+    # ========== 大字段附表 ==========
+
+    def _load_blob(self, session_id: str, field: str) -> Dict[str, Any]:
+        """从附表加载大字段（同时填充缓存中的会话）"""
+        table, key_column = BLOB_TABLES[field]
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {key_column} AS key, value FROM {table} WHERE session_id = ?",
+            (session_id,)
+        )
+        rows = cursor.fetchall()
+        conn.close()
+
+        value = {row['key']: self._parse_json_field(decompress_text(row['value']), None) for row in rows}
+
+        cached = self._cache.get(session_id)
+        if cached is not None and field not in cached.__dict__:
+            object.__setattr__(cached, field, copy.deepcopy(value))
+        return value
+
+    def _write_blob(self, cursor, session_id: str, field: str, value: Dict[str, Any]):
+        """
+        写入大字段：只写入内容有变化的行，删除已不存在的键
+
+        Args:
+            cursor: 数据库游标（与主表更新在同一事务中）
+            session_id: 会话ID
+            field: 字段名
+            value: 字段值 {key: value}
+        """
+        table, key_column = BLOB_TABLES[field]
+        cursor.execute(
+            f"SELECT {key_column} AS key, value_hash FROM {table} WHERE session_id = ?",
+            (session_id,)
+        )
+        existing = {row['key']: row['value_hash'] for row in cursor.fetchall()}
+
+        now = datetime.now().isoformat()
+        value = {str(k): v for k, v in (value or {}).items()}
+        for key, item in value.items():
+            serialized = json.dumps(item, ensure_ascii=False)
+            value_hash = hashlib.sha1(serialized.encode('utf-8')).hexdigest()[:16]
+            if existing.get(key) == value_hash:
+                continue
+            cursor.execute(f"""
+                INSERT OR REPLACE INTO {table} (session_id, {key_column}, value, value_hash, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (session_id, key, compress_text(serialized), value_hash, now))
+
+        removed = [key for key in existing if key not in value]
+        for key in removed:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE session_id = ? AND {key_column} = ?",
+                (session_id, key)
+            )
+
+    # ========== 会话缓存 ==========
+
+    def _clone(self, session: CreationSession) -> CreationSession:
+        """复制会话对象（调用方修改字段或原地修改嵌套字段都不会影响缓存）"""
+        return session.copy()
+
+    def _cache_put(self, session: CreationSession):
+        """写入缓存并维护用户索引（超出容量时淘汰最久未访问的会话）"""
+        self._cache[session.id] = self._clone(session)
+        self._cache.move_to_end(session.id)
+
+        if self._is_active(session):
+            self._user_index[session.user_id] = session.id
+        elif self._user_index.get(session.user_id) == session.id:
+            del self._user_index[session.user_id]
+
+        while len(self._cache) > self.cache_size:
+            evicted_id, evicted = self._cache.popitem(last=False)
+            if self._user_index.get(evicted.user_id) == evicted_id:
+                del self._user_index[evicted.user_id]
+
+    def _cache_get(self, session_id: str) -> Optional[CreationSession]:
+        """从缓存读取会话（返回副本）"""
+        session = self._cache.get(session_id)
+        if session is None:
+            self._cache_misses += 1
+            return None
+        self._cache.move_to_end(session_id)
+        self._cache_hits += 1
+        return self._clone(session)
+
+    def _cache_evict(self, session_id: str):
+        """移除缓存中的会话"""
+        session = self._cache.pop(session_id, None)
+        if session and self._user_index.get(session.user_id) == session_id:
+            del self._user_index[session.user_id]
+
+    def _is_active(self, session: CreationSession) -> bool:
+        """会话是否为活跃状态且未过期"""
+        if session.state in (SessionState.COMPLETED, SessionState.ERROR):
+            return False
+        return _to_epoch(session.expires_at) > time.time()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取会话缓存统计"""
+        total = self._cache_hits + self._cache_misses
+        return {
+            'size': len(self._cache),
+            'capacity': self.cache_size,
+            'hits': self._cache_hits,
+            'misses': self._cache_misses,
+            'hit_rate': self._cache_hits / total if total else 0.0
+        }
 
     async def get_or_create_session(self, user_id: str) -> CreationSession:
         """
@@ -266,6 +602,13 @@ class SessionManager:
         Returns:
             CreationSession 对象
         """
+        # 优先从缓存的用户索引查找活跃会话
+        session_id = self._user_index.get(user_id)
+        if session_id:
+            session = self._cache_get(session_id)
+            if session and self._is_active(session):
+                return session
+
         # 查找活跃会话
         conn = self.db._get_connection()
         cursor = conn.cursor()
@@ -274,109 +617,124 @@ class SessionManager:
         inactive_states = (SessionState.COMPLETED, SessionState.ERROR)
 
         cursor.execute(f"""
-            SELECT * FROM creation_sessions_v2
+            SELECT {_SESSION_COLUMNS} FROM creation_sessions_v2
             WHERE user_id = ?
+            AND expires_at_epoch > ?
             AND state NOT IN (?, ?)
-            AND datetime(expires_at) > datetime('now')
             ORDER BY updated_at DESC
             LIMIT 1
-        """, (user_id, *inactive_states))
+        """, (user_id, int(time.time()), *inactive_states))
 
         row = cursor.fetchone()
 
         if row:
             conn.close()
             session = self._row_to_session(row)
+            self._cache_put(session)
             logger.info(f"📦 找到活跃会话: {session.id}, 状态: {session.state}")
             return session
 
         # 创建新会话
         session_id = str(uuid.uuid4())
         now = datetime.now()
-        expires = now + timedelta(hours=2)
+        expires = now + timedelta(hours=SESSION_TTL_HOURS)
 
         cursor.execute("""
             INSERT INTO creation_sessions_v2 (
                 id, user_id, state, writing_mode, optimization_count,
                 current_section_index, total_sections,
-                created_at, updated_at, expires_at
-            ) VALUES (?, ?, 'idle', 'auto', 0, 0, 0, ?, ?, ?)
+                created_at, updated_at, expires_at, expires_at_epoch, version, owner_shard
+            ) VALUES (?, ?, 'idle', 'auto', 0, 0, 0, ?, ?, ?, ?, 0, ?)
         """, (session_id, user_id, now.isoformat(),
-              now.isoformat(), expires.isoformat()))
+              now.isoformat(), expires.isoformat(), int(expires.timestamp()), self.owner_shard))
 
         conn.commit()
         conn.close()
 
         logger.info(f"🆕 创建新会话: {session_id}")
 
-        return CreationSession({
+        session = CreationSession({
             'id': session_id,
             'user_id': user_id,
             'state': SessionState.IDLE,
             'writing_mode': 'auto',
             'created_at': now.isoformat(),
             'updated_at': now.isoformat(),
-            'expires_at': expires.isoformat()
+            'expires_at': expires.isoformat(),
+            'version': 0
         })
+        self._cache_put(session)
+        return session
     
     async def update_session(self, session: CreationSession):
         """
-        更新会话状态
+        更新会话状态（同步写入数据库和缓存）
+
+        只写入自上次保存以来修改过的字段；大字段写入附表中有变化的行。
+        按版本号做乐观并发控制：会话读取后如果已被其他写入者更新，抛出 SessionConflictError，
+        调用方应重新读取会话后再修改。
 
         Args:
             session: CreationSession 对象
+
+        Raises:
+            SessionConflictError: 版本号不匹配
         """
+        dirty = session.dirty_fields
+        if not dirty:
+            return
+
+        now = datetime.now().isoformat()
+        assignments = []
+        params = []
+        for field in SCALAR_FIELDS:
+            if field in dirty:
+                assignments.append(f"{field} = ?")
+                params.append(getattr(session, field))
+        for field in JSON_FIELDS:
+            if field in dirty:
+                value = getattr(session, field)
+                assignments.append(f"{field} = ?")
+                params.append(json.dumps(value) if value else None)
+
         conn = self.db._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("""
-            UPDATE creation_sessions_v2 SET
-                topic = ?,
-                state = ?,
-                material_ids = ?,
-                confirmed_material_ids = ?,
-                outline_ids = ?,
-                selected_outline_id = ?,
-                selected_outline = ?,
-                original_outline = ?,
-                draft_id = ?,
-                current_section_index = ?,
-                total_sections = ?,
-                section_contents = ?,
-                writing_mode = ?,
-                review_scores = ?,
-                review_suggestions = ?,
-                optimization_count = ?,
-                full_reviews = ?,
-                updated_at = ?
-            WHERE id = ?
-        """, (
-            session.topic,
-            session.state,
-            json.dumps(session.material_ids) if session.material_ids else None,
-            json.dumps(session.confirmed_material_ids) if session.confirmed_material_ids else None,
-            json.dumps(session.outline_ids) if session.outline_ids else None,
-            session.selected_outline_id,
-            json.dumps(session.selected_outline) if session.selected_outline else None,
-            json.dumps(session.original_outline) if session.original_outline else None,
-            session.draft_id,
-            session.current_section_index,
-            session.total_sections,
-            json.dumps(session.section_contents) if session.section_contents else None,
-            session.writing_mode,
-            json.dumps(session.review_scores) if session.review_scores else None,
-            json.dumps(session.review_suggestions) if session.review_suggestions else None,
-            session.optimization_count,
-            json.dumps(session.full_reviews) if session.full_reviews else None,
-            datetime.now().isoformat(),
-            session.id
-        ))
+        try:
+            cursor.execute(f"""
+                UPDATE creation_sessions_v2 SET
+                    {''.join(a + ', ' for a in assignments)}updated_at = ?,
+                    version = version + 1
+                WHERE id = ? AND COALESCE(version, 0) = ?
+            """, (*params, now, session.id, session.version))
+
+            if not cursor.rowcount:
+                logger.warning(f"⚠️  会话写冲突: {session.id} (version={session.version})")
+                raise SessionConflictError(session.id, session.version)
+
+            for field in BLOB_TABLES:
+                if field in dirty:
+                    self._write_blob(cursor, session.id, field, getattr(session, field))
+
+            conn.commit()
+        except Exception:
+            # 写入失败时缓存可能已与数据库不一致，下次从数据库重新读取
+            conn.rollback()
+            self._cache_evict(session.id)
+            raise
+        finally:
+            conn.close()
 
-        conn.commit()
-        conn.close()
+        session.version += 1
+        session.updated_at = now
+        session._dirty.clear()
+        self._cache_put(session)
+
+        logger.info(
+            f"💾 更新会话: {session.id}, 状态: {session.state}, 版本: {session.version}, "
+            f"字段: {', '.join(sorted(dirty))}"
+        )
 
-        logger.info(f"💾 更新会话: {session.id}, 状态: {session.state}")
-    
     async def get_session(self, session_id: str) -> Optional[CreationSession]:
         """
         根据ID获取会话
@@ -387,18 +745,75 @@ class SessionManager:
         Returns:
             CreationSession 对象或 None
         """
+        session = self._cache_get(session_id)
+        if session:
+            return session
+
         conn = self.db._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT * FROM creation_sessions_v2 WHERE id = ?", (session_id,))
+        cursor.execute(f"SELECT {_SESSION_COLUMNS} FROM creation_sessions_v2 WHERE id = ?", (session_id,))
         row = cursor.fetchone()
         conn.close()
 
         if row:
-            return self._row_to_session(row)
+            session = self._row_to_session(row)
+            self._cache_put(session)
+            return session
 
         return None
 
+    async def get_session_owner(self, session_id: str) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        查询会话所属用户和记录的所属分片（不加载、不缓存整个会话，用于分片路由）
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            (用户ID, owner_shard)，会话不存在时返回 None
+        """
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_id, owner_shard FROM creation_sessions_v2 WHERE id = ?", (session_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return (row['user_id'], row['owner_shard']) if row else None
+
+    async def claim_sessions(self, shard_id: int, owns_user) -> int:
+        """
+        认领属于本分片的活跃会话（实例启动或分片数调整后调用）
+
+        Args:
+            shard_id: 本实例分片编号
+            owns_user: 判断用户是否属于本分片的函数
+
+        Returns:
+            新认领的会话数
+        """
+        inactive_states = (SessionState.COMPLETED, SessionState.ERROR)
+
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, user_id FROM creation_sessions_v2
+            WHERE expires_at_epoch > ?
+            AND state NOT IN (?, ?)
+            AND (owner_shard IS NULL OR owner_shard != ?)
+        """, (int(time.time()), *inactive_states, shard_id))
+
+        claimed = [row['id'] for row in cursor.fetchall() if owns_user(row['user_id'])]
+        cursor.executemany(
+            "UPDATE creation_sessions_v2 SET owner_shard = ? WHERE id = ?",
+            [(shard_id, session_id) for session_id in claimed]
+        )
+        conn.commit()
+        conn.close()
+
+        if claimed:
+            logger.info(f"🧭 分片 {shard_id} 认领了 {len(claimed)} 个活跃会话")
+        return len(claimed)
+
     async def reset_session(self, session: CreationSession):
         """
         重置会话到初始状态（保留用户ID和会话ID）
@@ -426,22 +841,100 @@ class SessionManager:
         await self.update_session(session)
         logger.info(f"🔄 会话已重置: {session.id}")
 
-    async def cleanup_expired_sessions(self):
-        """清理过期会话"""
-        conn = self.db._get_connection()
-        cursor = conn.cursor()
+    def _archive_batch(self, cursor, rows) -> int:
+        """
+        归档一批过期会话（快照主表字段和大字段）
 
-        cursor.execute("""
-            DELETE FROM creation_sessions_v2
-            WHERE datetime(expires_at) < datetime('now')
-        """)
+        未开始创作（没有主题）的空会话不归档
 
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        Returns:
+            归档的会话数
+        """
+        rows = [row for row in rows if row['topic']]
+        if not rows:
+            return 0
+
+        ids = [row['id'] for row in rows]
+        placeholders = ','.join('?' for _ in ids)
+        snapshots = {row['id']: dict(row) for row in rows}
+        for field, (table, key_column) in BLOB_TABLES.items():
+            for snapshot in snapshots.values():
+                snapshot[field] = {}
+            cursor.execute(
+                f"SELECT session_id, {key_column} AS key, value FROM {table} WHERE session_id IN ({placeholders})",
+                ids
+            )
+            for blob in cursor.fetchall():
+                snapshots[blob['session_id']][field][blob['key']] = self._parse_json_field(
+                    decompress_text(blob['value']), None
+                )
+
+        now = datetime.now().isoformat()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO creation_sessions_archive
+            (id, user_id, topic, state, draft_id, created_at, updated_at, archived_at, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (snap['id'], snap['user_id'], snap['topic'], snap['state'], snap['draft_id'],
+             snap['created_at'], snap['updated_at'], now, compress_text(json.dumps(snap, ensure_ascii=False)))
+            for snap in snapshots.values()
+        ])
+        return len(rows)
+
+    async def cleanup_expired_sessions(self, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+        """
+        清理过期会话：按批归档并删除（每批一个事务，批次之间让出事件循环）
+
+        Args:
+            batch_size: 每批处理的会话数
+
+        Returns:
+            删除的会话数
+        """
+        now_epoch = int(time.time())
+        deleted_count = 0
+        archived_count = 0
+
+        while True:
+            conn = self.db._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(f"""
+                SELECT {_SESSION_COLUMNS} FROM creation_sessions_v2
+                WHERE expires_at_epoch <= ?
+                LIMIT ?
+            """, (now_epoch, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                conn.close()
+                break
+
+            archived_count += self._archive_batch(cursor, rows)
+
+            ids = [row['id'] for row in rows]
+            placeholders = ','.join('?' for _ in ids)
+            for table, _ in BLOB_TABLES.values():
+                cursor.execute(f"DELETE FROM {table} WHERE session_id IN ({placeholders})", ids)
+            cursor.execute(f"DELETE FROM creation_sessions_v2 WHERE id IN ({placeholders})", ids)
+            deleted_count += cursor.rowcount
+
+            conn.commit()
+            conn.close()
+
+            for session_id in ids:
+                self._cache_evict(session_id)
+
+            if len(rows) < batch_size:
+                break
+            await asyncio.sleep(0)
+
+        # 同步清理缓存中的过期会话
+        for session_id, session in list(self._cache.items()):
+            if _to_epoch(session.expires_at) <= now_epoch:
+                self._cache_evict(session_id)
 
         if deleted_count > 0:
-            logger.info(f"🗑️  清理了 {deleted_count} 个过期会话")
+            logger.info(f"🗑️  清理了 {deleted_count} 个过期会话（归档 {archived_count} 个）")
 
         return deleted_count
 
@@ -464,11 +957,11 @@ class SessionManager:
         )
 
         cursor.execute(f"""
-            SELECT * FROM creation_sessions_v2
+            SELECT {_SESSION_COLUMNS} FROM creation_sessions_v2
             WHERE state IN ({','.join(['?' for _ in pending_states])})
-            AND datetime(expires_at) > datetime('now')
+            AND expires_at_epoch > ?
             ORDER BY updated_at DESC
-        """, pending_states)
+        """, (*pending_states, int(time.time())))
 
         rows = cursor.fetchall()
         conn.close()
@@ -478,7 +971,7 @@ class SessionManager:
 
     async def get_user_history(self, user_id: str, limit: int = 10) -> List[CreationSession]:
         """
-        获取用户的历史会话
+        获取用户的历史会话（不足时从归档表补充）
 
         Args:
             user_id: 用户ID
@@ -490,14 +983,26 @@ class SessionManager:
         conn = self.db._get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT * FROM creation_sessions_v2
+        cursor.execute(f"""
+            SELECT {_SESSION_COLUMNS} FROM creation_sessions_v2
             WHERE user_id = ?
             ORDER BY updated_at DESC
             LIMIT ?
         """, (user_id, limit))
 
-        rows = cursor.fetchall()
-        conn.close()
+        sessions = [self._row_to_session(row) for row in cursor.fetchall()]
 
-        return [self._row_to_session(row) for row in rows]
\ No newline at end of file
+        if len(sessions) < limit:
+            cursor.execute("""
+                SELECT data FROM creation_sessions_archive
+                WHERE user_id = ?
+                ORDER BY updated_at DESC
+                LIMIT ?
+            """, (user_id, limit - len(sessions)))
+            for row in cursor.fetchall():
+                snapshot = self._parse_json_field(decompress_text(row['data']), None)
+                if snapshot:
+                    sessions.append(self._row_to_session(snapshot))
+
+        conn.close()
+        return sessions
\ No newline at end of file
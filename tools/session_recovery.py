@@ -0,0 +1,215 @@
+"""
+会话崩溃恢复
+协调器重启后根据持久化的进度，为卡在处理中状态的会话规划需要补发的工作
+
+- generating_outlines：重新请求大纲生成
+- writing：草稿已保存时直接进入评审；否则从第一个未完成的章节继续写作（已完成章节随请求下发）
+- reviewing：合并审查轮次由协调器自己调用 LLM，重启后重新执行未完成部分；
+  其他等待中的轮次只向截止时间已过、尚未返回的评审员补发请求；
+  轮次已结束但未汇总时直接汇总；当前草稿还没有评审轮次时重新开始评审
+- optimizing：草稿已在上一轮评审后更新时直接增量复审；否则重新请求优化
+
+重启前刚更新过的会话可能仍在由其他 Agent 处理，等待 RECOVERY_STALE_SECONDS 后仍无进展才恢复
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from tools.session_manager import SessionState, CreationSession
+from tools.draft_sections import diff_sections
+from tools.review_orchestrator import REVIEW_TYPE_NAMES, RoundMode
+
+logger = logging.getLogger(__name__)
+
+# 会话无进展多久（秒）后视为中断，可通过环境变量覆盖
+RECOVERY_STALE_SECONDS = int(os.getenv("RECOVERY_STALE_SECONDS", "300"))
+
+
+class RecoveryAction:
+    """恢复动作常量"""
+    REQUEST_OUTLINES = 'request_outlines'          # 重新请求大纲生成
+    RESUME_WRITING = 'resume_writing'              # 从未完成章节继续写作
+    REVIEW_DRAFT = 'review_draft'                  # 草稿已完成，开始评审
+    REDISPATCH_REVIEWS = 'redispatch_reviews'      # 向未返回的评审员补发请求
+    WATCH_REVIEWS = 'watch_reviews'                # 评审员仍在截止时间内，继续等待
+    RERUN_COMBINED_REVIEW = 'rerun_combined_review'  # 合并审查随重启丢失，重新执行
+    SEND_REVIEW_SUMMARY = 'send_review_summary'    # 轮次已结束，补发汇总
+    RESUME_OPTIMIZATION = 'resume_optimization'    # 重新请求优化
+    REVIEW_OPTIMIZED = 'review_optimized'          # 优化已完成，增量复审
+
+
+@dataclass
+class RecoveryPlan:
+    """单个会话的恢复计划"""
+    session_id: str
+    state: str
+    action: str
+    reason: str
+    draft_id: Optional[str] = None
+    round_id: Optional[str] = None
+    review_types: List[str] = field(default_factory=list)
+    completed_sections: Dict[str, str] = field(default_factory=dict)
+    # 需要等待到该时间（时间戳）仍无进展才执行
+    not_before: float = 0.0
+
+
+def _to_timestamp(value: Optional[str]) -> float:
+    """ISO 时间字符串转换为时间戳（无法解析时返回 0）"""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class SessionRecovery:
+    """会话恢复规划器"""
+
+    def __init__(self, db, session_manager, review_orchestrator, stale_seconds: int = RECOVERY_STALE_SECONDS):
+        """
+        初始化
+
+        Args:
+            db: Database 实例
+            session_manager: SessionManager 实例
+            review_orchestrator: ReviewOrchestrator 实例
+            stale_seconds: 会话无进展多久后视为中断
+        """
+        self.db = db
+        self.session_manager = session_manager
+        self.review_orchestrator = review_orchestrator
+        self.stale_seconds = stale_seconds
+
+    async def plan_all(self, owns_session=None) -> List[RecoveryPlan]:
+        """
+        为所有处理中的会话生成恢复计划
+
+        Args:
+            owns_session: 可选的异步函数 (session_id) -> bool，分片运行时只恢复本分片的会话
+
+        Returns:
+            恢复计划列表
+        """
+        plans = []
+        for session in await self.session_manager.get_pending_sessions():
+            if owns_session and not await owns_session(session.id):
+                continue
+            try:
+                plan = self.plan(session)
+            except Exception as e:
+                logger.error(f"❌ 规划会话恢复失败: {session.id}: {e}", exc_info=True)
+                continue
+            if plan:
+                plans.append(plan)
+
+        if plans:
+            summary: Dict[str, int] = {}
+            for plan in plans:
+                summary[plan.action] = summary.get(plan.action, 0) + 1
+            logger.info(f"🩹 待恢复会话 {len(plans)} 个: {summary}")
+        return plans
+
+    def plan(self, session: CreationSession, now: Optional[float] = None) -> Optional[RecoveryPlan]:
+        """
+        根据持久化进度规划单个会话的恢复
+
+        Returns:
+            RecoveryPlan；会话不需要恢复时返回 None
+        """
+        now = now or time.time()
+        not_before = _to_timestamp(session.updated_at) + self.stale_seconds
+
+        def make(action: str, reason: str, **kwargs) -> RecoveryPlan:
+            kwargs.setdefault('not_before', not_before)
+            return RecoveryPlan(session_id=session.id, state=session.state, action=action, reason=reason, **kwargs)
+
+        if session.state == SessionState.GENERATING_OUTLINES:
+            return make(RecoveryAction.REQUEST_OUTLINES, "大纲尚未生成")
+
+        if session.state == SessionState.WRITING:
+            draft = self.db.get_latest_draft_by_outline(session.selected_outline_id) \
+                if session.selected_outline_id else None
+            if draft and _to_timestamp(draft.get('created_at')) >= _to_timestamp(session.created_at):
+                return make(RecoveryAction.REVIEW_DRAFT, "草稿已保存但未进入评审", draft_id=draft['id'])
+            completed = {str(k): v for k, v in (session.section_contents or {}).items() if v}
+            return make(
+                RecoveryAction.RESUME_WRITING,
+                f"已完成 {len(completed)}/{session.total_sections or '?'} 个章节",
+                completed_sections=completed
+            )
+
+        if session.state == SessionState.REVIEWING:
+            return self._plan_reviewing(session, now, make)
+
+        if session.state == SessionState.OPTIMIZING:
+            last = self.review_orchestrator.get_last_round(session.id)
+            draft = self.db.get_draft(session.draft_id) if session.draft_id else None
+            if draft and last and last.get('section_hashes') \
+                    and (draft.get('section_hashes') or {}) != last['section_hashes']:
+                return make(RecoveryAction.REVIEW_OPTIMIZED, "草稿已优化但未复审", draft_id=draft['id'])
+            return make(RecoveryAction.RESUME_OPTIMIZATION, "优化尚未完成", draft_id=session.draft_id)
+
+        return None
+
+    def _plan_reviewing(self, session: CreationSession, now: float, make) -> Optional[RecoveryPlan]:
+        """规划评审中会话的恢复"""
+        active = self.review_orchestrator.get_active_round(session.id)
+        if active:
+            outstanding = self.review_orchestrator.outstanding(active)
+            # 合并审查在协调器进程内执行，重启后没有任何评审员会返回结果
+            if active['mode'] == RoundMode.COMBINED and outstanding:
+                return make(
+                    RecoveryAction.RERUN_COMBINED_REVIEW,
+                    f"重新执行合并审查：{'、'.join(REVIEW_TYPE_NAMES.get(t, t) for t in outstanding)}",
+                    draft_id=active['draft_id'], round_id=active['id'], review_types=outstanding, not_before=0.0
+                )
+            # 停机期间截止时间已过的评审员，其结果事件可能已经丢失
+            expired = [t for t in outstanding if active['deadlines'][t] <= now]
+            if expired:
+                return make(
+                    RecoveryAction.REDISPATCH_REVIEWS,
+                    f"重新请求未返回的评审：{'、'.join(REVIEW_TYPE_NAMES.get(t, t) for t in expired)}",
+                    draft_id=active['draft_id'], round_id=active['id'], review_types=expired, not_before=0.0
+                )
+            return make(
+                RecoveryAction.WATCH_REVIEWS, "评审员仍在截止时间内",
+                draft_id=active['draft_id'], round_id=active['id'], not_before=0.0
+            )
+
+        last = self.review_orchestrator.get_last_round(session.id)
+        if last and last['draft_id'] == session.draft_id and last['completed_at'] \
+                and last['completed_at'] >= _to_timestamp(session.updated_at):
+            return make(
+                RecoveryAction.SEND_REVIEW_SUMMARY, "评审轮次已结束但未汇总",
+                draft_id=last['draft_id'], round_id=last['id'], not_before=0.0
+            )
+
+        if session.draft_id:
+            return make(RecoveryAction.REVIEW_DRAFT, "当前草稿没有评审轮次", draft_id=session.draft_id)
+        return None
+
+    def review_draft_for(self, round_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        重建评审轮次下发给评审员的草稿（增量轮次只包含修改过的章节）
+
+        Returns:
+            {'title', 'content', 'word_count'}；草稿不存在时返回 None
+        """
+        draft = self.db.get_draft(round_data['draft_id']) if round_data.get('draft_id') else None
+        if not draft:
+            return None
+
+        base = self.review_orchestrator.get_round(round_data['base_round_id']) \
+            if round_data.get('base_round_id') else None
+        if not base or not base.get('section_hashes'):
+            return draft
+
+        changed_text = diff_sections(base['section_hashes'], draft.get('content', ''))['changed_text']
+        return {
+            'title': draft.get('title', ''),
+            'content': changed_text,
+            'word_count': len(changed_text.replace(' ', '').replace('\n', ''))
+        }
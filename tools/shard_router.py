@@ -0,0 +1,250 @@
+"""
+创作协调器分片路由
+多个协调器实例按 user_id 一致性哈希划分用户，每个实例只处理自己负责的用户和会话
+
+- 分片配置：COORDINATOR_SHARD_ID（本实例编号，从 0 开始）、COORDINATOR_SHARD_COUNT（实例总数）
+- 事件在网络中广播，各实例按会话所属用户判断是否由自己处理
+- 会话表的 owner_shard 列记录会话归属，会话事件按记录的归属处理；
+  实例重启或分片数调整后启动时重新认领属于自己的活跃会话
+- coordinator_shards 表记录各实例心跳；心跳超过 SHARD_STALE_SECONDS 未更新的分片视为下线，
+  它的用户由哈希环上顺时针的下一个在线分片接管（接管方认领会话并执行崩溃恢复），
+  下线分片恢复心跳后重新认领
+"""
+
+import os
+import bisect
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 分片配置，可通过环境变量覆盖
+COORDINATOR_SHARD_ID = int(os.getenv("COORDINATOR_SHARD_ID", "0"))
+COORDINATOR_SHARD_COUNT = int(os.getenv("COORDINATOR_SHARD_COUNT", "1"))
+
+# 每个分片在哈希环上的虚拟节点数（越多分布越均匀）
+VIRTUAL_NODES = 64
+
+# 心跳间隔（秒）
+SHARD_HEARTBEAT_SECONDS = 30
+
+# 心跳超过该时间（秒）未更新的分片视为下线
+SHARD_STALE_SECONDS = int(os.getenv("SHARD_STALE_SECONDS", str(SHARD_HEARTBEAT_SECONDS * 3)))
+
+# 会话归属缓存容量
+SESSION_OWNERSHIP_CACHE_SIZE = 4096
+
+
+def _hash(key: str) -> int:
+    """哈希到 64 位整数"""
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class ShardRouter:
+    """一致性哈希分片路由"""
+
+    def __init__(
+        self,
+        shard_id: int = COORDINATOR_SHARD_ID,
+        shard_count: int = COORDINATOR_SHARD_COUNT,
+        virtual_nodes: int = VIRTUAL_NODES
+    ):
+        """
+        初始化哈希环
+
+        Args:
+            shard_id: 本实例分片编号
+            shard_count: 分片总数
+            virtual_nodes: 每个分片的虚拟节点数
+        """
+        if shard_count < 1 or not 0 <= shard_id < shard_count:
+            raise ValueError(f"无效的分片配置: shard_id={shard_id}, shard_count={shard_count}")
+
+        self.shard_id = shard_id
+        self.shard_count = shard_count
+
+        ring = sorted(
+            (_hash(f"shard-{shard}#{node}"), shard)
+            for shard in range(shard_count)
+            for node in range(virtual_nodes)
+        )
+        self._ring_keys = [key for key, _ in ring]
+        self._ring_shards = [shard for _, shard in ring]
+        # 在线分片（未登记过的分片视为在线，只有心跳过期的分片才被接管）
+        self._live_shards: Set[int] = set(range(shard_count))
+        # {session_id: 是否属于本分片}（LRU，在线分片变化时清空）
+        self._session_owned: "OrderedDict[str, bool]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用了分片（多于一个实例）"""
+        return self.shard_count > 1
+
+    def agent_id(self, base_id: str) -> str:
+        """分片模式下的实例 Agent ID（单实例时保持原 ID）"""
+        return f"{base_id}-{self.shard_id}" if self.enabled else base_id
+
+    def owner_of(self, user_id: str) -> int:
+        """计算用户所属分片（哈希环上顺时针第一个在线分片）"""
+        if not self.enabled:
+            return 0
+        size = len(self._ring_keys)
+        index = bisect.bisect(self._ring_keys, _hash(user_id or ''))
+        for offset in range(size):
+            shard = self._ring_shards[(index + offset) % size]
+            if shard in self._live_shards:
+                return shard
+        return self.shard_id
+
+    def owns_user(self, user_id: str) -> bool:
+        """用户是否由本分片负责"""
+        return self.owner_of(user_id) == self.shard_id
+
+    async def owns_session(self, session_id: str, session_manager) -> bool:
+        """
+        会话是否由本分片负责
+
+        Args:
+            session_id: 会话ID
+            session_manager: SessionManager 实例（用于查询会话所属用户）
+
+        Returns:
+            是否由本分片处理；会话不存在时返回 False
+        """
+        if not self.enabled:
+            return True
+
+        owned = self._session_owned.get(session_id)
+        if owned is not None:
+            self._session_owned.move_to_end(session_id)
+            return owned
+
+        owner = await session_manager.get_session_owner(session_id)
+        if owner is None:
+            return False
+        user_id, owner_shard = owner
+        # 记录的归属分片在线时以记录为准，否则按哈希环接管
+        if owner_shard is not None and owner_shard in self._live_shards:
+            owned = owner_shard == self.shard_id
+        else:
+            owned = self.owns_user(user_id)
+
+        self._session_owned[session_id] = owned
+        while len(self._session_owned) > SESSION_OWNERSHIP_CACHE_SIZE:
+            self._session_owned.popitem(last=False)
+        return owned
+
+    # ==================== 分片注册 ====================
+
+    def _init_table(self, db):
+        """初始化分片注册表"""
+        conn = db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS coordinator_shards (
+                shard_id INTEGER PRIMARY KEY,
+                shard_count INTEGER NOT NULL,
+                agent_id TEXT,
+                started_at DATETIME,
+                heartbeat_at DATETIME
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def register(self, db, agent_id: str):
+        """
+        登记本实例（启动时调用）
+
+        Args:
+            db: Database 实例
+            agent_id: 本实例 Agent ID
+        """
+        self._init_table(db)
+        now = datetime.now().isoformat()
+
+        conn = db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO coordinator_shards
+            (shard_id, shard_count, agent_id, started_at, heartbeat_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (self.shard_id, self.shard_count, agent_id, now, now))
+
+        # 分片数缩小后，编号超出范围的旧实例记录不再有效
+        cursor.execute("DELETE FROM coordinator_shards WHERE shard_id >= ?", (self.shard_count,))
+
+        conn.commit()
+        conn.close()
+        logger.info(f"🧭 协调器分片已登记: {self.shard_id}/{self.shard_count} ({agent_id})")
+        self.refresh_live_shards(db)
+
+    def heartbeat(self, db) -> bool:
+        """
+        更新本实例心跳时间并刷新在线分片
+
+        Returns:
+            在线分片是否变化（变化后调用方应重新认领会话）
+        """
+        conn = db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE coordinator_shards SET heartbeat_at = ? WHERE shard_id = ?",
+            (datetime.now().isoformat(), self.shard_id)
+        )
+        conn.commit()
+        conn.close()
+        return self.refresh_live_shards(db)
+
+    def refresh_live_shards(self, db) -> bool:
+        """
+        按心跳时间刷新在线分片（心跳过期的分片视为下线）
+
+        Returns:
+            在线分片是否变化
+        """
+        cutoff = (datetime.now() - timedelta(seconds=SHARD_STALE_SECONDS)).isoformat()
+        conn = db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT shard_id FROM coordinator_shards WHERE heartbeat_at < ? AND shard_id != ?",
+            (cutoff, self.shard_id)
+        )
+        stale = {row['shard_id'] for row in cursor.fetchall()}
+        conn.close()
+
+        live = set(range(self.shard_count)) - stale
+        if live == self._live_shards:
+            return False
+
+        down = sorted(self._live_shards - live)
+        up = sorted(live - self._live_shards)
+        self._live_shards = live
+        self._session_owned.clear()
+        logger.warning(f"🧭 在线分片变化: 下线 {down}，恢复 {up}，当前在线 {sorted(live)}")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取路由统计"""
+        return {
+            'shard_id': self.shard_id,
+            'shard_count': self.shard_count,
+            'live_shards': sorted(self._live_shards),
+            'known_sessions': len(self._session_owned),
+            'owned_sessions': sum(1 for owned in self._session_owned.values() if owned)
+        }
+
+
+# 全局路由实例
+_router_instance: Optional[ShardRouter] = None
+
+
+def get_shard_router() -> ShardRouter:
+    """获取全局分片路由实例（按环境变量配置）"""
+    global _router_instance
+    if _router_instance is None:
+        _router_instance = ShardRouter()
+    return _router_instance
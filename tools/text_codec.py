@@ -0,0 +1,142 @@
+"""
+长文本压缩存储
+content_items.raw_content / summary_detailed、drafts.content、会话附表和归档表中的长文本按 zlib 压缩为 BLOB 存储
+
+- 超过阈值的文本压缩后加魔数前缀存为 BLOB；短文本或压缩收益不足时仍存原文本
+- 读取时按类型识别：TEXT 原样返回，压缩 BLOB 解压，旧数据无需迁移即可读取
+- compact_text_columns 把已有的未压缩长文本批量改写为压缩格式（之后 VACUUM 回收空间）
+- register_text_functions 在连接上注册 SQL 函数 kf_text()，SQL 中需要原文时（如 SUBSTR 预览）使用
+"""
+
+import zlib
+import sqlite3
+import logging
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# 超过该字节数的文本才压缩
+COMPRESS_MIN_BYTES = 512
+
+# zlib 压缩级别（写入频率低，取压缩率和速度的折中）
+COMPRESS_LEVEL = 6
+
+# 压缩数据前缀（区分压缩数据和其他 BLOB）
+_MAGIC = b'KFZ1'
+
+# 压缩存储的列：{表名: (主键列, (列, ...))}
+COMPRESSED_COLUMNS = {
+    'content_items': ('id', ('raw_content', 'summary_detailed')),
+    'drafts': ('id', ('content',)),
+    'session_section_contents': ('rowid', ('value',)),
+    'session_reviews': ('rowid', ('value',)),
+    'creation_sessions_archive': ('id', ('data',)),
+}
+
+# 压缩改写每批行数
+COMPACT_BATCH_SIZE = 200
+
+
+def compress_text(text: Optional[str]) -> Union[str, bytes, None]:
+    """
+    压缩长文本
+
+    Args:
+        text: 原文本
+
+    Returns:
+        压缩后的 BLOB；文本较短或压缩收益不足时返回原文本
+    """
+    if not isinstance(text, str):
+        return text
+    data = text.encode('utf-8')
+    if len(data) < COMPRESS_MIN_BYTES:
+        return text
+    compressed = _MAGIC + zlib.compress(data, COMPRESS_LEVEL)
+    # 节省不到 10% 时不值得解压开销
+    if len(compressed) > len(data) * 0.9:
+        return text
+    return compressed
+
+
+def decompress_text(value: Any) -> Any:
+    """
+    读取可能被压缩的文本
+
+    Args:
+        value: 数据库中的值（TEXT、压缩 BLOB 或 None）
+
+    Returns:
+        原文本（非压缩数据原样返回）
+    """
+    if isinstance(value, (bytes, memoryview)):
+        value = bytes(value)
+        if value.startswith(_MAGIC):
+            return zlib.decompress(value[len(_MAGIC):]).decode('utf-8')
+    return value
+
+
+def register_text_functions(conn: sqlite3.Connection):
+    """在连接上注册 SQL 函数 kf_text(x)：返回解压后的文本"""
+    conn.create_function('kf_text', 1, decompress_text, deterministic=True)
+
+
+def compact_text_columns(conn: sqlite3.Connection, batch_size: int = COMPACT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    把未压缩的长文本改写为压缩格式（可重复执行；调用方负责 VACUUM）
+
+    Args:
+        conn: 数据库连接
+        batch_size: 每批改写的行数（每批一个事务）
+
+    Returns:
+        {'rows': 改写的行数, 'bytes_before': 改写前字节数, 'bytes_after': 改写后字节数}
+    """
+    result = {'rows': 0, 'bytes_before': 0, 'bytes_after': 0}
+    cursor = conn.cursor()
+
+    for table, (key_column, columns) in COMPRESSED_COLUMNS.items():
+        for column in columns:
+            last_key = None
+            while True:
+                # 按主键分批扫描，已压缩（BLOB）的行不会再被选中
+                query = (
+                    f"SELECT {key_column} AS key, {column} AS value FROM {table} "
+                    f"WHERE typeof({column}) = 'text' AND length(CAST({column} AS BLOB)) >= ?"
+                )
+                params: list = [COMPRESS_MIN_BYTES]
+                if last_key is not None:
+                    query += f" AND {key_column} > ?"
+                    params.append(last_key)
+                query += f" ORDER BY {key_column} LIMIT ?"
+                params.append(batch_size)
+                try:
+                    cursor.execute(query, params)
+                except sqlite3.OperationalError:
+                    # 表或列尚未创建
+                    break
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_key = rows[-1][0]
+
+                for key, value in rows:
+                    compressed = compress_text(value)
+                    if not isinstance(compressed, bytes):
+                        continue
+                    # 只改写仍为读取时原文的行，扫描后被并发更新的值不会被旧内容覆盖
+                    cursor.execute(
+                        f"UPDATE {table} SET {column} = ? WHERE {key_column} = ? AND {column} = ?",
+                        (compressed, key, value)
+                    )
+                    if cursor.rowcount:
+                        result['rows'] += 1
+                        result['bytes_before'] += len(value.encode('utf-8'))
+                        result['bytes_after'] += len(compressed)
+                conn.commit()
+
+    logger.info(
+        f"Compacted {result['rows']} text values: "
+        f"{result['bytes_before']} -> {result['bytes_after']} bytes"
+    )
+    return result
@@ -0,0 +1,449 @@
+"""
+Wiki 发布服务
+TaggerAgent（打标签后实时发布）和 ContentSyncTool（批量补同步）共用的内容页面渲染与发布
+
+- 同一套预编译模板渲染页面，相同内容总是得到相同结果；页面路径包含内容ID的短哈希，同名内容不会冲突
+- Wiki Mod 只允许页面创建者直接更新，各发布方以自己的身份发送（网络按来源 ID 校验密钥）；
+  更新其他发布方创建的页面时改为提交修改提议（wiki.page.proposal.create），由页面创建者审核
+- 页面内容哈希与 content_items.wiki_content_hash 相同时不发送；首次发布创建页面，之后在原路径更新
+- 按 upsert 发送：创建被拒绝（页面已存在）时改为更新，原路径页面不存在时在当前路径创建
+- 发布状态写回 content_items（wiki_synced_at / wiki_content_hash / wiki_page_path），
+  两条路径据此互相去重：打标签时已发布的内容不会再被批量同步重发
+- 发布失败记录失败次数和尝试时间（wiki_sync_failures / wiki_attempted_at），
+  批量同步把失败条目排在最后，连续失败达到上限后不再自动重试
+- 实时发布进入防抖队列：短时间内的多次请求合并为一批，同一内容只发布一次
+  （队列在进程内；跨进程由 wiki_claimed_at 认领去重，同一内容同一时间只有一方在发送）
+"""
+
+import re
+import json
+import asyncio
+import hashlib
+import logging
+from string import Template
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set, Tuple, Callable, Awaitable
+
+from tools.database import flatten_tags, select_columns, LazyRow
+
+logger = logging.getLogger(__name__)
+
+# 防抖时间（秒）：首个请求到达后等待这么久再统一发布
+PUBLISH_DEBOUNCE_SECONDS = 2.0
+
+# 每批发布的条目数（队列达到该数量时立即发布）
+PUBLISH_BATCH_SIZE = 50
+
+# 同时发送的 Wiki 事件数
+PUBLISH_CONCURRENCY = 5
+
+# 连续失败达到该次数后不再自动重试（内容重新处理后再次尝试）
+PUBLISH_MAX_FAILURES = 3
+
+# 发布认领的有效期（秒），超时未释放的认领（如进程退出）可被其他发布方接管
+PUBLISH_CLAIM_SECONDS = 300
+
+WIKI_MOD_ID = "mod:openagents.mods.workspace.wiki"
+
+# Wiki Mod 拒绝非创建者直接更新时的响应消息前缀
+_OWNER_ONLY_MESSAGE = "Only the page owner"
+
+# 各 Wiki 事件成功时的发布结果
+_OUTCOMES = {
+    "wiki.page.create": 'created',
+    "wiki.page.edit": 'updated',
+    "wiki.page.proposal.create": 'proposed',
+}
+
+# 页面模板（模块加载时编译）
+_HEADER = Template("# $title\n\n**来源**: $source\n**分类**: $category\n**收集时间**: $collected_at\n")
+_LINK = Template("**原文链接**: [$url]($url)\n")
+_TAGS = Template("**标签**: $tags\n")
+_SECTION = Template("## $heading\n\n$body\n")
+_DIVIDER = "\n---\n\n"
+
+# 渲染和发布页面用到的 content_items 列（不读取 raw_content）
+WIKI_PAGE_COLUMNS = (
+    'id', 'title', 'url', 'source', 'category', 'collected_at', 'tags',
+    'summary_paragraph', 'key_points', 'key_quotes', 'summary_detailed',
+    'wiki_page_path', 'wiki_content_hash'
+)
+
+_UNSAFE_PATH_CHARS = re.compile(r'[^\w\u4e00-\u9fff\-]')
+
+
+def _as_list(value: Any) -> List[Any]:
+    """JSON 字符串或单值转换为列表"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return [value]
+    return value if isinstance(value, list) else [value]
+
+
+def _tag_list(tags: Any) -> List[str]:
+    """展开标签（结构化标签或标签列表）"""
+    if isinstance(tags, str):
+        try:
+            tags = json.loads(tags)
+        except ValueError:
+            return [tags]
+    if isinstance(tags, dict):
+        return [tag for _, tag in flatten_tags(tags)]
+    return [str(tag) for tag in tags or []]
+
+
+def render_content_page(content: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    渲染内容的 Wiki 页面
+
+    Args:
+        content: content_items 行（已解析 JSON 字段）
+
+    Returns:
+        (页面路径, 页面内容)
+    """
+    title = content.get('title') or 'N/A'
+    category = content.get('category') or 'tech'
+
+    parts = [_HEADER.substitute(
+        title=title,
+        source=content.get('source') or '未知',
+        category=category,
+        collected_at=content.get('collected_at') or ''
+    )]
+    if content.get('url'):
+        parts.append(_LINK.substitute(url=content['url']))
+    tags = _tag_list(content.get('tags'))
+    if tags:
+        parts.append(_TAGS.substitute(tags=', '.join(tags)))
+    parts.append(_DIVIDER)
+
+    if content.get('summary_paragraph'):
+        parts.append(_SECTION.substitute(heading="摘要", body=content['summary_paragraph'] + "\n"))
+
+    key_points = _as_list(content.get('key_points'))
+    if key_points:
+        parts.append(_SECTION.substitute(
+            heading="关键要点", body="".join(f"- {point}\n" for point in key_points)
+        ))
+
+    key_quotes = _as_list(content.get('key_quotes'))
+    if key_quotes:
+        parts.append(_SECTION.substitute(
+            heading="关键引用", body="".join(f"> {quote}\n\n" for quote in key_quotes)
+        ))
+
+    if content.get('summary_detailed'):
+        parts.append(_SECTION.substitute(heading="详细内容", body=content['summary_detailed']))
+
+    safe_title = _UNSAFE_PATH_CHARS.sub('_', title)[:80]
+    short_id = hashlib.sha1(str(content.get('id', '')).encode('utf-8')).hexdigest()[:8]
+    return f"materials/{category}/{safe_title}-{short_id}", "".join(parts)
+
+
+class WikiPublisher:
+    """Wiki 发布服务"""
+
+    def __init__(
+        self,
+        db,
+        send_event: Callable[[Any], Awaitable[Any]],
+        source_id: str = "wiki_publisher",
+        debounce_seconds: float = PUBLISH_DEBOUNCE_SECONDS,
+        concurrency: int = PUBLISH_CONCURRENCY
+    ):
+        """
+        初始化
+
+        Args:
+            db: Database 实例
+            send_event: 发送事件的协程函数（Agent.send_event 或 workspace_client.send_event）
+            source_id: 事件来源 ID（需与发送连接的 Agent ID 一致）
+            debounce_seconds: 防抖时间（秒）
+            concurrency: 同时发送的 Wiki 事件数
+        """
+        self.db = db
+        self.send_event = send_event
+        self.source_id = source_id
+        self.debounce_seconds = debounce_seconds
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # 待发布的内容ID（dict 作为有序集合，同一内容只保留一次）
+        self._pending: Dict[str, None] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    # ==================== 防抖队列 ====================
+
+    def publish(self, content_id: str):
+        """
+        请求发布内容页面（进入防抖队列，发布时读取最新内容）
+
+        Args:
+            content_id: 内容ID
+        """
+        self._pending[content_id] = None
+        if len(self._pending) >= PUBLISH_BATCH_SIZE:
+            self._spawn(self.flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = self._spawn(self._flush_later())
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """启动后台任务（保留引用直到完成）"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_later(self):
+        """等待防抖时间后发布"""
+        await asyncio.sleep(self.debounce_seconds)
+        await self.flush()
+
+    async def flush(self) -> Dict[str, int]:
+        """
+        立即发布队列中的全部内容
+
+        Returns:
+            发布结果统计
+        """
+        content_ids = list(self._pending)
+        self._pending.clear()
+        if not content_ids:
+            return self._empty_results()
+
+        try:
+            return await self.publish_contents(self._load_contents(content_ids))
+        except Exception as e:
+            logger.error(f"❌ Wiki 发布失败: {e}")
+            return self._empty_results()
+
+    async def close(self):
+        """发布剩余队列并等待进行中的发布完成（Agent 关闭时调用）"""
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _load_contents(self, content_ids: List[str]) -> List[LazyRow]:
+        """批量读取内容（只读取渲染页面用到的列）"""
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {select_columns(WIKI_PAGE_COLUMNS)} FROM content_items "
+            f"WHERE id IN ({', '.join('?' * len(content_ids))})",
+            content_ids
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [LazyRow(row) for row in rows]
+
+    # ==================== 发布 ====================
+
+    @staticmethod
+    def _empty_results(total: int = 0) -> Dict[str, int]:
+        """空的发布结果统计"""
+        return {
+            'total': total, 'created': 0, 'updated': 0, 'proposed': 0,
+            'unchanged': 0, 'failed': 0, 'in_progress': 0
+        }
+
+    async def publish_contents(
+        self,
+        contents: List[Dict[str, Any]],
+        batch_size: int = PUBLISH_BATCH_SIZE
+    ) -> Dict[str, int]:
+        """
+        发布一批内容页面（内容未变化的跳过，其他发布方正在发送的计为 in_progress）
+
+        Args:
+            contents: content_items 行列表
+            batch_size: 每批处理的条目数（每批结束后统一写回发布状态）
+
+        Returns:
+            {'total', 'created', 'updated', 'proposed', 'unchanged', 'failed', 'in_progress'}
+        """
+        results = self._empty_results(len(contents))
+
+        for i in range(0, len(contents), batch_size):
+            batch_ids = [content['id'] for content in contents[i:i + batch_size]]
+            claimed = self._claim(batch_ids)
+            results['in_progress'] += len(batch_ids) - len(claimed)
+            if not claimed:
+                continue
+            # 认领后重新读取，拿到其他发布方刚写回的发布状态
+            batch = self._load_contents(claimed)
+            outcomes = await asyncio.gather(*[self._publish_one(content) for content in batch])
+
+            synced_at = datetime.now().isoformat()
+            updates = []
+            failed = []
+            for content, (outcome, page_path, content_hash) in zip(batch, outcomes):
+                results[outcome] += 1
+                if outcome == 'failed':
+                    failed.append((synced_at, content['id']))
+                else:
+                    updates.append((synced_at, content_hash, page_path, synced_at, content['id']))
+            self._mark_synced(updates)
+            self._mark_failed(failed)
+
+        if results['created'] or results['updated'] or results['proposed']:
+            logger.info(f"📚 Wiki 发布完成: {results}")
+        return results
+
+    async def _publish_one(self, content: Dict[str, Any]) -> Tuple[str, Optional[str], Optional[str]]:
+        """
+        发布单条内容
+
+        Returns:
+            (结果 created/updated/proposed/unchanged/failed, 页面路径, 页面内容哈希)
+        """
+        title = content.get('title', 'N/A')
+        try:
+            page_path, wiki_content = render_content_page(content)
+            content_hash = hashlib.sha1(wiki_content.encode('utf-8')).hexdigest()
+
+            # 已发布过的内容沿用原页面路径（标题或分类变化时仍更新同一页面）
+            synced_path = content.get('wiki_page_path')
+            if synced_path and content.get('wiki_content_hash') == content_hash:
+                return 'unchanged', synced_path, content_hash
+
+            attempt = ("wiki.page.edit", synced_path) if synced_path else ("wiki.page.create", page_path)
+            tried = set()
+            message = '无响应'
+            while attempt and attempt not in tried:
+                tried.add(attempt)
+                event_name, path = attempt
+                async with self._semaphore:
+                    response = await self._send_page(event_name, path, title, wiki_content, content)
+                if response is not None and getattr(response, 'success', False):
+                    logger.info(f"✅ 已发送 Wiki 页面: {title} ({event_name})")
+                    return _OUTCOMES[event_name], path, content_hash
+                if response is None:
+                    break
+                message = getattr(response, 'message', None) or ''
+                logger.debug(f"Wiki 事件被拒绝: {event_name} {path} - {message}")
+                attempt = self._fallback(event_name, path, page_path, message)
+
+            # 未得到 Wiki Mod 的成功响应时不写回同步状态，只记录失败
+            logger.error(f"Wiki 发布被拒绝: {title} - {message}")
+            return 'failed', None, None
+
+        except Exception as e:
+            logger.error(f"Wiki 发布失败: {title} - {e}")
+            return 'failed', None, None
+
+    @staticmethod
+    def _fallback(event_name: str, path: str, page_path: str, message: str) -> Optional[Tuple[str, str]]:
+        """
+        根据被拒绝的事件选择下一次尝试（upsert）
+
+        - 创建被拒绝（页面已存在，如旧版同步创建的页面）：改为更新同一页面
+        - 更新被拒绝（页面由其他发布方创建）：提交修改提议
+        - 更新被拒绝（其他原因，如页面已删除）：在当前渲染路径创建
+
+        Returns:
+            (事件名, 页面路径)；没有可尝试的事件时返回 None
+        """
+        if event_name == "wiki.page.create":
+            return "wiki.page.edit", path
+        if event_name == "wiki.page.edit":
+            if message.startswith(_OWNER_ONLY_MESSAGE):
+                return "wiki.page.proposal.create", path
+            return "wiki.page.create", page_path
+        return None
+
+    async def _send_page(
+        self,
+        event_name: str,
+        page_path: str,
+        title: str,
+        wiki_content: str,
+        content: Dict[str, Any]
+    ):
+        """发送 Wiki 页面创建/更新/修改提议事件，返回 Wiki Mod 的响应"""
+        from openagents.models.event import Event
+        payload = {
+            "page_path": page_path,
+            "title": title,
+            "wiki_content": wiki_content,
+            "metadata": {
+                "content_id": content.get('id', ''),
+                "source": content.get('source', '未知'),
+                "category": content.get('category', 'tech')
+            }
+        }
+        if event_name == "wiki.page.proposal.create":
+            payload["rationale"] = f"内容已重新处理，同步最新页面（content_id={content.get('id', '')}）"
+        return await self.send_event(Event(
+            event_name=event_name,
+            source_id=self.source_id,
+            target_agent_id=WIKI_MOD_ID,
+            payload=payload,
+            visibility="network"
+        ))
+
+    def _claim(self, content_ids: List[str]) -> List[str]:
+        """
+        认领待发布的内容（未被认领或认领已过期的才能认领）
+
+        Returns:
+            认领成功的内容ID
+        """
+        now = datetime.now()
+        expired = (now - timedelta(seconds=PUBLISH_CLAIM_SECONDS)).isoformat()
+        claimed = []
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        for content_id in content_ids:
+            cursor.execute("""
+                UPDATE content_items SET wiki_claimed_at = ?
+                WHERE id = ? AND (wiki_claimed_at IS NULL OR wiki_claimed_at < ?)
+            """, (now.isoformat(), content_id, expired))
+            if cursor.rowcount:
+                claimed.append(content_id)
+        conn.commit()
+        conn.close()
+        return claimed
+
+    def _mark_synced(self, updates: List[tuple]):
+        """
+        批量写回发布状态
+
+        Args:
+            updates: [(synced_at, content_hash, page_path, attempted_at, content_id)]
+        """
+        if not updates:
+            return
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("""
+            UPDATE content_items
+            SET wiki_synced_at = ?, wiki_content_hash = ?, wiki_page_path = ?,
+                wiki_attempted_at = ?, wiki_sync_failures = 0, wiki_claimed_at = NULL
+            WHERE id = ?
+        """, updates)
+        conn.commit()
+        conn.close()
+
+    def _mark_failed(self, failures: List[tuple]):
+        """
+        批量记录发布失败（失败次数加一）
+
+        Args:
+            failures: [(attempted_at, content_id)]
+        """
+        if not failures:
+            return
+        conn = self.db._get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("""
+            UPDATE content_items
+            SET wiki_attempted_at = ?, wiki_sync_failures = COALESCE(wiki_sync_failures, 0) + 1,
+                wiki_claimed_at = NULL
+            WHERE id = ?
+        """, failures)
+        conn.commit()
+        conn.close()